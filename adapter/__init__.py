@@ -1 +1,4 @@
 from .base import Adapter, init_adapter
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .rate_limit import RateLimiter, RateLimitExceededError
+from .retry import RetryBudget
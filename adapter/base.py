@@ -1,9 +1,154 @@
+import asyncio
+import os
+import time
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from functools import cached_property
 from importlib import import_module
-from typing import Any, Dict
+from importlib.util import find_spec
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+import httpx
+from pytimeparse.timeparse import timeparse
+
+from adapter.circuit_breaker import CircuitBreaker
+from adapter.rate_limit import RateLimiter, parse_retry_after
+from adapter.retry import RetryBudget, backoff
 
 
 class Adapter(ABC):
+    """The base class of every adapter.
+
+    Attributes:
+        _client: Pooled HTTP client shared by all adapters. It is opened and closed by the app lifespan.
+        retry_budget: Budget of retries shared by all adapters, configured by the `RETRY_BUDGET_RATIO` and
+            `RETRY_BUDGET_MIN_PER_SECOND` envs.
+    """
+
+    _client: Optional[httpx.AsyncClient] = None
+    # Quota of the adapter's endpoint in requests per minute. None for no limit.
+    requests_per_minute: Optional[float] = None
+    # Number of requests that can be sent at once after the endpoint has not been called for a while.
+    # None for one second's worth of the quota.
+    rate_limit_burst: Optional[int] = None
+    # Whether calling the endpoint twice for the same input is safe, which allows retrying failed calls.
+    idempotent: bool = False
+    # Maximum number of retries of a failed call.
+    max_retries: int = 2
+    # Time in seconds the first retry waits at most, doubled for every further retry up to the maximum.
+    retry_backoff: float = 0.1
+    max_retry_backoff: float = 2.0
+    # Time in seconds after which a call counts as slow towards opening the circuit breaker. None to ignore latency.
+    slow_call_duration: Optional[float] = None
+
+    # Called with the adapter name, the stage and the time in seconds the stage took, e.g. to record metrics.
+    stage_observer: Optional[Callable[[str, str, float], None]] = None
+
+    retry_budget = RetryBudget(
+        ratio=float(os.getenv("RETRY_BUDGET_RATIO", "0.1")),
+        min_retries_per_second=float(os.getenv("RETRY_BUDGET_MIN_PER_SECOND", "1")),
+    )
+
+    @classmethod
+    def open_client(
+        cls,
+        *,
+        timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,
+        event_hooks: Optional[Dict[str, list[Callable]]] = None,
+    ) -> httpx.AsyncClient:
+        """Opens the pooled HTTP client shared by all adapters.
+
+        Connections are kept alive between requests, so repeated calls to the same provider reuse the
+        existing TCP/TLS connection instead of doing a new handshake.
+
+        Args:
+            timeout: Timeout in seconds for connecting to, writing to and reading from the provider.
+            max_connections: Maximum number of concurrent connections.
+            max_keepalive_connections: Maximum number of idle connections kept in the pool.
+            keepalive_expiry: Time in seconds an idle connection is kept in the pool.
+            http2: Whether to negotiate HTTP/2 with the provider. Requires the `h2` package.
+            event_hooks: Functions called with every request and response, by event, e.g. to record metrics.
+
+        Returns:
+            The shared HTTP client.
+        """
+        if Adapter._client is not None and not Adapter._client.is_closed:
+            return Adapter._client
+
+        if http2 and find_spec("h2") is None:
+            raise Exception("HTTP/2 REQUIRES THE 'h2' PACKAGE, INSTALL IT WITH 'pip install httpx[http2]'")
+
+        Adapter._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            event_hooks=event_hooks,
+        )
+        return Adapter._client
+
+    @classmethod
+    async def close_client(cls) -> None:
+        """Closes the shared HTTP client and all of its pooled connections."""
+        if Adapter._client is not None:
+            await Adapter._client.aclose()
+            Adapter._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared HTTP client. It is opened with the default settings if the app lifespan has not opened it."""
+        return self.open_client()
+
+    @cached_property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        """The limiter that keeps the calls within the quota, configured by the `RATE_LIMIT_MAX_WAIT` (e.g. "5s")
+        and `RATE_LIMIT_MAX_QUEUE` envs. None if the adapter has no quota."""
+        if not self.requests_per_minute:
+            return None
+
+        rate = self.requests_per_minute / 60
+        return RateLimiter(
+            rate,
+            self.rate_limit_burst or max(1, int(rate)),
+            max_wait=timeparse(os.getenv("RATE_LIMIT_MAX_WAIT", "5s")) or 0,
+            max_queue=int(os.getenv("RATE_LIMIT_MAX_QUEUE", "100")),
+        )
+
+    @cached_property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """The breaker that stops calling the endpoint while it is unhealthy, configured by the
+        `CIRCUIT_BREAKER_FAILURE_RATE`, `CIRCUIT_BREAKER_SLOW_CALL_DURATION` (e.g. "2s") and
+        `CIRCUIT_BREAKER_OPEN_DURATION` (e.g. "30s") envs."""
+        slow_call_duration = os.getenv("CIRCUIT_BREAKER_SLOW_CALL_DURATION")
+        return CircuitBreaker(
+            failure_rate_threshold=float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5")),
+            slow_call_duration=timeparse(slow_call_duration) if slow_call_duration else self.slow_call_duration,
+            open_duration=timeparse(os.getenv("CIRCUIT_BREAKER_OPEN_DURATION", "30s")),
+        )
+
+    def circuit_breakers(self) -> Dict[str, CircuitBreaker]:
+        """Gets the circuit breakers of the adapter's endpoints.
+
+        Returns:
+            The circuit breakers by adapter name.
+        """
+        return {type(self).__name__: self.circuit_breaker}
+
+    def rate_limiters(self) -> Dict[str, RateLimiter]:
+        """Gets the rate limiters of the adapter's endpoints.
+
+        Returns:
+            The rate limiters by adapter name.
+        """
+        return {type(self).__name__: self.rate_limiter} if self.rate_limiter else {}
+
     @abstractmethod
     def parse_input(self, request: Dict[str, Any]) -> Any:
         """This function parses the data retrieved from the request.
@@ -52,11 +197,137 @@ class Adapter(ABC):
         """
         pass
 
+    async def fetch(self, input_: Any) -> Any:
+        """This function retrieves the raw data for the input.
+
+        Adapters override this function to serve part of the input without calling the adapter's endpoint.
+
+        Failed calls are retried with a jittered backoff if the adapter is idempotent and the failure is transient, as
+        long as the retry budget shared by all adapters allows it. Calls rejected by the endpoint's rate limit are
+        retried regardless of idempotency, after the endpoint's `Retry-After`.
+
+        Args:
+            input_: The input from request from the data source.
+
+        Returns:
+            The raw data for the input.
+
+        Raises:
+            RateLimitExceededError: If the call cannot be made within the rate limiter's maximum wait.
+            CircuitOpenError: If the endpoint is unhealthy.
+        """
+        Adapter.retry_budget.record_request()
+        attempt = 0
+        while True:
+            try:
+                return await self.guarded_call(input_)
+            except Exception as e:
+                if attempt >= self.max_retries or (delay := self.retry_delay(e, attempt)) is None:
+                    raise
+                if not Adapter.retry_budget.withdraw():
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def guarded_call(self, input_: Any) -> Any:
+        """Calls the adapter's endpoint within its quota and through its circuit breaker.
+
+        Args:
+            input_: The input from request from the data source.
+
+        Returns:
+            The raw data from the adapter's endpoint.
+        """
+        async with self.guard():
+            with self.stage("call"):
+                return await self.call(input_)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Reports the time the context took to the stage observer, if there is one.
+
+        Args:
+            name: Name of the stage.
+        """
+        if Adapter.stage_observer is None:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            Adapter.stage_observer(type(self).__name__, name, time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """Keeps the calls to the adapter's endpoint made within the context within its quota and records their
+        outcome in its circuit breaker.
+
+        Raises:
+            RateLimitExceededError: If the call cannot be made within the rate limiter's maximum wait.
+            CircuitOpenError: If the endpoint is unhealthy.
+        """
+        # Calls the breaker rejects do not use up the quota or wait in the rate limiter's queue.
+        probe = self.circuit_breaker.before_call()
+        if self.rate_limiter is not None:
+            try:
+                await self.rate_limiter.acquire()
+            except BaseException:
+                self.circuit_breaker.cancel(probe)
+                raise
+
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            # Requests the endpoint rejected as invalid say nothing about its health.
+            rejected = isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500
+            self.circuit_breaker.record(time.monotonic() - start, failed=not rejected, probe=probe)
+            if rejected and e.response.status_code == 429 and self.rate_limiter is not None:
+                retry_after = parse_retry_after(e.response)
+                self.rate_limiter.pause(retry_after if retry_after is not None else 1 / self.rate_limiter.rate)
+            raise
+        except BaseException:
+            self.circuit_breaker.cancel(probe)
+            raise
+
+        self.circuit_breaker.record(time.monotonic() - start, failed=False, probe=probe)
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Gets the time to wait before retrying a failed call.
+
+        Args:
+            error: The error the call failed with.
+            attempt: Number of retries already made.
+
+        Returns:
+            The time in seconds to wait. None if the call should not be retried.
+        """
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+            # The rate limiter already holds back this and every other call until the endpoint accepts calls again.
+            if self.rate_limiter is not None:
+                return 0.0
+            if (retry_after := parse_retry_after(error.response)) is not None:
+                return retry_after if retry_after <= self.max_retry_backoff else None
+
+        elif not self.idempotent or not (
+            isinstance(error, httpx.TransportError)
+            or (isinstance(error, httpx.HTTPStatusError) and error.response.status_code >= 500)
+        ):
+            return None
+
+        return backoff(attempt, self.retry_backoff, self.max_retry_backoff)
+
     async def unified_call(self, request: Dict[str, Any]) -> Any:
-        input_ = self.parse_input(request)
-        output = await self.call(input_)
-        self.verify_output(input_, output)
-        return self.parse_output(output)
+        with self.stage("parse_input"):
+            input_ = self.parse_input(request)
+        with self.stage("fetch"):
+            output = await self.fetch(input_)
+        with self.stage("verify_output"):
+            self.verify_output(input_, output)
+        with self.stage("parse_output"):
+            return self.parse_output(output)
 
 
 def init_adapter(adapter_type: str, adapter_name: str) -> Adapter:
@@ -0,0 +1,173 @@
+import time
+from collections import deque
+from typing import Dict, Literal, Optional
+
+CIRCUIT_STATES = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return f"The provider is unhealthy and is not called, retry after {self.retry_after:.1f}s"
+
+
+class CircuitBreaker:
+    """A circuit breaker that stops calling a provider while too many of its calls fail or are slow.
+
+    While closed, the outcome of the latest calls is tracked. Once at least `min_calls` calls were made and the share
+    of failed or of slow calls reaches its threshold, the breaker opens and calls fail immediately. After
+    `open_duration` the breaker is half-open and lets `half_open_calls` calls through. If they succeed the breaker
+    closes, otherwise it opens again.
+
+    Attributes:
+        window: Number of latest calls the failure and slow call rates are computed from.
+        min_calls: Minimum number of calls before the breaker can open.
+        failure_rate_threshold: Share of failed calls that opens the breaker.
+        slow_call_duration: Time in seconds after which a call is slow. None to ignore latency.
+        slow_call_rate_threshold: Share of slow calls that opens the breaker.
+        open_duration: Time in seconds the breaker stays open before letting calls through again.
+        half_open_calls: Number of calls let through while half-open.
+        state: Current state of the breaker.
+        opened: Number of times the breaker opened.
+        rejected: Number of calls failed without calling the provider.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_duration: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.5,
+        open_duration: float = 30.0,
+        half_open_calls: int = 1,
+    ) -> None:
+        """Initializes a closed CircuitBreaker.
+
+        Args:
+            window: Number of latest calls the failure and slow call rates are computed from.
+            min_calls: Minimum number of calls before the breaker can open.
+            failure_rate_threshold: Share of failed calls that opens the breaker.
+            slow_call_duration: Time in seconds after which a call is slow. None to ignore latency.
+            slow_call_rate_threshold: Share of slow calls that opens the breaker.
+            open_duration: Time in seconds the breaker stays open before letting calls through again.
+            half_open_calls: Number of calls let through while half-open.
+        """
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.opened = 0
+        self.rejected = 0
+        self._state: CIRCUIT_STATES = "closed"
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._half_open_period = 0
+
+    @property
+    def state(self) -> CIRCUIT_STATES:
+        if self._state == "open" and time.monotonic() - self._opened_at >= self.open_duration:
+            self._state = "half_open"
+            self._probes = 0
+            self._half_open_period += 1
+        return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        """The share of failed calls among the latest calls."""
+        return sum(failed for failed, _ in self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    @property
+    def slow_call_rate(self) -> float:
+        """The share of slow calls among the latest calls."""
+        return sum(slow for _, slow in self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def before_call(self) -> Optional[int]:
+        """Checks whether the provider may be called. Every allowed call must be followed by `record` or `cancel`.
+
+        Returns:
+            The half-open period the call is a trial call of, to pass to `record` or `cancel`. None if the breaker
+            is closed.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with every trial call already in flight.
+        """
+        state = self.state
+        if state == "closed":
+            return None
+
+        if state == "half_open" and self._probes < self.half_open_calls:
+            self._probes += 1
+            return self._half_open_period
+
+        self.rejected += 1
+        raise CircuitOpenError(max(0.0, self._opened_at + self.open_duration - time.monotonic()))
+
+    def record(self, duration: float, failed: bool, probe: Optional[int] = None) -> None:
+        """Records the outcome of a call.
+
+        Only trial calls of the current half-open period decide whether the breaker closes. Calls let through
+        before the breaker opened are ignored once it is open or half-open.
+
+        Args:
+            duration: Time in seconds the call took.
+            failed: Whether the call failed.
+            probe: Half-open period returned by `before_call`.
+        """
+        slow = self.slow_call_duration is not None and duration >= self.slow_call_duration
+        if probe is not None:
+            if self._is_current_probe(probe):
+                self._probes -= 1
+                if failed or slow:
+                    self._open()
+                else:
+                    self._state = "closed"
+                    self._outcomes.clear()
+            return
+
+        if self._state != "closed":
+            return
+
+        self._outcomes.append((failed, slow))
+        if len(self._outcomes) >= self.min_calls and (
+            self.failure_rate >= self.failure_rate_threshold or self.slow_call_rate >= self.slow_call_rate_threshold
+        ):
+            self._open()
+
+    def cancel(self, probe: Optional[int] = None) -> None:
+        """Records that an allowed call was cancelled before it completed.
+
+        Args:
+            probe: Half-open period returned by `before_call`.
+        """
+        if probe is not None and self._is_current_probe(probe):
+            self._probes -= 1
+
+    def _is_current_probe(self, probe: int) -> bool:
+        return self._state == "half_open" and probe == self._half_open_period
+
+    def _open(self) -> None:
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+
+    def stats(self) -> Dict[str, float | str]:
+        """Gets the breaker's state and counters.
+
+        Returns:
+            The state and counters by name.
+        """
+        return {
+            "state": self.state,
+            "failure_rate": self.failure_rate,
+            "slow_call_rate": self.slow_call_rate,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,54 @@
+"""JSON encoding and decoding shared by the adapters and the gateway.
+
+The codec is picked by the `JSON_CODEC` env: "orjson" (requires `pip install orjson`), "stdlib", or "auto" (the
+default) for orjson when it is installed and the standard library otherwise. Both encode to the same compact UTF-8
+bytes as starlette's JSONResponse, except that orjson writes exponents without padding (3e-5 instead of 3e-05).
+Call the functions through the module (`codec.dumps(...)`) so that `use` can switch the codec at runtime.
+"""
+import json
+import os
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+CODECS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes | str], Any]]] = {
+    "stdlib": (_stdlib_dumps, json.loads),
+}
+if orjson is not None:
+    CODECS["orjson"] = (_orjson_dumps, orjson.loads)
+
+name: str
+dumps: Callable[[Any], bytes]
+loads: Callable[[bytes | str], Any]
+
+
+def use(codec_name: str = "auto") -> None:
+    """Switches the codec used by `dumps` and `loads`.
+
+    Args:
+        codec_name: "orjson", "stdlib", or "auto" for the fastest installed codec.
+    """
+    global name, dumps, loads
+
+    if codec_name == "auto":
+        codec_name = "orjson" if "orjson" in CODECS else "stdlib"
+    if codec_name not in CODECS:
+        raise Exception(f"UNSUPPORTED OR NOT INSTALLED JSON CODEC '{codec_name}'")
+
+    name = codec_name
+    dumps, loads = CODECS[codec_name]
+
+
+use(os.getenv("JSON_CODEC", "auto"))
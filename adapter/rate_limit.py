@@ -0,0 +1,155 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+
+class RateLimitExceededError(Exception):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return f"The provider's rate limit is exhausted, retry after {self.retry_after:.1f}s"
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Parses the `Retry-After` header of a response.
+
+    Args:
+        response: Response of the provider.
+
+    Returns:
+        The time in seconds to wait before calling the provider again. None if the header is missing or invalid.
+    """
+    if (value := response.headers.get("Retry-After")) is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """A token bucket that spaces out calls to a provider to stay within its quota.
+
+    A call that arrives while the bucket is empty waits for its token in a bounded queue instead of being sent to
+    the provider and rejected. Calls that would have to wait longer than `max_wait`, or that arrive while
+    `max_queue` calls are already waiting, fail immediately.
+
+    Attributes:
+        rate: Number of tokens added per second.
+        burst: Maximum number of tokens in the bucket.
+        max_wait: Maximum time in seconds a call waits for a token.
+        max_queue: Maximum number of calls waiting for a token.
+        queue_depth: Number of calls waiting for a token.
+        acquired: Number of calls that got a token.
+        rejected: Number of calls that failed because the queue was full or the wait too long.
+        waited: Number of calls that had to wait for a token.
+        wait_time: Total time in seconds calls waited for a token.
+        max_wait_time: Longest time in seconds a call waited for a token.
+    """
+
+    def __init__(self, rate: float, burst: int, max_wait: float, max_queue: int) -> None:
+        """Initializes RateLimiter with a full bucket.
+
+        Args:
+            rate: Number of tokens added per second.
+            burst: Maximum number of tokens in the bucket.
+            max_wait: Maximum time in seconds a call waits for a token.
+            max_queue: Maximum number of calls waiting for a token.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.queue_depth = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.waited = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        # Total time pauses have pushed back the tokens reserved by queued calls.
+        self._delayed = 0.0
+
+    def _refill(self, now: float) -> None:
+        # No tokens are added while the provider has asked to be left alone.
+        start = max(self._updated_at, self._paused_until)
+        if now > start:
+            self._tokens = min(self.burst, self._tokens + (now - start) * self.rate)
+        self._updated_at = max(self._updated_at, now)
+
+    async def acquire(self) -> None:
+        """Waits for a token.
+
+        Raises:
+            RateLimitExceededError: If the queue is full or the token would take longer than `max_wait`.
+        """
+        now = time.monotonic()
+        self._refill(now)
+
+        # Tokens are reserved in arrival order, so a negative balance is the number of calls queued before this one.
+        self._tokens -= 1
+        wait = max(now, self._paused_until) - now + max(0.0, -self._tokens) / self.rate
+        if wait > 0 and (wait > self.max_wait or self.queue_depth >= self.max_queue):
+            self._tokens += 1
+            self.rejected += 1
+            raise RateLimitExceededError(wait)
+
+        self.acquired += 1
+        if wait <= 0:
+            return
+
+        # A pause while the call waits pushes its token back by the time the pause adds, so wake up and check again.
+        ready_at, delayed = now + wait, self._delayed
+        self.queue_depth += 1
+        self.waited += 1
+        try:
+            while (remaining := ready_at + self._delayed - delayed - time.monotonic()) > 0:
+                await asyncio.sleep(remaining)
+        except asyncio.CancelledError:
+            self._tokens += 1
+            raise
+        finally:
+            self.queue_depth -= 1
+        wait = time.monotonic() - now
+        self.wait_time += wait
+        self.max_wait_time = max(self.max_wait_time, wait)
+
+    def pause(self, duration: float) -> None:
+        """Stops handing out tokens, e.g. after the provider answered with `Retry-After`.
+
+        Args:
+            duration: Time in seconds until tokens are handed out again.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens = min(self._tokens, 0.0)
+        # No tokens are added during the extension of the pause, which delays the tokens of queued calls as much.
+        self._delayed += max(0.0, now + duration - max(now, self._paused_until))
+        self._paused_until = max(self._paused_until, now + duration)
+
+    def stats(self) -> Dict[str, float]:
+        """Gets the limiter's counters.
+
+        Returns:
+            The counters by name.
+        """
+        return {
+            "queue_depth": self.queue_depth,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "waited": self.waited,
+            "wait_time": self.wait_time,
+            "max_wait_time": self.max_wait_time,
+        }
@@ -0,0 +1,79 @@
+import random
+import time
+from collections import deque
+from typing import Dict
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    """Gets the jittered time to wait before retrying a call.
+
+    Args:
+        attempt: Number of retries already made.
+        base: Time in seconds the first retry waits at most.
+        cap: Maximum time in seconds any retry waits.
+
+    Returns:
+        A random time in seconds between 0 and the exponential backoff of the attempt.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class RetryBudget:
+    """A budget that limits retries to a share of the requests, so retries cannot multiply the load of an outage.
+
+    Attributes:
+        ratio: Number of retries allowed per request within the window.
+        min_retries_per_second: Number of retries allowed per second regardless of the number of requests.
+        window: Time in seconds requests and retries are counted over.
+        exhausted: Number of retries denied because the budget was spent.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_retries_per_second: float = 1.0, window: float = 10.0) -> None:
+        """Initializes RetryBudget with an empty window.
+
+        Args:
+            ratio: Number of retries allowed per request within the window.
+            min_retries_per_second: Number of retries allowed per second regardless of the number of requests.
+            window: Time in seconds requests and retries are counted over.
+        """
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window = window
+        self.exhausted = 0
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+
+    def _expire(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and events[0] <= now - self.window:
+                events.popleft()
+
+    def record_request(self) -> None:
+        """Records a request, which adds to the budget."""
+        now = time.monotonic()
+        self._expire(now)
+        self._requests.append(now)
+
+    def withdraw(self) -> bool:
+        """Spends a retry from the budget.
+
+        Returns:
+            Whether the budget allowed the retry.
+        """
+        now = time.monotonic()
+        self._expire(now)
+        if len(self._retries) >= self.min_retries_per_second * self.window + self.ratio * len(self._requests):
+            self.exhausted += 1
+            return False
+
+        self._retries.append(now)
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """Gets the budget's counters.
+
+        Returns:
+            The counters by name.
+        """
+        self._expire(time.monotonic())
+        return {"requests": len(self._requests), "retries": len(self._retries), "exhausted": self.exhausted}
@@ -1,7 +1,15 @@
+import asyncio
+import os
+import time
 from abc import abstractmethod
-from typing import TypedDict, List, Dict
+from collections import Counter
+from functools import cached_property
+from typing import TypedDict, List, Dict, Iterable, Optional
+
+from pytimeparse.timeparse import timeparse
 
 from adapter import Adapter
+from adapter.standard_crypto_price.symbol_registry import SymbolRegistry
 
 
 class Price(TypedDict):
@@ -26,7 +34,137 @@ class Response(TypedDict):
     prices: List[Price]
 
 
+class PriceStore:
+    """The latest price of each symbol retrieved from the adapter's endpoint.
+
+    Attributes:
+        max_age: Time in seconds a price is served after it was retrieved. 0 disables the store.
+        prices: Price of each symbol and the monotonic time it was retrieved at.
+        requests: Number of requests served since the demand was last taken.
+        demand: Number of requests for each symbol since the demand was last taken.
+    """
+
+    def __init__(self, max_age: float) -> None:
+        """Initializes PriceStore with the maximum age of its prices.
+
+        Args:
+            max_age: Time in seconds a price is served after it was retrieved.
+        """
+        self.max_age = max_age
+        self.prices: Dict[str, tuple[Price, float]] = {}
+        self.requests = 0
+        self.demand = Counter()
+
+    def get(self, symbol: str) -> Optional[Price]:
+        """Gets the price of a symbol if it is fresh.
+
+        Args:
+            symbol: Symbol to get the price of.
+
+        Returns:
+            The price. None if the symbol has no price or its price is older than the maximum age.
+        """
+        if (entry := self.prices.get(symbol)) is None:
+            return None
+
+        price, retrieved_at = entry
+        if time.monotonic() - retrieved_at > self.max_age:
+            del self.prices[symbol]
+            return None
+
+        return price
+
+    def set_many(self, prices: Iterable[Price]) -> None:
+        """Stores prices that were just retrieved.
+
+        Args:
+            prices: Prices to store.
+        """
+        now = time.monotonic()
+        self.prices.update({price["symbol"]: (price, now) for price in prices})
+
+    def record_demand(self, symbols: Iterable[str]) -> None:
+        """Records a request for the symbols.
+
+        Args:
+            symbols: Requested symbols.
+        """
+        self.requests += 1
+        self.demand.update(symbols)
+
+    def take_demand(self) -> tuple[int, List[str]]:
+        """Takes the demand recorded since the demand was last taken.
+
+        Returns:
+            The number of requests and the requested symbols, most requested first.
+        """
+        requests, symbols = self.requests, [symbol for symbol, _ in self.demand.most_common()]
+        self.requests = 0
+        self.demand.clear()
+        return requests, symbols
+
+
 class StandardCryptoPrice(Adapter):
+    idempotent: bool = True
+    slow_call_duration: Optional[float] = 2.0
+    # Mapping between the symbols and the identifiers the endpoint is queried with.
+    symbol_registry: SymbolRegistry = SymbolRegistry.from_mapping({})
+    # Maximum number of symbols in a single call to the endpoint. None for no limit.
+    max_symbols_per_call: Optional[int] = None
+    # Maximum length of the comma-separated symbols query parameter of a single call. None for no limit.
+    max_query_length: Optional[int] = None
+    # Maximum number of concurrent calls to the endpoint when the symbols are split into chunks.
+    max_concurrent_calls: int = 4
+
+    @cached_property
+    def price_store(self) -> PriceStore:
+        """The store of the latest prices, configured by the `PRICE_CACHE_MAX_AGE` env (e.g. "10s")."""
+        return PriceStore(timeparse(os.getenv("PRICE_CACHE_MAX_AGE", "0s")) or 0)
+
+    def symbol_universe(self) -> List[str]:
+        """Gets the symbols known to the adapter, which are the symbols prefetched in the background.
+
+        Returns:
+            The symbols of the adapter's symbol registry.
+        """
+        return list(self.symbol_registry)
+
+    def query_symbol(self, symbol: str) -> str:
+        """Gets the identifier the endpoint is queried with for a symbol.
+
+        Args:
+            symbol: Symbol to get the identifier of.
+
+        Returns:
+            The identifier from the adapter's symbol registry, or the symbol itself.
+        """
+        return self.symbol_registry.id(symbol)
+
+    def chunk(self, symbols: List[str]) -> List[List[str]]:
+        """Splits symbols into chunks that are within the endpoint's limits.
+
+        Args:
+            symbols: Symbols to split.
+
+        Returns:
+            The chunks of symbols.
+        """
+        chunks, chunk, length = [], [], 0
+        for symbol in symbols:
+            # The query length includes the comma separating the symbol from the previous one.
+            symbol_length = len(self.query_symbol(symbol)) + (1 if chunk else 0)
+            if chunk and (
+                (self.max_symbols_per_call and len(chunk) >= self.max_symbols_per_call)
+                or (self.max_query_length and length + symbol_length > self.max_query_length)
+            ):
+                chunks.append(chunk)
+                chunk, length, symbol_length = [], 0, symbol_length - 1
+            chunk.append(symbol)
+            length += symbol_length
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
     def parse_input(self, request: Dict) -> Input:
         symbols = [symbol.strip() for symbol in request.get("symbols", "").split(",")]
         return Input(symbols=symbols)
@@ -38,6 +176,72 @@ class StandardCryptoPrice(Adapter):
     def parse_output(self, output: Output) -> Response:
         return Response(prices=output["prices"])
 
+    async def fetch(self, input_: Input) -> Output:
+        """Serves the symbols with a fresh price from the price store and calls the endpoint for the rest.
+
+        Args:
+            input_: The input from request from the data source.
+
+        Returns:
+            The prices in the same order as the input symbols.
+        """
+        if not self.price_store.max_age:
+            return await self.fetch_upstream(input_)
+
+        self.price_store.record_demand(input_["symbols"])
+        prices = {symbol: price for symbol in input_["symbols"] if (price := self.price_store.get(symbol))}
+        if missing := list(dict.fromkeys(symbol for symbol in input_["symbols"] if symbol not in prices)):
+            output = await self.refresh(Input(symbols=missing))
+            prices.update({price["symbol"]: price for price in output["prices"]})
+
+        return Output(prices=[prices[symbol] for symbol in input_["symbols"] if symbol in prices])
+
+    async def refresh(self, input_: Input) -> Output:
+        """Retrieves the prices of the input symbols from the endpoint and stores them in the price store.
+
+        Args:
+            input_: The symbols to retrieve the price of.
+
+        Returns:
+            The retrieved prices.
+        """
+        output = await self.fetch_upstream(input_)
+        self.price_store.set_many(output["prices"])
+        return output
+
+    async def fetch_upstream(self, input_: Input) -> Output:
+        """Retrieves the prices of the input symbols from the endpoint, bypassing the price store.
+
+        If the symbols exceed the endpoint's limits, they are split into chunks that are retrieved concurrently.
+
+        Args:
+            input_: The symbols to retrieve the price of.
+
+        Returns:
+            The retrieved prices.
+        """
+        fetch = super().fetch
+        if len(chunks := self.chunk(list(dict.fromkeys(input_["symbols"])))) <= 1:
+            return await fetch(input_)
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_calls)
+
+        async def fetch_chunk(chunk: List[str]) -> Output:
+            async with semaphore:
+                return await fetch(Input(symbols=chunk))
+
+        # Cancel the remaining chunks as soon as one fails, since the request fails anyway.
+        tasks = [asyncio.create_task(fetch_chunk(chunk)) for chunk in chunks]
+        try:
+            outputs = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        prices = {price["symbol"]: price for output in outputs for price in output["prices"]}
+        return Output(prices=[prices[symbol] for symbol in input_["symbols"] if symbol in prices])
+
     @abstractmethod
     async def call(self, input_: Input) -> Output:
         pass
@@ -0,0 +1,219 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from adapter import CircuitBreaker, RateLimiter, init_adapter
+from adapter.standard_crypto_price.base import StandardCryptoPrice, Input, Output
+
+
+class ProviderStats:
+    """Rolling latency and error estimates of a price provider.
+
+    Attributes:
+        latencies: Latencies in seconds of the latest calls.
+        half_life: Time in seconds after which the error estimate of an idle provider halves.
+    """
+
+    ERROR_SMOOTHING = 0.3
+    MAX_ERROR_RATE = 0.5
+    # Least share of successful calls a score is weighted by, so that a provider that always fails is scored finitely.
+    MIN_SUCCESS_RATE = 0.01
+
+    def __init__(self, window: int = 100, half_life: float = 30.0) -> None:
+        """Initializes ProviderStats with the size of the latency window.
+
+        Args:
+            window: Number of latest calls to estimate the latency from.
+            half_life: Time in seconds after which the error estimate of an idle provider halves.
+        """
+        self.latencies = deque(maxlen=window)
+        self.half_life = half_life
+        self._error_rate = 0.0
+        self._updated_at = time.monotonic()
+
+    @property
+    def error_rate(self) -> float:
+        """The smoothed share of failed calls, which decays while the provider is not called."""
+        return self._error_rate * 0.5 ** ((time.monotonic() - self._updated_at) / self.half_life)
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the provider fails less than the maximum error rate."""
+        return self.error_rate < self.MAX_ERROR_RATE
+
+    def latency(self, percentile: float) -> Optional[float]:
+        """Gets a percentile of the latest latencies.
+
+        Args:
+            percentile: Percentile between 0 and 100.
+
+        Returns:
+            The latency in seconds. None if the provider has not been called yet.
+        """
+        if not self.latencies:
+            return None
+
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(percentile / 100 * len(ordered)))]
+
+    def record(self, latency: float, failed: bool = False) -> None:
+        """Records the outcome of a call.
+
+        Args:
+            latency: Time in seconds the call took.
+            failed: Whether the call failed.
+        """
+        error_rate = self.error_rate
+        self._error_rate = error_rate + self.ERROR_SMOOTHING * (float(failed) - error_rate)
+        self._updated_at = time.monotonic()
+        if not failed:
+            self.latencies.append(latency)
+
+
+class Composite(StandardCryptoPrice):
+    """A price adapter that routes each request to the fastest healthy provider.
+
+    If the provider has not answered within the hedge delay, which is a percentile of its latest latencies, the
+    request is also sent to the next provider and the first valid answer is used.
+
+    Attributes:
+        providers: Price adapters by name, from the `COMPOSITE_PROVIDERS` env, leaving out those without an API key.
+        stats: Latency and error estimates by provider name.
+        hedge_percentile: Percentile of a provider's latencies after which the next provider is called.
+        default_hedge_delay: Hedge delay in seconds of a provider that has not been called yet.
+    """
+
+    providers: Dict[str, StandardCryptoPrice]
+    stats: Dict[str, ProviderStats]
+    # The providers retry their own calls and failed providers are failed over, so the race is not retried.
+    max_retries: int = 0
+    # A slow race means every provider is slow, which each provider's own circuit breaker accounts for.
+    slow_call_duration: Optional[float] = None
+
+    def __init__(self) -> None:
+        names = os.getenv("COMPOSITE_PROVIDERS", "coin_gecko,coin_market_cap,crypto_compare").split(",")
+        providers = {name.strip(): self.init_provider(name.strip()) for name in names if name.strip()}
+        self.providers = {name: provider for name, provider in providers.items() if provider is not None}
+        self.stats = {name: ProviderStats() for name in self.providers}
+        self.hedge_percentile = float(os.getenv("COMPOSITE_HEDGE_PERCENTILE", "95"))
+        self.default_hedge_delay = float(os.getenv("COMPOSITE_DEFAULT_HEDGE_DELAY", "1.0"))
+
+    @staticmethod
+    def init_provider(name: str) -> Optional[StandardCryptoPrice]:
+        """Initializes a provider, using the `<NAME>_API_KEY` env (e.g. `COIN_GECKO_API_KEY`) as its API key, the
+        `<NAME>_API_URL` env as its endpoint and the `<NAME>_RATE_LIMIT_PER_MINUTE` env as its quota if set.
+
+        The shared `API_KEY` and `API_URL` envs are not used, as they belong to a single provider.
+
+        Args:
+            name: Adapter name of the provider.
+
+        Returns:
+            The provider. None if it has no API key.
+        """
+        if not (api_key := os.getenv(f"{name.upper()}_API_KEY")):
+            return None
+
+        provider = init_adapter("standard_crypto_price", name)
+        provider.api_key = api_key
+        provider.api_url = os.getenv(f"{name.upper()}_API_URL", type(provider).api_url)
+        if requests_per_minute := os.getenv(f"{name.upper()}_RATE_LIMIT_PER_MINUTE"):
+            provider.requests_per_minute = float(requests_per_minute)
+        return provider
+
+    def symbol_universe(self) -> List[str]:
+        return list(dict.fromkeys(symbol for p in self.providers.values() for symbol in p.symbol_universe()))
+
+    def circuit_breakers(self) -> Dict[str, CircuitBreaker]:
+        breakers = {name: breaker for p in self.providers.values() for name, breaker in p.circuit_breakers().items()}
+        return {**super().circuit_breakers(), **breakers}
+
+    def rate_limiters(self) -> Dict[str, RateLimiter]:
+        limiters = {name: limiter for p in self.providers.values() for name, limiter in p.rate_limiters().items()}
+        return {**super().rate_limiters(), **limiters}
+
+    def rank(self) -> List[str]:
+        """Ranks the providers, healthy ones first, then by median latency weighted by error rate.
+
+        A provider that has not been called yet is assumed to answer within the default hedge delay.
+
+        Returns:
+            The provider names in the order they should be called.
+        """
+
+        def score(name: str) -> tuple[bool, float]:
+            stats = self.stats[name]
+            latency = stats.latency(50)
+            latency = self.default_hedge_delay if latency is None else latency
+            return not stats.healthy, latency / max(1 - stats.error_rate, ProviderStats.MIN_SUCCESS_RATE)
+
+        return sorted(self.providers, key=score)
+
+    def hedge_delay(self, name: str) -> float:
+        """Gets the time to wait for a provider before also calling the next one.
+
+        Args:
+            name: Provider name.
+
+        Returns:
+            The hedge delay in seconds.
+        """
+        latency = self.stats[name].latency(self.hedge_percentile)
+        return latency if latency is not None else self.default_hedge_delay
+
+    async def call(self, input_: Input) -> Output:
+        loop = asyncio.get_running_loop()
+        remaining = deque(self.rank())
+        running: Dict[asyncio.Task, tuple[str, float]] = {}
+        errors = []
+
+        def call_next() -> Optional[str]:
+            if not remaining:
+                return None
+            name = remaining.popleft()
+            running[asyncio.create_task(self.providers[name].fetch_upstream(input_))] = (name, loop.time())
+            return name
+
+        last_called = call_next()
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=self.hedge_delay(last_called) if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                # Hedge with the next provider if none has answered in time.
+                if not done:
+                    last_called = call_next()
+                    continue
+
+                for task in done:
+                    name, started_at = running.pop(task)
+                    try:
+                        output = task.result()
+                        self.verify_output(input_, output)
+                    except Exception as e:
+                        self.stats[name].record(loop.time() - started_at, failed=True)
+                        errors.append(e)
+                        continue
+
+                    self.stats[name].record(loop.time() - started_at)
+                    return output
+
+                # Fail over to the next provider if every running provider has failed.
+                if not running:
+                    last_called = call_next()
+        finally:
+            # The providers that lost the race are cancelled, so their latency is only known to be longer than the
+            # time they took. It is only recorded when longer than every latest latency, so it cannot lower them.
+            for task, (name, started_at) in running.items():
+                task.cancel()
+                elapsed = loop.time() - started_at
+                longest = self.stats[name].latency(100)
+                if elapsed > (self.default_hedge_delay if longest is None else longest):
+                    self.stats[name].record(elapsed)
+
+        raise errors[-1] if errors else Exception("no price provider is configured")
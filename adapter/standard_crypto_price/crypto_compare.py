@@ -1,47 +1,45 @@
 import os
 from datetime import datetime
-from typing import Dict
-
-import httpx
 
+from adapter import codec
 from adapter.standard_crypto_price.base import StandardCryptoPrice, Input, Output
+from adapter.standard_crypto_price.symbol_registry import SymbolRegistry
 
 
 class CryptoCompare(StandardCryptoPrice):
     api_url: str = "https://min-api.cryptocompare.com/data/pricemulti"
     api_key: str = None
-    symbols_map: Dict[str, str] = None
-    symbols_map_back: Dict[str, str] = None
+    symbol_registry: SymbolRegistry = SymbolRegistry.load("crypto_compare")
+    # The `fsyms` parameter is limited to 300 characters.
+    max_query_length: int = 300
 
     def __init__(self) -> None:
+        self.api_url = os.getenv("API_URL", self.api_url)
         self.api_key = os.getenv("API_KEY", None)
-        self.symbols_map = {
-            "CUSD": "CELOUSD",
-        }
-        self.symbols_map_back = {v: k for k, v in self.symbols_map.items()}
 
     async def call(self, input_: Input) -> Output:
-        client = httpx.AsyncClient()
-        response = await client.request(
+        fsyms = [self.symbol_registry.id(symbol) for symbol in input_["symbols"]]
+        response = await self.client.request(
             "GET",
             self.api_url,
             params={
-                "fsyms": ",".join([self.symbols_map.get(symbol, symbol) for symbol in input_["symbols"]]),
+                "fsyms": ",".join(dict.fromkeys(fsyms)),
                 "tsyms": "USD",
             },
             headers={"Authorization": f"Apikey " + self.api_key},
         )
         response.raise_for_status()
-        response_json = response.json()
+        response_json = codec.loads(response.content)
 
         timestamp = int(datetime.now().timestamp())
         prices = [
             {
-                "symbol": self.symbols_map_back.get(symbol, symbol),
-                "price": float(value["USD"]),
+                "symbol": symbol,
+                "price": float(response_json[fsym]["USD"]),
                 "timestamp": timestamp,
             }
-            for symbol, value in response_json.items()
+            for symbol, fsym in zip(input_["symbols"], fsyms)
+            if fsym in response_json
         ]
 
         return Output(prices=prices)
@@ -1,7 +1,6 @@
 import os
 
-import httpx
-
+from adapter import codec
 from adapter.standard_crypto_price.base import StandardCryptoPrice, Input, Output
 
 
@@ -13,15 +12,14 @@ class InternalService(StandardCryptoPrice):
         self.api_url = os.getenv("API_URL", None)
 
     async def call(self, input_: Input) -> Output:
-        client = httpx.AsyncClient()
-        response = await client.request(
+        response = await self.client.request(
             "GET",
             self.api_url,
             params={"symbols": ",".join(input_["symbols"])},
         )
 
         response.raise_for_status()
-        response_json = response.json()
+        response_json = codec.loads(response.content)
 
         prices = [
             {
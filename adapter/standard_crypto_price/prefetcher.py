@@ -0,0 +1,122 @@
+import asyncio
+from logging import Logger
+from typing import Optional
+
+from adapter.standard_crypto_price.base import StandardCryptoPrice, Input
+
+
+class PricePrefetcher:
+    """A background task that keeps the adapter's price store filled with a snapshot of every known symbol.
+
+    Each refresh retrieves the adapter's symbol universe and every symbol requested since the previous refresh,
+    in chunks. Requests are then served from the price store without calling the endpoint as long as the snapshot
+    is fresher than the store's maximum age. The refresh interval shrinks from `max_interval` towards
+    `min_interval` as the request rate approaches `hot_rate`.
+
+    Attributes:
+        adapter: Adapter to prefetch the prices of.
+        min_interval: Time in seconds between refreshes when requests arrive at `hot_rate` or faster.
+        max_interval: Time in seconds between refreshes when no request arrives.
+        chunk_size: Maximum number of symbols retrieved per call to the endpoint.
+        hot_rate: Request rate per second at which the refresh interval is the shortest.
+        log: Logger to report refresh failures to.
+        interval: Current time in seconds between refreshes.
+        refreshes: Number of completed refreshes.
+        failures: Number of calls to the endpoint that failed.
+    """
+
+    def __init__(
+        self,
+        adapter: StandardCryptoPrice,
+        min_interval: float,
+        max_interval: float,
+        chunk_size: int = 100,
+        hot_rate: float = 1.0,
+        log: Optional[Logger] = None,
+    ) -> None:
+        """Initializes PricePrefetcher with the adapter and the refresh configuration.
+
+        Args:
+            adapter: Adapter to prefetch the prices of.
+            min_interval: Time in seconds between refreshes when requests arrive at `hot_rate` or faster.
+            max_interval: Time in seconds between refreshes when no request arrives.
+            chunk_size: Maximum number of symbols retrieved per call to the endpoint.
+            hot_rate: Request rate per second at which the refresh interval is the shortest.
+            log: Logger to report refresh failures to.
+        """
+        if not adapter.price_store.max_age:
+            raise Exception("PRICE PREFETCHING REQUIRES THE 'PRICE_CACHE_MAX_AGE' ENV")
+        if max_interval >= adapter.price_store.max_age:
+            raise Exception("THE PRICE PREFETCH INTERVAL MUST BE SHORTER THAN 'PRICE_CACHE_MAX_AGE'")
+
+        self.adapter = adapter
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.chunk_size = chunk_size
+        self.hot_rate = hot_rate
+        self.log = log
+        self.interval = max_interval
+        self.refreshes = 0
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts refreshing the snapshot in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops refreshing the snapshot."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def next_interval(self, request_rate: float) -> float:
+        """Gets the time until the next refresh for the observed request rate.
+
+        Args:
+            request_rate: Requests per second since the previous refresh.
+
+        Returns:
+            The time in seconds until the next refresh.
+        """
+        heat = min(request_rate / self.hot_rate, 1.0) if self.hot_rate > 0 else 1.0
+        return self.max_interval - heat * (self.max_interval - self.min_interval)
+
+    async def refresh(self) -> int:
+        """Retrieves the prices of the symbol universe and of every symbol requested since the previous refresh.
+
+        Returns:
+            The number of requests served since the previous refresh.
+        """
+        requests, requested_symbols = self.adapter.price_store.take_demand()
+        symbols = list(dict.fromkeys([*self.adapter.symbol_universe(), *requested_symbols]))
+        chunks = [symbols[i : i + self.chunk_size] for i in range(0, len(symbols), self.chunk_size)]
+
+        results = await asyncio.gather(
+            *[self.adapter.refresh(Input(symbols=chunk)) for chunk in chunks], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.failures += 1
+                if self.log:
+                    self.log.warning(f"PREFETCH: failed to refresh prices: {result.__class__.__name__}: {result}")
+
+        self.refreshes += 1
+        return requests
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        last_refresh = loop.time()
+        while True:
+            requests = await self.refresh()
+            now = loop.time()
+            self.interval = self.next_interval(requests / max(now - last_refresh, 1e-9))
+            last_refresh = now
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,143 @@
+import csv
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+SYMBOLS_DIR = Path(__file__).parent / "symbols"
+
+log = logging.getLogger("pds_gateway_log")
+
+
+class SymbolRegistry:
+    """A mapping between symbols and the ids a provider identifies them with.
+
+    The mapping of a provider is loaded from its `symbols/<provider>.csv` file on first use and shared by every
+    adapter of the provider. The file is checked for changes at most every `check_interval` seconds and reloaded
+    when it changes, so symbols can be added without a restart. A file that cannot be read or parsed, e.g. while it
+    is being renamed or written, is logged and the last good mapping is kept until the file is fixed.
+
+    Attributes:
+        path: CSV file with a `symbol,id` header. None for a fixed mapping.
+        check_interval: Minimum time in seconds between checks of the file for changes.
+    """
+
+    _shared: Dict[Path, "SymbolRegistry"] = {}
+
+    def __init__(self, path: Optional[Path] = None, check_interval: float = 5.0) -> None:
+        """Initializes SymbolRegistry with the file to load the mapping from.
+
+        Args:
+            path: CSV file with a `symbol,id` header. None for an empty mapping.
+            check_interval: Minimum time in seconds between checks of the file for changes.
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self._forward: Dict[str, str] = {}
+        self._reverse: Dict[str, Tuple[str, ...]] = {}
+        self._mtime: Optional[int] = None
+        self._checked_at: Optional[float] = None
+
+    @classmethod
+    def load(cls, provider: str) -> "SymbolRegistry":
+        """Gets the shared registry of a provider.
+
+        Args:
+            provider: Provider name, which is the name of its file in the `symbols` directory.
+
+        Returns:
+            The registry of the provider.
+        """
+        path = SYMBOLS_DIR / f"{provider}.csv"
+        if path not in cls._shared:
+            cls._shared[path] = cls(path, float(os.getenv("SYMBOLS_RELOAD_INTERVAL", "5")))
+        return cls._shared[path]
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping[str, str]) -> "SymbolRegistry":
+        """Creates a registry with a fixed mapping.
+
+        Args:
+            mapping: Mapping of symbols to ids.
+
+        Returns:
+            The registry.
+        """
+        registry = cls()
+        registry._index(dict(mapping))
+        return registry
+
+    @property
+    def forward(self) -> Dict[str, str]:
+        """The id of each symbol."""
+        self._reload_if_changed()
+        return self._forward
+
+    @property
+    def reverse(self) -> Dict[str, Tuple[str, ...]]:
+        """The symbols of each id. An id has more than one symbol when several symbols map to it."""
+        self._reload_if_changed()
+        return self._reverse
+
+    def id(self, symbol: str) -> str:
+        """Gets the id of a symbol.
+
+        Args:
+            symbol: Symbol to get the id of.
+
+        Returns:
+            The id, or the symbol itself if it is not in the registry.
+        """
+        return self.forward.get(symbol, symbol)
+
+    def symbols_of(self, id_: str) -> Tuple[str, ...]:
+        """Gets every symbol that maps to an id.
+
+        Args:
+            id_: Id to get the symbols of.
+
+        Returns:
+            The symbols. Empty if no symbol maps to the id.
+        """
+        return self.reverse.get(id_, ())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.forward)
+
+    def __len__(self) -> int:
+        return len(self.forward)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.forward
+
+    def _reload_if_changed(self) -> None:
+        if self.path is None:
+            return
+
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+
+            with open(self.path, newline="") as f:
+                forward = {row["symbol"].strip(): row["id"].strip() for row in csv.DictReader(f) if row["symbol"]}
+            if any(not id_ for id_ in forward.values()):
+                raise ValueError("a symbol has no id")
+        except (OSError, ValueError, KeyError, AttributeError, csv.Error) as e:
+            log.warning(f"SYMBOLS: failed to load {self.path}, keeping the last mapping: {e.__class__.__name__}: {e}")
+            return
+
+        self._index(forward)
+        self._mtime = mtime
+
+    def _index(self, forward: Dict[str, str]) -> None:
+        reverse: Dict[str, Tuple[str, ...]] = {}
+        for symbol, id_ in forward.items():
+            reverse[id_] = reverse.get(id_, ()) + (symbol,)
+        self._forward, self._reverse = forward, reverse
@@ -0,0 +1,84 @@
+import os
+from typing import Any, AsyncIterator, Dict, TypedDict
+
+from adapter import Adapter, codec
+
+
+class Output(TypedDict):
+    answer: str
+
+
+class Response(TypedDict):
+    answer: str
+
+
+class VerifiableAI(Adapter):
+    """The base class of adapters for chat completion endpoints that follow the OpenAI API."""
+
+    api_url: str
+    api_key: str
+
+    def __init__(self):
+        self.api_url = os.getenv("API_URL", self.api_url)
+        self.api_key = os.getenv("API_KEY", None)
+
+    def verify_output(self, input_: Dict[str, Any], output: Output):
+        pass
+
+    def parse_output(self, output: Output) -> Response:
+        return Response(**output)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": "Bearer {}".format(self.api_key)}
+
+    async def call(self, input_: Dict[str, Any]) -> Output:
+        response = await self.client.request("POST", self.api_url, headers=self.headers, json=input_)
+
+        response.raise_for_status()
+
+        return Output(answer=codec.loads(response.content)["choices"][0]["message"]["content"])
+
+    async def stream(self, input_: Dict[str, Any]) -> AsyncIterator[str]:
+        """Calls the endpoint in streaming mode and yields the answer as the model generates it.
+
+        Args:
+            input_: The input from request from the data source.
+
+        Yields:
+            The parts of the answer from the server-sent events of the endpoint.
+        """
+        async with self.client.stream(
+            "POST", self.api_url, headers=self.headers, json={**input_, "stream": True}
+        ) as response:
+            if response.is_error:
+                await response.aread()
+            response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                if (data := line[len("data:") :].strip()) == "[DONE]":
+                    return
+                # Chunks without choices, like the usage chunk that ends OpenAI streams, carry no content.
+                if not (choices := codec.loads(data).get("choices")):
+                    continue
+                if content := choices[0].get("delta", {}).get("content"):
+                    yield content
+
+    async def unified_stream(self, request: Dict[str, Any]) -> AsyncIterator[str]:
+        """Streams the answer to a request, counting the stream as a single call towards the quota and the circuit
+        breaker.
+
+        Args:
+            request: The request from the data source.
+
+        Yields:
+            The parts of the answer.
+        """
+        with self.stage("parse_input"):
+            input_ = self.parse_input(request)
+        async with self.guard():
+            with self.stage("call"):
+                async for content in self.stream(input_):
+                    yield content
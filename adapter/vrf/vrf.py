@@ -1,8 +1,7 @@
 import os
-import httpx
 
 from typing import TypedDict
-from adapter import Adapter
+from adapter import Adapter, codec
 
 
 class Request(TypedDict):
@@ -35,7 +34,7 @@ class Vrf(Adapter):
     def parse_input(self, request: Request) -> Input:
         return Input(**request)
 
-    def verify_output(self, output: Output):
+    def verify_output(self, input_: Input, output: Output):
         if len(output["proof"]) != 160:
             raise Exception(f"invalid proof length")
         if len(output["hash"]) != 128:
@@ -43,15 +42,10 @@ class Vrf(Adapter):
 
     def parse_output(self, output: Output) -> Response:
         return Response(**output)
-    
+
     async def call(self, input_: Input) -> Output:
-        client = httpx.AsyncClient()
-        response = await client.request(
-            "POST",
-            self.api_url,
-            json=dict(input_)
-        )
+        response = await self.client.request("POST", self.api_url, json=dict(input_))
 
         response.raise_for_status()
 
-        return Output(**response.json())
+        return Output(**codec.loads(response.content))
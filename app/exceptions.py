@@ -6,3 +6,8 @@ class VerificationFailedError(Exception):
 
     def __str__(self):
         return f"Verification failed with status code {self.status_code} and error type {self.error}"
+
+
+class FlightAbandonedError(Exception):
+    def __str__(self):
+        return "The leader of the request was cancelled before completing it"
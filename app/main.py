@@ -1,73 +1,320 @@
 import asyncio
+import math
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any
+from typing import Any, AsyncIterator
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from httpx import HTTPStatusError
+from motor.motor_asyncio import AsyncIOMotorClient
 from pytimeparse.timeparse import timeparse
+from redis.asyncio import Redis
 from starlette.requests import Request
+from starlette.responses import StreamingResponse
 
-from adapter import init_adapter
+from adapter import Adapter, CircuitOpenError, RateLimitExceededError, codec, init_adapter
+from adapter.standard_crypto_price.base import StandardCryptoPrice
+from adapter.standard_crypto_price.prefetcher import PricePrefetcher
+from adapter.verifiable_ai.base import VerifiableAI
 from app.middleware import (
     RequestReportMiddleware,
     RequestCacheMiddleware,
+    RequestMetricsMiddleware,
+    TracingMiddleware,
     SignatureCacheMiddleware,
     VerifyRequestMiddleware,
 )
-from app.report import init_db
+from app.report import ReportWriter, init_db
 from app.report.models import Reports, GatewayInfo, VerifyReport, ProviderResponseReport, RequestReport
 from app.settings import settings
-from app.utils.cache import LocalCache, RedisCache
+from app.utils.cache import (
+    AsyncCacheWrapper,
+    AsyncRedisCache,
+    LocalCache,
+    SharedMemoryCache,
+    TieredCache,
+    VerificationCache,
+)
+from app.utils.keys import CacheKeys
 from app.utils.log_config import init_loggers
+from app.utils.metrics import REGISTRY, CallbackMetric, observe_adapter_stage, record_upstream_response
+from app.utils.response import CodecJSONResponse, stream_json_field
+from app.utils.tracing import SlowTraces, record_span
+from app.utils.single_flight import RedisSingleFlight
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Opens the shared adapter HTTP client on startup and closes it on shutdown."""
+    Adapter.open_client(
+        timeout=timeparse(settings.HTTP_TIMEOUT),
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=timeparse(settings.HTTP_KEEPALIVE_EXPIRY),
+        http2=settings.HTTP2,
+        event_hooks={"response": [record_upstream_response]},
+    )
+    if report_writer:
+        report_writer.start()
+    if cache:
+        cache.start()
+    if verify_cache:
+        verify_cache.start()
+    if price_prefetcher:
+        price_prefetcher.start()
+    yield
+    if price_prefetcher:
+        await price_prefetcher.stop()
+    if report_writer:
+        await report_writer.stop()
+        mongo_client.close()
+    await Adapter.close_client()
+    if cache:
+        await cache.close()
+    if verify_cache:
+        await verify_cache.close()
+    if distributed_flights:
+        await distributed_flights.redis.close()
+
 
 # Setup apps
-app = FastAPI()
-request_app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+request_app = FastAPI(default_response_class=CodecJSONResponse)
 info_app = FastAPI()
 reports_app = FastAPI()
+metrics_app = FastAPI()
 
 # Setup logger
 log = init_loggers(log_level=settings.LOG_LEVEL)
 log.info(f"GATEWAY_MODE: {settings.MODE}")
+log.info(f"JSON_CODEC: {codec.name}")
+
+# Setup cache keys, shared by every worker and replica of the same adapter
+cache_keys = CacheKeys(
+    settings.CACHE_KEY_NAMESPACE or f"{settings.ADAPTER_TYPE}.{settings.ADAPTER_NAME}",
+    secret=settings.CACHE_KEY_SECRET,
+)
 
 # Setup cache
-if settings.CACHE_TYPE == "redis":
-    cache = RedisCache(settings.REDIS_URL, settings.REDIS_PORT, settings.REDIS_DB, timeparse(settings.TTL))
+if settings.CACHE_TYPE in ["redis", "tiered"]:
+    cache = AsyncRedisCache(
+        settings.REDIS_URL,
+        settings.REDIS_PORT,
+        settings.REDIS_DB,
+        timeparse(settings.TTL),
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+    )
+    if settings.CACHE_TYPE == "tiered":
+        cache = TieredCache(
+            cache,
+            settings.CACHE_L1_SIZE,
+            timeparse(settings.CACHE_L1_TTL),
+            "response",
+            log,
+            l1_max_bytes=settings.CACHE_MAX_BYTES,
+        )
 elif settings.CACHE_TYPE == "local":
-    cache = LocalCache(settings.CACHE_SIZE, timeparse(settings.TTL))
+    cache = AsyncCacheWrapper(LocalCache(settings.CACHE_SIZE, timeparse(settings.TTL), settings.CACHE_MAX_BYTES))
+elif settings.CACHE_TYPE == "shm":
+    cache = SharedMemoryCache(
+        settings.SHM_CACHE_PATH, settings.CACHE_SIZE, timeparse(settings.TTL), settings.SHM_CACHE_SLOT_SIZE
+    )
 else:
     cache = None
 
+# Setup verification cache
+if settings.CACHE_TYPE in ["redis", "tiered"]:
+    verify_cache = AsyncRedisCache(
+        settings.REDIS_URL,
+        settings.REDIS_PORT,
+        settings.REDIS_DB,
+        timeparse(settings.VERIFY_CACHE_TTL),
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+    )
+    if settings.CACHE_TYPE == "tiered":
+        verify_cache = TieredCache(
+            verify_cache, settings.VERIFY_CACHE_SIZE, timeparse(settings.CACHE_L1_TTL), "verify", log
+        )
+    verify_cache = VerificationCache(verify_cache, keys=cache_keys)
+elif settings.CACHE_TYPE == "local":
+    verify_cache = VerificationCache(
+        AsyncCacheWrapper(LocalCache(settings.VERIFY_CACHE_SIZE, timeparse(settings.VERIFY_CACHE_TTL))),
+        keys=cache_keys,
+    )
+elif settings.CACHE_TYPE == "shm":
+    verify_cache = VerificationCache(
+        SharedMemoryCache(
+            f"{settings.SHM_CACHE_PATH}-verify",
+            settings.VERIFY_CACHE_SIZE,
+            timeparse(settings.VERIFY_CACHE_TTL),
+            settings.SHM_VERIFY_CACHE_SLOT_SIZE,
+        ),
+        keys=cache_keys,
+    )
+else:
+    verify_cache = None
+
+# In-process caches by name, whose size is reported
+local_caches = {}
+for name, async_cache in [("response", cache), ("verify", verify_cache.cache if verify_cache else None)]:
+    if isinstance(async_cache, AsyncCacheWrapper):
+        local_caches[name] = async_cache.cache
+    elif isinstance(async_cache, TieredCache):
+        local_caches[name] = async_cache.l1
+
+# Setup request deduplication across replicas
+if settings.DEDUP_MODE == "redis":
+    distributed_flights = RedisSingleFlight(
+        Redis(host=settings.REDIS_URL, port=settings.REDIS_PORT, db=settings.REDIS_DB),
+        timeparse(settings.DEDUP_LEASE_TTL),
+    )
+else:
+    distributed_flights = None
+
 # Setup report database
 if db_enabled := bool(settings.MONGO_DB_URL) and settings.MODE == "production":
+    mongo_client = AsyncIOMotorClient(settings.MONGO_DB_URL)
+    report_writer = ReportWriter(
+        max_queue_size=settings.REPORT_QUEUE_SIZE,
+        batch_size=settings.REPORT_BATCH_SIZE,
+        flush_interval=timeparse(settings.REPORT_FLUSH_INTERVAL),
+        policy=settings.REPORT_QUEUE_POLICY,
+        log=log,
+    )
     request_db = init_db(
-        settings.MONGO_DB_URL,
+        mongo_client,
         f"{settings.COLLECTION_DB_NAME}-request",
         log,
         RequestReport,
         expiration_time=settings.MONGO_DB_EXPIRATION_TIME,
+        writer=report_writer,
     )
     provider_response_db = init_db(
-        settings.MONGO_DB_URL,
+        mongo_client,
         f"{settings.COLLECTION_DB_NAME}-provider",
         log,
         ProviderResponseReport,
         expiration_time=settings.MONGO_DB_EXPIRATION_TIME,
+        writer=report_writer,
     )
     verify_db = init_db(
-        settings.MONGO_DB_URL,
+        mongo_client,
         f"{settings.COLLECTION_DB_NAME}-verify",
         log,
         VerifyReport,
         expiration_time=settings.MONGO_DB_EXPIRATION_TIME,
+        writer=report_writer,
     )
 else:
+    mongo_client = None
+    report_writer = None
     request_db = None
     provider_response_db = None
     verify_db = None
 
 # Setup adapter
 adapter = init_adapter(settings.ADAPTER_TYPE, settings.ADAPTER_NAME)
+if settings.RATE_LIMIT_PER_MINUTE:
+    adapter.requests_per_minute = settings.RATE_LIMIT_PER_MINUTE
+
+
+# Setup metrics and tracing
+def observe_stage(adapter_name: str, stage: str, duration: float) -> None:
+    observe_adapter_stage(adapter_name, stage, duration)
+    record_span(stage, duration)
+
+
+Adapter.stage_observer = observe_stage
+slow_traces = SlowTraces(settings.SLOW_TRACE_BUFFER_SIZE) if settings.SLOW_TRACE_BUFFER_SIZE else None
+REGISTRY.register(
+    CallbackMetric(
+        "pds_rate_limiter_queue_depth",
+        "Adapter calls waiting for a rate limit token.",
+        lambda: {(name,): limiter.queue_depth for name, limiter in adapter.rate_limiters().items()},
+        ["adapter"],
+    )
+)
+REGISTRY.register(
+    CallbackMetric(
+        "pds_circuit_breaker_open",
+        "Whether the circuit breaker of an adapter is open (1), half-open (0.5) or closed (0).",
+        lambda: {
+            (name,): {"closed": 0, "half_open": 0.5, "open": 1}[breaker.state]
+            for name, breaker in adapter.circuit_breakers().items()
+        },
+        ["adapter"],
+    )
+)
+REGISTRY.register(
+    CallbackMetric(
+        "pds_local_cache_bytes",
+        "Bytes of the entries of each in-process cache.",
+        lambda: {(name,): local_cache.bytes for name, local_cache in local_caches.items()},
+        ["cache"],
+    )
+)
+REGISTRY.register(
+    CallbackMetric(
+        "pds_local_cache_entries",
+        "Entries of each in-process cache.",
+        lambda: {(name,): len(local_cache.entries) for name, local_cache in local_caches.items()},
+        ["cache"],
+    )
+)
+REGISTRY.register(
+    CallbackMetric(
+        "pds_local_cache_evictions",
+        "Entries evicted from each in-process cache to make room for others.",
+        lambda: {(name,): local_cache.evictions for name, local_cache in local_caches.items()},
+        ["cache"],
+        type="counter",
+    )
+)
+if verify_cache:
+    REGISTRY.register(
+        CallbackMetric(
+            "pds_verify_cache_requests",
+            "Verification cache lookups, by hit or miss.",
+            lambda: {("hit",): verify_cache.hits, ("miss",): verify_cache.misses},
+            ["result"],
+            type="counter",
+        )
+    )
+if report_writer:
+    REGISTRY.register(
+        CallbackMetric(
+            "pds_report_queue_depth",
+            "Reports waiting to be written to the database.",
+            lambda: {(): report_writer.queue_depth},
+        )
+    )
+    REGISTRY.register(
+        CallbackMetric(
+            "pds_reports",
+            "Reports handled by the report writer, by result.",
+            lambda: {
+                ("flushed",): report_writer.flushed,
+                ("dropped",): report_writer.dropped,
+                ("failed",): report_writer.failed,
+            },
+            ["result"],
+            type="counter",
+        )
+    )
+
+# Setup background price prefetching
+if settings.PRICE_PREFETCH and isinstance(adapter, StandardCryptoPrice):
+    price_prefetcher = PricePrefetcher(
+        adapter,
+        min_interval=timeparse(settings.PRICE_PREFETCH_MIN_INTERVAL),
+        max_interval=timeparse(settings.PRICE_PREFETCH_MAX_INTERVAL),
+        chunk_size=settings.PRICE_PREFETCH_CHUNK_SIZE,
+        hot_rate=settings.PRICE_PREFETCH_HOT_RATE,
+        log=log,
+    )
+else:
+    price_prefetcher = None
 
 # Setup middleware
 if settings.MODE == "production":
@@ -77,7 +324,13 @@ if settings.MODE == "production":
 
     # Add middleware to cache requests by signature
     if cache:
-        request_app.add_middleware(RequestCacheMiddleware, cache=cache, timeout=timeparse(settings.PENDING_TIMEOUT))
+        request_app.add_middleware(
+            RequestCacheMiddleware,
+            cache=cache,
+            timeout=timeparse(settings.PENDING_TIMEOUT),
+            distributed_flights=distributed_flights,
+            keys=cache_keys,
+        )
 
     # Add middleware to verify requests
     request_app.add_middleware(
@@ -86,11 +339,19 @@ if settings.MODE == "production":
         max_verification_delay=settings.MAX_DELAY_VERIFICATION,
         allowed_data_source_ids=settings.ALLOWED_DATA_SOURCE_IDS,
         report_db=verify_db,
+        verify_cache=verify_cache,
     )
 
     # Add middleware to cache responses by signature
     if cache:
-        request_app.add_middleware(SignatureCacheMiddleware, cache=cache)
+        request_app.add_middleware(SignatureCacheMiddleware, cache=cache, keys=cache_keys)
+
+# Add middleware to record the latency of every request
+request_app.add_middleware(RequestMetricsMiddleware)
+
+# Add middleware to trace every request and keep the slowest traces
+if slow_traces:
+    request_app.add_middleware(TracingMiddleware, slow_traces=slow_traces)
 
 
 @request_app.get("/")
@@ -101,11 +362,35 @@ async def request_data(request: Request) -> Any:
         response_code=200,
         created_at=datetime.utcnow(),
     )
+    streaming = False
     try:
         if request.method == "POST":
-            return await adapter.unified_call(await request.json())
+            body = codec.loads(await request.body())
+            if isinstance(adapter, VerifiableAI) and body.get("stream"):
+                response = await stream_answer(adapter.unified_stream(body), report)
+                streaming = True
+                return response
+            result = await adapter.unified_call(body)
         else:
-            return await adapter.unified_call(dict(request.query_params))
+            result = await adapter.unified_call(dict(request.query_params))
+        # Returning a response skips FastAPI's jsonable_encoder, the adapters' responses are plain JSON types.
+        return CodecJSONResponse(result)
+    except RateLimitExceededError as e:
+        report.response_code = 429
+        report.error_msg = str(e)
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except CircuitOpenError as e:
+        report.response_code = 503
+        report.error_msg = str(e)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
     except HTTPStatusError as e:
         report.response_code = e.response.status_code
         report.error_msg = str(e)
@@ -121,8 +406,32 @@ async def request_data(request: Request) -> Any:
             detail=str(e),
         )
     finally:
-        if db_enabled:
-            provider_response_db.save(report)
+        # A streamed answer is reported once the stream has ended.
+        if db_enabled and not streaming:
+            await provider_response_db.save(report)
+
+
+async def stream_answer(parts: AsyncIterator[str], report: ProviderResponseReport) -> StreamingResponse:
+    """Streams the answer of the adapter as the same JSON body as a complete answer.
+
+    The response starts once the first part of the answer has arrived, so that errors before it are answered with
+    an error status like they are for complete answers. An error after it aborts the response.
+    """
+    first = await anext(parts, "")
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            async for chunk in stream_json_field("answer", first, parts):
+                yield chunk
+        except Exception as e:
+            report.response_code = 500
+            report.error_msg = str(e)
+            raise
+        finally:
+            if db_enabled:
+                await provider_response_db.save(report)
+
+    return StreamingResponse(body(), media_type="application/json")
 
 
 @info_app.get("/")
@@ -131,9 +440,31 @@ async def get_info() -> GatewayInfo:
     return GatewayInfo(
         allow_data_source_ids=settings.ALLOWED_DATA_SOURCE_IDS,
         max_delay_verification=settings.MAX_DELAY_VERIFICATION,
+        circuit_breakers={name: breaker.state for name, breaker in adapter.circuit_breakers().items()},
     )
 
 
+@info_app.get("/circuit_breakers")
+async def get_circuit_breakers() -> dict[str, Any]:
+    """Gets the state of the adapter's circuit breakers and the retry budget"""
+    return {
+        "circuit_breakers": {name: breaker.stats() for name, breaker in adapter.circuit_breakers().items()},
+        "retry_budget": Adapter.retry_budget.stats(),
+    }
+
+
+@info_app.get("/rate_limits")
+async def get_rate_limits() -> dict[str, Any]:
+    """Gets the queue depth and wait times of the adapter's rate limiters"""
+    return {name: limiter.stats() for name, limiter in adapter.rate_limiters().items()}
+
+
+@info_app.get("/caches")
+async def get_caches() -> dict[str, Any]:
+    """Gets the number of entries and bytes, and the evictions of the in-process caches"""
+    return {name: local_cache.stats() for name, local_cache in local_caches.items()}
+
+
 @reports_app.get("/latest")
 async def get_status_report() -> Reports:
     """Gets the latest reports"""
@@ -155,6 +486,15 @@ async def get_status_report() -> Reports:
         raise HTTPException(status_code=501, detail="Reports are not enabled")
 
 
+@reports_app.get("/slow")
+async def get_slow_traces() -> list[dict[str, Any]]:
+    """Gets the traces of the slowest requests"""
+    if slow_traces:
+        return [trace.to_dict() for trace in slow_traces.slowest()]
+    else:
+        raise HTTPException(status_code=501, detail="Tracing is not enabled")
+
+
 @reports_app.get("/latest_failed")
 async def get_failed_status_report() -> Reports:
     """Gets the latest failed reports"""
@@ -175,7 +515,14 @@ async def get_failed_status_report() -> Reports:
         raise HTTPException(status_code=501, detail="Reports are not enabled")
 
 
+@metrics_app.get("/", response_class=PlainTextResponse)
+async def get_metrics() -> str:
+    """Gets the metrics in the Prometheus text format"""
+    return PlainTextResponse(REGISTRY.expose(), media_type="text/plain; version=0.0.4")
+
+
 # Setup Paths
 app.mount("/request", request_app)
 app.mount("/info", info_app)
 app.mount("/reports", reports_app)
+app.mount("/metrics", metrics_app)
@@ -1,4 +1,6 @@
 from .cache_request import RequestCacheMiddleware
 from .cache_signature import SignatureCacheMiddleware
+from .request_metrics import RequestMetricsMiddleware
 from .request_report import RequestReportMiddleware
 from .verify_request import VerifyRequestMiddleware
+from .tracing import TracingMiddleware
@@ -1,72 +1,131 @@
 import asyncio
-import json
 import time
+from typing import Optional
 
-from fastapi import HTTPException
-from starlette.requests import Request
-from starlette.responses import JSONResponse
-from starlette.types import ASGIApp, Scope, Receive, Send, Message
+from starlette.types import ASGIApp, Scope, Receive, Send
 
-from app.utils.cache import Cache
-from app.utils.helper import get_bandchain_params_with_type
+from app.exceptions import FlightAbandonedError
+from app.utils.cache import AsyncCache
+from app.utils.helper import get_bandchain_params_from_scope
+from app.utils.keys import CacheKeys
+from app.utils.metrics import REQUEST_CACHE_PENDING_WAIT, REQUEST_CACHE_REQUESTS
+from app.utils.response import ResponseRecorder
+from app.utils.single_flight import RedisSingleFlight, SingleFlight
+from app.utils.tracing import span
+
+CACHE_HITS = REQUEST_CACHE_REQUESTS.labels("hit")
+CACHE_MISSES = REQUEST_CACHE_REQUESTS.labels("miss")
+CACHE_PENDING = REQUEST_CACHE_REQUESTS.labels("pending")
+PENDING_WAIT = REQUEST_CACHE_PENDING_WAIT.labels()
 
 
 class RequestCacheMiddleware:
-    def __init__(self, app: ASGIApp, cache: Cache, timeout: int) -> None:
+    """A middleware that makes validators requesting the same BandChain request share a single response.
+
+    Attributes:
+        app: ASGI application.
+        cache: Cache object.
+        timeout: Time in seconds a duplicate request waits for the in-flight request before requesting directly.
+        flights: Requests in flight in this process.
+        distributed_flights: Requests in flight across replicas. None to only deduplicate within the process.
+        keys: Derivation of the cache keys.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: AsyncCache,
+        timeout: int,
+        distributed_flights: Optional[RedisSingleFlight] = None,
+        keys: Optional[CacheKeys] = None,
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application.
+            cache: Cache object.
+            timeout: Time in seconds a duplicate request waits for the in-flight request.
+            distributed_flights: Requests in flight across replicas.
+            keys: Derivation of the cache keys. Keys in the default namespace if None.
+        """
         self.app = app
         self.cache = cache
         self.timeout = timeout
+        self.flights = SingleFlight()
+        self.distributed_flights = distributed_flights
+        self.keys = keys or CacheKeys()
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        async def cache_response(message: Message) -> None:
-            """Cache the response from the request.
-
-            Args:
-                message: Message object.
-            """
-            if message["type"] == "http.response.body":
-                self.cache.set(key, {"state": "success", "data": message["body"].decode()})
-            await send(message)
-
         if scope["type"] == "http":
             # Get request_id and external_id from the request header.
-            request = Request(scope)
-            bandchain_params = get_bandchain_params_with_type(request.headers)
-            rid = bandchain_params.get("request_id", None)
-            eid = bandchain_params.get("external_id", None)
+            bandchain_params = get_bandchain_params_from_scope(scope)
+            rid = bandchain_params.request_id
+            eid = bandchain_params.external_id
 
             # If request_id or external_id is None, return the response from the request.
             if rid is None or eid is None:
                 await self.app(scope, receive, send)
                 return
 
-            # If the key is not in the cache, get the response from the request and cache it.
-            key = hash((rid, eid))
-            if self.cache.get(key):
-                timeout_timestamp = time.time() + self.timeout
-
-                # While the key is in the cache or response timeout has not been exceeded,
-                # check the state of the response and return the cached response.
-                while cached := self.cache.get(key) or time.time() < timeout_timestamp:
-                    match cached["state"]:
-                        case "success":
-                            # If the state is success, return the cached response.
-                            await JSONResponse(content=json.loads(cached["data"]), status_code=200)(
-                                scope, receive, send
-                            )
-                            return
-                        case "failed":
-                            # If the state is failed, attempt to request again.
-                            break
-                        case "pending":
-                            # If the state is pending, wait for 0.1 seconds.
-                            await asyncio.sleep(0.1)
-                            pass
-            else:
-                # If the key is not in the cache, set the state to pending and cache it.
-                self.cache.set(key, {"state": "pending", "data": None})
-
-            # If the key is not in the cache or the retry has been exceeded, attempt to request directly.
-            await self.app(scope, receive, cache_response)
+            # If the response is in the cache, return the cached response.
+            key = self.keys.key("request", rid, eid)
+            with span("request_cache"):
+                cached = await self.cache.get_response(key)
+            if cached:
+                CACHE_HITS.inc()
+                await cached(scope, receive, send)
+                return
+
+            # If the same request is already in flight, wait for its response instead of requesting again.
+            flight, is_leader = self.flights.join(key)
+            if not is_leader:
+                CACHE_PENDING.inc()
+                try:
+                    with PENDING_WAIT.time(), span("pending_wait"):
+                        response = await self.flights.wait(flight, self.timeout)
+                except (asyncio.TimeoutError, FlightAbandonedError):
+                    # If the in-flight request is too slow or was abandoned, attempt to request directly.
+                    await self.app(scope, receive, send)
+                    return
+
+                await response(scope, receive, send)
+                return
+
+            # If another replica is already requesting, wait for its response instead of requesting again.
+            token = None
+            if self.distributed_flights:
+                start = time.perf_counter()
+                try:
+                    with span("distributed_dedup"):
+                        token, response = await self.distributed_flights.join(key, self.timeout)
+                except asyncio.TimeoutError:
+                    response = None
+
+                if response:
+                    CACHE_PENDING.inc()
+                    PENDING_WAIT.observe(time.perf_counter() - start)
+                    self.flights.resolve(key, response)
+                    await response(scope, receive, send)
+                    return
+
+            # Request and share the response with every duplicate request that arrived in the meantime.
+            CACHE_MISSES.inc()
+            recorder = ResponseRecorder(send)
+            try:
+                await self.app(scope, receive, recorder.send)
+            except BaseException as e:
+                self.flights.fail(key, FlightAbandonedError() if isinstance(e, asyncio.CancelledError) else e)
+                if token:
+                    await self.distributed_flights.abandon(key, token)
+                raise
+
+            response = recorder.response
+            self.flights.resolve(key, response)
+            if token:
+                await self.distributed_flights.complete(key, token, response)
+
+            # Only successful responses are cached so that a failed request is attempted again.
+            if response.status == 200:
+                await self.cache.set_response(key, response)
         else:
             await self.app(scope, receive, send)
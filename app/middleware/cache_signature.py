@@ -1,51 +1,60 @@
-import json
+from typing import Optional
 
 from fastapi import HTTPException
-from starlette.requests import Request
-from starlette.responses import JSONResponse
-from starlette.types import ASGIApp, Scope, Receive, Send, Message
+from starlette.types import ASGIApp, Scope, Receive, Send
 
-from app.utils.cache import Cache
-from app.utils.helper import get_band_signature_hash
+from app.utils.cache import AsyncCache
+from app.utils.helper import get_bandchain_params_from_scope
+from app.utils.keys import CacheKeys
+from app.utils.metrics import SIGNATURE_CACHE_REQUESTS
+from app.utils.response import ResponseRecorder
+from app.utils.tracing import span
+
+CACHE_HITS = SIGNATURE_CACHE_REQUESTS.labels("hit")
+CACHE_MISSES = SIGNATURE_CACHE_REQUESTS.labels("miss")
 
 
 class SignatureCacheMiddleware:
     """A middleware that collects request data from requests and saves a corresponding to a database."""
 
-    def __init__(self, app: ASGIApp, cache: Cache) -> None:
+    def __init__(self, app: ASGIApp, cache: AsyncCache, keys: Optional[CacheKeys] = None) -> None:
         """Initialize the middleware.
 
         Args:
             app: ASGI application.
             cache: Cache object.
+            keys: Derivation of the cache keys. Keys in the default namespace if None.
         """
         self.app = app
         self.cache = cache
+        self.keys = keys or CacheKeys()
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        async def cache_response(message: Message):
-            """Cache the response from the request.
-
-            Args:
-                message: Message object.
-            """
-            if message["type"] == "http.response.body":
-                self.cache.set(key, json.loads(message["body"].decode()))
-            await send(message)
-
         if scope["type"] == "http":
-            # Get the request object from the scope.
-            request = Request(scope)
+            # Requests without a signature are not cached.
+            signature = get_bandchain_params_from_scope(scope).signature
+            if signature is None:
+                await self.app(scope, receive, send)
+                return
 
             # If the key is not in the cache, get the response from the request and cache it.
-            key = get_band_signature_hash(request.headers)
-            if data := self.cache.get(key):
-                # If the key is in the cache, return the cached response.
-                await JSONResponse(content=data, status_code=200)(scope, receive, send)
+            key = self.keys.key("signature", signature)
+            with span("signature_cache"):
+                cached = await self.cache.get_response(key)
+            if cached:
+                # If the key is in the cache, replay the cached response as it was sent.
+                CACHE_HITS.inc()
+                await cached(scope, receive, send)
                 return
+            CACHE_MISSES.inc()
+
+            # If the key is not in the cache, continue and record the response.
+            recorder = ResponseRecorder(send)
+            await self.app(scope, receive, recorder.send)
 
-            # If the key is not in the cache, continue.
-            await self.app(scope, receive, cache_response)
+            # Only successful responses are cached so that a failed request is attempted again.
+            if recorder.status == 200:
+                await self.cache.set_response(key, recorder.response)
 
         # Do nothing if the scope type is not http.
         else:
@@ -0,0 +1,40 @@
+import time
+
+from starlette.types import ASGIApp, Message, Scope, Receive, Send
+
+from app.utils.metrics import REQUEST_DURATION
+
+
+class RequestMetricsMiddleware:
+    """A middleware that records the time to answer each request by status code.
+
+    Attributes:
+        app: ASGI application.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def record_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, record_status)
+        finally:
+            REQUEST_DURATION.labels(status).observe(time.perf_counter() - start)
@@ -1,10 +1,9 @@
 from datetime import datetime
-from starlette.requests import Request
 from starlette.types import ASGIApp, Scope, Receive, Send
 
 from app.report import DB
 from app.report.models import RequestReport
-from app.utils.helper import get_bandchain_params_with_type
+from app.utils.helper import get_bandchain_params_from_scope
 
 
 class RequestReportMiddleware:
@@ -27,21 +26,21 @@ class RequestReportMiddleware:
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] == "http":
-            request = Request(scope)
-            bandchain_params = get_bandchain_params_with_type(request.headers)
+            bandchain_params = get_bandchain_params_from_scope(scope)
+            client = scope.get("client")
 
             report = RequestReport(
-                user_ip=request.client.host,
-                reporter_address=bandchain_params.get("reporter", None),
-                validator_address=bandchain_params.get("validator", None),
-                request_id=bandchain_params.get("request_id", None),
-                data_source_id=bandchain_params.get("data_source_id", None),
-                external_id=bandchain_params.get("external_id", None),
+                user_ip=client[0] if client else None,
+                reporter_address=bandchain_params.reporter,
+                validator_address=bandchain_params.validator,
+                request_id=bandchain_params.request_id,
+                data_source_id=bandchain_params.data_source_id,
+                external_id=bandchain_params.external_id,
                 created_at=datetime.utcnow(),
             )
 
             await self.app(scope, receive, send)
-            self.db.save(report)
+            await self.db.save(report)
         else:
             # Do nothing if the scope type is not http.
             await self.app(scope, receive, send)
@@ -0,0 +1,46 @@
+import time
+
+from starlette.types import ASGIApp, Message, Scope, Receive, Send
+
+from app.utils.helper import get_bandchain_params_from_scope
+from app.utils.tracing import SlowTraces, start_trace
+
+
+class TracingMiddleware:
+    """A middleware that traces each request, answers with its spans in a `Server-Timing` header, and keeps the
+    traces of the slowest requests.
+
+    Attributes:
+        app: ASGI application.
+        slow_traces: Traces of the slowest requests.
+    """
+
+    def __init__(self, app: ASGIApp, slow_traces: SlowTraces) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application.
+            slow_traces: Traces of the slowest requests.
+        """
+        self.app = app
+        self.slow_traces = slow_traces
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = start_trace(scope.get("root_path", "") + scope["path"], get_bandchain_params_from_scope(scope))
+
+        async def add_server_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                headers = [*message.get("headers", []), (b"server-timing", trace.server_timing())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, add_server_timing)
+        finally:
+            trace.duration = time.perf_counter() - trace.start
+            self.slow_traces.add(trace)
@@ -1,18 +1,22 @@
+import time
 from datetime import datetime
-from typing import Any
+from typing import Any, Mapping, Optional
 
 from httpx import AsyncClient, HTTPStatusError
-from starlette.requests import Request
 from starlette.responses import JSONResponse
-from starlette.types import ASGIApp, Scope, Receive, Send
+from starlette.types import ASGIApp, Message, Scope, Receive, Send
 
+from adapter import codec
 from app.exceptions import VerificationFailedError
 from app.report.db import DB
 from app.report.models import VerifyReport
+from app.utils.cache import VerificationCache
 from app.utils.helper import (
     add_max_delay_param,
-    get_bandchain_params,
+    get_bandchain_params_from_scope,
 )
+from app.utils.metrics import VERIFY_DURATION
+from app.utils.tracing import span
 
 
 class VerifyRequestMiddleware:
@@ -23,6 +27,7 @@ class VerifyRequestMiddleware:
         max_verification_delay: int,
         allowed_data_source_ids: list[int],
         report_db: DB = None,
+        verify_cache: Optional[VerificationCache] = None,
     ) -> None:
         self.app = app
         self.verify_url = verify_url
@@ -30,10 +35,40 @@ class VerifyRequestMiddleware:
         self.report_db = report_db
         self.client = AsyncClient()
         self.allowed_ds_ids = allowed_data_source_ids
+        self.verify_cache = verify_cache
 
-    def report(self, report: VerifyReport):
+    async def verify(self, params: Mapping[str, Any]) -> (bool, int):
+        """Verifies the request with the verify endpoint, or with the cached outcome of a previous verification.
+
+        Args:
+            params: BandChain parameters of the request.
+
+        Returns:
+            Whether the request is delayed and its data source id.
+        """
+        if self.verify_cache and (outcome := await self.verify_cache.get(params)):
+            return outcome
+
+        # Check if request is valid from verify endpoint
+        res = await self.client.get(
+            self.verify_url,
+            params=add_max_delay_param(dict(params), self.max_verification_delay),
+        )
+        res.raise_for_status()
+
+        body = codec.loads(res.content)
+
+        # Attempt to parse response from verify endpoint, if not possible, raise VerificationFailedError
+        is_delay, ds_id = self.parse_verify_response(body)
+
+        if self.verify_cache:
+            await self.verify_cache.set(params, is_delay, ds_id)
+
+        return is_delay, ds_id
+
+    async def report(self, report: VerifyReport):
         if self.report_db:
-            self.report_db.save(report)
+            await self.report_db.save(report)
 
     @staticmethod
     def parse_verify_response(body: dict[str, Any]) -> (bool, int):
@@ -69,29 +104,33 @@ class VerifyRequestMiddleware:
                 created_at=datetime.utcnow(),
             )
             current_status = None
-            try:
-                # Get the request from scope
-                request = Request(scope)
+            started = False
 
-                # Check if request is valid from verify endpoint
-                res = await self.client.get(
-                    self.verify_url,
-                    params=add_max_delay_param(get_bandchain_params(request.headers), self.max_verification_delay),
-                )
-                res.raise_for_status()
+            async def track_response(message: Message) -> None:
+                nonlocal started
+                started = started or message["type"] == "http.response.start"
+                await send(message)
 
-                body = res.json()
-
-                # Attempt to parse response from verify endpoint, if not possible, raise VerificationFailedError
-                is_delay, ds_id = self.parse_verify_response(body)
+            try:
+                outcome, start = "error", time.perf_counter()
+                try:
+                    # Check if request is valid
+                    with span("verify"):
+                        is_delay, ds_id = await self.verify(get_bandchain_params_from_scope(scope).raw)
 
-                # Check if request is in allowed data source ids, if not, raise error and save report
-                self.check_request_validity(ds_id)
+                    # Check if request is in allowed data source ids, if not, raise error and save report
+                    self.check_request_validity(ds_id)
+                    outcome = "allowed"
+                except (VerificationFailedError, HTTPStatusError):
+                    outcome = "rejected"
+                    raise
+                finally:
+                    VERIFY_DURATION.labels(outcome).observe(time.perf_counter() - start)
 
                 # TODO: handle case for is_delay
                 report.is_delay = is_delay
                 # If request is not delayed, return response from request
-                await self.app(scope, receive, send)
+                await self.app(scope, receive, track_response)
                 return
             except VerificationFailedError as e:
                 report.response_code = e.status_code
@@ -102,6 +141,9 @@ class VerifyRequestMiddleware:
                 report.error_type = e.response.reason_phrase
                 report.error_msg = e.response.text
             except Exception as e:
+                # A streamed response that fails midway has already started and can only be aborted.
+                if started:
+                    raise
                 report.response_code = 500
                 report.error_type = "Internal Server Error"
                 report.error_msg = f"{e.__class__.__name__}: {(str(e))}"
@@ -114,7 +156,7 @@ class VerifyRequestMiddleware:
 
                 # Save the report if report_db is provided
                 if self.report_db:
-                    self.report(report)
+                    await self.report(report)
         else:
             # Do nothing if the scope is not http.
             await self.app(scope, receive, send)
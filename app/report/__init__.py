@@ -1,2 +1,3 @@
 from .db import DB
 from .db_helper import init_db
+from .writer import ReportWriter
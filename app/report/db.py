@@ -4,31 +4,36 @@ from typing import Optional, Callable
 from motor import motor_asyncio
 
 from app.report.models import Report
+from app.report.writer import ReportWriter
 
 
 class DB:
     """A MongoDB wrapper class for storing Reports.
 
     Attributes:
-        report: AsyncIOMotorClient instance to connect with MongoDB and get the "report" collection.
+        report: The "report" collection of the database.
+        writer: Background writer that saves reports in batches. None to save each report directly.
     """
 
     def __init__(
         self,
-        mongo_db_url: str,
+        client: motor_asyncio.AsyncIOMotorClient,
         db_name: str,
         report_class: Callable[..., Report],
         *,
         expiration_time: Optional[int] = None,
+        writer: Optional[ReportWriter] = None,
     ) -> None:
-        """Initializes DB with the MongoDB URL and database name.
+        """Initializes DB with the MongoDB client and database name.
 
         Args:
-            mongo_db_url: MongoDB URL.
+            client: MongoDB client, shared by every DB.
             db_name: Database name.
+            writer: Background writer that saves reports in batches.
         """
-        self.report = motor_asyncio.AsyncIOMotorClient(mongo_db_url)[db_name].get_collection("report")
+        self.report = client[db_name].get_collection("report")
         self.report_class = report_class
+        self.writer = writer
 
         if expiration_time:
             self.create_index_for_expiration(expiration_time)
@@ -69,13 +74,18 @@ class DB:
 
         return self.report_class(**latest_request_info[0])
 
-    def save(self, report: Report) -> None:
+    async def save(self, report: Report) -> None:
         """Saves the given report to the database.
 
+        If the DB has a writer, the report is queued and written in a batch by the writer's background task.
+
         Args:
             report: The Report object to be saved.
         """
-        self.report.insert_one(report.to_dict())
+        if self.writer:
+            await self.writer.put(self.report, report.to_dict())
+        else:
+            await self.report.insert_one(report.to_dict())
 
     def create_index_for_expiration(self, expiration_time: int) -> None:
         """Creates an index for the report collection to expire documents after a given time.
@@ -1,31 +1,36 @@
 from logging import Logger
 from typing import Optional, Callable
 
+from motor.motor_asyncio import AsyncIOMotorClient
+
 from app.report.db import DB
 from app.report.models import Report
+from app.report.writer import ReportWriter
 
 
 def init_db(
-    url: Optional[str],
+    client: Optional[AsyncIOMotorClient],
     collection_name: Optional[str],
     log: Logger,
     report_class: Callable[..., Report],
     *,
     expiration_time: Optional[int] = None,
+    writer: Optional[ReportWriter] = None,
 ) -> Optional[DB]:
-    """Initializes the database if the URL and collection name are provided.
+    """Initializes the database if the client and collection name are provided.
 
     Args:
-        url: The URL of the MongoDB instance.
+        client: The MongoDB client shared by every database.
         collection_name: The name of the collection to store reports in.
         log: The logger instance.
         report_class: The report class.
+        writer: The background writer that saves reports in batches.
 
     Returns:
-        The DB instance if the url and collection_name are provided, or None if not.
+        The DB instance if the client and collection_name are provided, or None if not.
     """
-    if url and collection_name:
-        db = DB(url, collection_name, report_class, expiration_time=expiration_time)
+    if client and collection_name:
+        db = DB(client, collection_name, report_class, expiration_time=expiration_time, writer=writer)
         log.info(f'DB: "{report_class.__name__}" will be stored in MongoDB collection: "{collection_name}".')
         return db
     else:
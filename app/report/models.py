@@ -9,10 +9,13 @@ class BaseModel(PydanticBaseModel):
     def to_dict(self) -> dict[str, Any]:
         """Converts the model to a dictionary.
 
+        Reports have no nested models, so their fields are copied as is instead of with pydantic's recursive
+        `dict`, which is several times slower and runs before every insert.
+
         Returns:
             The Model as a dictionary.
         """
-        return self.dict(exclude_none=True)
+        return {k: v for k, v in self.__dict__.items() if v is not None}
 
     class Config:
         orm_mode = True
@@ -21,6 +24,7 @@ class BaseModel(PydanticBaseModel):
 class GatewayInfo(BaseModel):
     allow_data_source_ids: list[int]
     max_delay_verification: int
+    circuit_breakers: dict[str, str] = {}
 
 
 class Report(BaseModel):
@@ -0,0 +1,150 @@
+import asyncio
+from collections import defaultdict
+from logging import Logger
+from typing import Any, Literal, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+QUEUE_POLICIES = Literal["drop", "block"]
+
+
+class ReportWriter:
+    """A background writer that saves reports to MongoDB in batches.
+
+    Saving a report only appends it to a bounded queue. A background task flushes the queue with `insert_many`
+    whenever a batch is full or the flush interval has elapsed.
+
+    Attributes:
+        max_queue_size: Maximum number of reports waiting to be written.
+        batch_size: Maximum number of reports written in a single flush.
+        flush_interval: Maximum time in seconds a report waits in the queue before it is written.
+        policy: What to do when the queue is full. "drop" drops the report, "block" waits for space in the queue.
+        log: Logger to report write failures to.
+        queued: Number of reports added to the queue.
+        flushed: Number of reports written to the database.
+        dropped: Number of reports dropped because the queue was full.
+        failed: Number of reports that failed to be written.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        policy: QUEUE_POLICIES = "drop",
+        log: Optional[Logger] = None,
+    ) -> None:
+        """Initializes ReportWriter with its queue and batching configuration.
+
+        Args:
+            max_queue_size: Maximum number of reports waiting to be written.
+            batch_size: Maximum number of reports written in a single flush.
+            flush_interval: Maximum time in seconds a report waits in the queue before it is written.
+            policy: What to do when the queue is full, either "drop" or "block".
+            log: Logger to report write failures to.
+        """
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.log = log
+        self.queued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Future] = None
+        self._batch: list[tuple[AsyncIOMotorCollection, dict[str, Any]]] = []
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of reports waiting to be written."""
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self) -> None:
+        """Starts the background task flushing the queue."""
+        if self._task is None:
+            self._queue = self._queue or asyncio.Queue(maxsize=self.max_queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the background task after writing every report left in the queue."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # Finish the flush the task was in, then write the batch it was collecting and everything left in the queue.
+        if self._flushing is not None:
+            await self._flushing
+            self._flushing = None
+        batch, self._batch = self._batch, []
+        await self._flush(batch)
+        while not self._queue.empty():
+            await self._flush(self._take(self.batch_size))
+
+    async def put(self, collection: AsyncIOMotorCollection, document: dict[str, Any]) -> None:
+        """Adds a report to the queue.
+
+        Args:
+            collection: Collection to write the report to.
+            document: The report as a dictionary.
+        """
+        self.start()
+        if self.policy == "block":
+            await self._queue.put((collection, document))
+        else:
+            try:
+                self._queue.put_nowait((collection, document))
+            except asyncio.QueueFull:
+                self.dropped += 1
+                return
+
+        self.queued += 1
+
+    def _take(self, n: int) -> list[tuple[AsyncIOMotorCollection, dict[str, Any]]]:
+        batch = []
+        while len(batch) < n and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for the first report, then for the batch to fill up until the flush interval has elapsed.
+            self._batch.append(await self._queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(self._batch) < self.batch_size and (remaining := deadline - loop.time()) > 0:
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+                self._batch.extend(self._take(self.batch_size - len(self._batch)))
+
+            # The flush is shielded, so that stopping the task lets the batch finish writing instead of losing it.
+            batch, self._batch = self._batch, []
+            self._flushing = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._flushing)
+
+    async def _flush(self, batch: list[tuple[AsyncIOMotorCollection, dict[str, Any]]]) -> None:
+        if not batch:
+            return
+
+        documents_by_collection = defaultdict(list)
+        for collection, document in batch:
+            documents_by_collection[collection].append(document)
+
+        for collection, documents in documents_by_collection.items():
+            try:
+                await collection.insert_many(documents, ordered=False)
+                self.flushed += len(documents)
+            except Exception as e:
+                self.failed += len(documents)
+                if self.log:
+                    self.log.error(f"DB: failed to write {len(documents)} reports: {e}")
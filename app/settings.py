@@ -3,8 +3,10 @@ from typing import Literal
 from pydantic import BaseSettings, HttpUrl
 
 MODES = Literal["production", "development"]
+REPORT_QUEUE_POLICIES = Literal["drop", "block"]
 LOG_LEVELS = Literal["CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG", "NOTSET"]
-CACHE_TYPES = Literal["local", "redis"]
+CACHE_TYPES = Literal["local", "shm", "redis", "tiered", "none"]
+DEDUP_MODES = Literal["local", "redis"]
 
 
 class Settings(BaseSettings):
@@ -15,29 +17,76 @@ class Settings(BaseSettings):
     VERIFY_REQUEST_URL: HttpUrl
     ALLOWED_DATA_SOURCE_IDS: list[int]
     MAX_DELAY_VERIFICATION: int = 0
+    VERIFY_CACHE_TTL: str = "10m"
+    VERIFY_CACHE_SIZE: int = 10000
 
     # Cache
     CACHE_TYPE: CACHE_TYPES = "local"
     TTL: str = "10m"
     PENDING_TIMEOUT: str = "30s"
+    # Secret of the cache key digests, and namespace of the keys, by default the adapter type and name
+    CACHE_KEY_SECRET: str = ""
+    CACHE_KEY_NAMESPACE: str = None
 
-    # For local cache
+    # Request deduplication, "redis" also deduplicates requests across replicas
+    DEDUP_MODE: DEDUP_MODES = "local"
+    DEDUP_LEASE_TTL: str = "10s"
+
+    # For local cache, bounded by a number of entries and, optionally, by the bytes of its responses
     CACHE_SIZE: int = 1000
+    CACHE_MAX_BYTES: int = None
+
+    # For shared memory cache, shared by the worker processes using the same path
+    SHM_CACHE_PATH: str = "/dev/shm/pds-gateway"
+    SHM_CACHE_SLOT_SIZE: int = 4096
+    # Verification outcomes are small, so they get their own table with small slots
+    SHM_VERIFY_CACHE_SLOT_SIZE: int = 128
 
     # For redis cache
     REDIS_URL: str = None
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_MAX_CONNECTIONS: int = 50
+
+    # For tiered cache, an in-process cache in front of the redis cache, its TTL is capped at half of the redis TTL
+    CACHE_L1_SIZE: int = 1000
+    CACHE_L1_TTL: str = "5s"
 
     # Adapter
     ADAPTER_TYPE: str
     ADAPTER_NAME: str
 
+    # Adapter HTTP client
+    HTTP_TIMEOUT: str = "5s"
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: str = "5s"
+    HTTP2: bool = False
+
+    # Adapter quota in requests per minute, unlimited if not set
+    RATE_LIMIT_PER_MINUTE: float = None
+
+    # Background price prefetching for standard_crypto_price adapters, requires PRICE_CACHE_MAX_AGE
+    PRICE_PREFETCH: bool = False
+    PRICE_PREFETCH_MIN_INTERVAL: str = "5s"
+    PRICE_PREFETCH_MAX_INTERVAL: str = "30s"
+    PRICE_PREFETCH_CHUNK_SIZE: int = 100
+    PRICE_PREFETCH_HOT_RATE: float = 1.0
+
+    # Number of the slowest request traces kept for /reports/slow, 0 disables tracing
+    SLOW_TRACE_BUFFER_SIZE: int = 100
+
     # Database
     MONGO_DB_URL: str = None
     COLLECTION_DB_NAME: str = None
     MONGO_DB_EXPIRATION_TIME: int = None
 
+    # Report writer
+    REPORT_QUEUE_SIZE: int = 10000
+    REPORT_BATCH_SIZE: int = 100
+    REPORT_FLUSH_INTERVAL: str = "1s"
+    REPORT_QUEUE_POLICY: REPORT_QUEUE_POLICIES = "drop"
+
     class Config:
         env_file = ".env"
 
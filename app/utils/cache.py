@@ -1,10 +1,20 @@
-import json
-
+import asyncio
+import heapq
+import secrets
+import sys
+import time
 from abc import abstractmethod
-from typing import Optional, Any
+from logging import Logger
+from typing import Optional, Any, Iterable, Mapping
 
-from cachetools import TTLCache
 from redis import Redis
+from redis.asyncio import ConnectionPool, Redis as AsyncRedis
+
+from adapter import codec
+from app.utils.keys import CacheKeys
+from app.utils.metrics import CACHE_TIER_REQUESTS
+from app.utils.response import RecordedResponse
+from app.utils.shm import SharedMemoryTable
 
 
 class Cache:
@@ -31,30 +41,96 @@ class Cache:
         pass
 
 
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "version")
+
+    def __init__(self, value: Any, size: int, expires_at: float, version: int) -> None:
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.version = version
+
+
+def sizeof(value: Any) -> int:
+    """Estimates the bytes of a cached value from the bytes it holds.
+
+    Args:
+        value: Cached value, a response or a JSON value.
+
+    Returns:
+        The size of the response's body and headers, or of the value encoded as JSON.
+    """
+    if isinstance(value, RecordedResponse):
+        return len(value.body) + sum(len(name) + len(header) for name, header in value.headers)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    try:
+        return len(codec.dumps(value))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
 class LocalCache(Cache):
-    """A local cache.
+    """A local cache bounded by a number of entries and, optionally, by the bytes of its entries.
+
+    Each entry is counted as the bytes of its value plus `ENTRY_OVERHEAD`. When the cache is full, expired entries
+    are dropped first, and then entries are evicted with GreedyDual-Size: every entry has a priority of L + 1 / size,
+    set when it is set or hit, where L is the priority of the last evicted entry, and the entry of lowest priority
+    is evicted. Large entries are evicted before small ones, and entries not hit for a while before recent ones
+    since L rises with every eviction, so a few large responses cannot push out many small ones.
 
     Attributes:
-        cache: TTLCache instance to store the data.
+        max_cache_size: Maximum number of entries.
+        max_bytes: Maximum bytes of the entries. None for no limit.
+        ttl: Time to live in seconds for each item.
+        entries: Entries by key, in the order they were set.
+        bytes: Bytes of the entries.
+        evictions: Number of entries evicted to make room for others.
     """
 
-    def __init__(self, max_cache_size: float, ttl: float) -> None:
+    # Approximate bytes taken by an entry besides its value: its key, its object and its slots in the dict and heap.
+    ENTRY_OVERHEAD = 200
+
+    def __init__(self, max_cache_size: float, ttl: float, max_bytes: Optional[int] = None) -> None:
         """Initializes LocalCache with the maximum size and TTL.
 
         Args:
-            max_cache_size: Maximum size.
+            max_cache_size: Maximum number of entries.
             ttl: Time to live in seconds for each item.
+            max_bytes: Maximum bytes of the entries. None for no limit.
         """
-        self.cache = TTLCache(maxsize=max_cache_size, ttl=ttl)
+        self.max_cache_size = max_cache_size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries: dict[str | int, _Entry] = {}
+        self.bytes = 0
+        self.evictions = 0
+        self._inflation = 0.0
+        self._version = 0
+        # Priority, version and key of the entries, including outdated ones which are skipped when popped.
+        self._heap: list[tuple[float, int, str | int]] = []
 
     def set(self, key: str | int, value: dict) -> None:
-        """Sets the cached data.
+        """Sets the cached data. Values larger than `max_bytes` are not cached.
 
         Args:
             key: Key to set the value to.
             value: Value to set.
         """
-        self.cache[key] = value
+        now = time.monotonic()
+        self.delete(key)
+        self._expire(now)
+
+        size = sizeof(value) + self.ENTRY_OVERHEAD
+        if self.max_bytes is not None and size > self.max_bytes:
+            return None
+
+        entry = self.entries[key] = _Entry(value, size, now + self.ttl, 0)
+        self.bytes += size
+        self._prioritize(key, entry)
+        while len(self.entries) > self.max_cache_size or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            self._evict()
+        return None
 
     def get(self, key: str | int) -> Optional[dict]:
         """Gets the cached data.
@@ -65,7 +141,75 @@ class LocalCache(Cache):
         Returns:
             Value from the middleware. None if the key is not found.
         """
-        return self.cache.get(key, None)
+        if (entry := self.entries.get(key)) is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self.delete(key)
+            return None
+
+        self._prioritize(key, entry)
+        return entry.value
+
+    def delete(self, key: str | int) -> None:
+        """Deletes the cached data of a key.
+
+        Args:
+            key: Key to delete the value of.
+        """
+        if (entry := self.entries.pop(key, None)) is not None:
+            self.bytes -= entry.size
+
+    def clear(self) -> None:
+        """Deletes all the cached data."""
+        self.entries.clear()
+        self._heap.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Gets the size of the cache and the number of evictions.
+
+        Returns:
+            The number of entries and bytes, their limits and the number of evictions.
+        """
+        self._expire(time.monotonic())
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_cache_size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+    def _prioritize(self, key: str | int, entry: _Entry) -> None:
+        self._version += 1
+        entry.version = self._version
+        heapq.heappush(self._heap, (self._inflation + 1 / entry.size, entry.version, key))
+
+        # Rebuild the heap once most of it is outdated, so that it does not grow with every hit.
+        if len(self._heap) > 2 * len(self.entries) + 64:
+            self._heap = [
+                (priority, version, key)
+                for priority, version, key in self._heap
+                if (current := self.entries.get(key)) is not None and current.version == version
+            ]
+            heapq.heapify(self._heap)
+
+    def _evict(self) -> None:
+        while self._heap:
+            priority, version, key = heapq.heappop(self._heap)
+            if (entry := self.entries.get(key)) is not None and entry.version == version:
+                self._inflation = priority
+                self.delete(key)
+                self.evictions += 1
+                return
+
+    def _expire(self, now: float) -> None:
+        # Every entry lives as long, so the entries set first expire first.
+        while self.entries:
+            key, entry = next(iter(self.entries.items()))
+            if entry.expires_at > now:
+                return
+            self.delete(key)
 
 
 class RedisCache(Cache):
@@ -95,14 +239,12 @@ class RedisCache(Cache):
             key: Key to set the value to.
             value: Value to set.
         """
-        # Enforce value type to be a dict to prevent error with `json.dump`.
+        # Enforce value type to be a dict to prevent error when encoding it.
         if not isinstance(value, dict):
             raise TypeError(f"Value must be a dict, not {type(value)}")
 
-        # Convert value type from dict to JSON string before setting to Redis.
-        saved = self.redis.set(key, json.dumps(value))
-        if saved:
-            self.redis.expire(key, self.ttl)
+        # Encode the dict as JSON before setting it with its TTL in a single command.
+        self.redis.set(key, codec.dumps(value), ex=self.ttl)
 
     def get(self, key: str | int) -> Optional[dict]:
         """Get a value from the cache
@@ -114,6 +256,587 @@ class RedisCache(Cache):
             Value from the middleware. None if the key is not found.
         """
         if value := self.redis.get(key):
-            return json.loads(value)
+            return codec.loads(value)
+
+        return None
+
+
+class AsyncCache:
+    """A cache that is awaited from the ASGI middlewares so that cache I/O does not block the event loop."""
+
+    @abstractmethod
+    async def set(self, key: str | int, value: dict) -> None:
+        """Set a value to the cache.
+
+        Args:
+            key: Key to set the value to.
+            value: Value to set.
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, key: str | int) -> Optional[dict]:
+        """Get a value from the cache.
+
+        Args:
+            key: Key to get the value from.
+
+        Returns:
+            Value from the middleware.
+        """
+        pass
+
+    @abstractmethod
+    async def set_response(self, key: str | int, response: RecordedResponse) -> None:
+        """Set a complete response to the cache.
+
+        Args:
+            key: Key to set the response to.
+            response: Response to set.
+        """
+        pass
+
+    @abstractmethod
+    async def get_response(self, key: str | int) -> Optional[RecordedResponse]:
+        """Get a complete response from the cache.
+
+        Args:
+            key: Key to get the response from.
+
+        Returns:
+            The response. None if the key is not found.
+        """
+        pass
+
+    async def set_many(self, items: Mapping[str | int, dict]) -> None:
+        """Set multiple values to the cache.
+
+        Args:
+            items: Mapping of keys to the values to set.
+        """
+        for key, value in items.items():
+            await self.set(key, value)
+
+    async def get_many(self, keys: Iterable[str | int]) -> list[Optional[dict]]:
+        """Get multiple values from the cache.
+
+        Args:
+            keys: Keys to get the values from.
+
+        Returns:
+            Values in the same order as the keys. None for each key that is not found.
+        """
+        return [await self.get(key) for key in keys]
+
+    def start(self) -> None:
+        """Starts the background work of the cache, if any."""
+        pass
+
+    async def close(self) -> None:
+        """Releases the resources held by the cache."""
+        pass
+
+
+class AsyncCacheWrapper(AsyncCache):
+    """Exposes an in-process cache through the AsyncCache interface.
+
+    Attributes:
+        cache: The wrapped cache.
+    """
+
+    def __init__(self, cache: Cache) -> None:
+        """Initializes AsyncCacheWrapper with the cache to wrap.
+
+        Args:
+            cache: The wrapped cache.
+        """
+        self.cache = cache
+
+    async def set(self, key: str | int, value: dict) -> None:
+        """Sets the cached data.
+
+        Args:
+            key: Key to set the value to.
+            value: Value to set.
+        """
+        self.cache.set(key, value)
+
+    async def get(self, key: str | int) -> Optional[dict]:
+        """Gets the cached data.
+
+        Args:
+            key: Key to get the value from.
+
+        Returns:
+            Value from the middleware. None if the key is not found.
+        """
+        return self.cache.get(key)
+
+    async def set_response(self, key: str | int, response: RecordedResponse) -> None:
+        """Sets a complete response. The response is kept as is, so that a hit replays it without a copy.
+
+        Args:
+            key: Key to set the response to.
+            response: Response to set.
+        """
+        self.cache.set(key, response)
+
+    async def get_response(self, key: str | int) -> Optional[RecordedResponse]:
+        """Gets a complete response.
+
+        Args:
+            key: Key to get the response from.
+
+        Returns:
+            The response. None if the key is not found.
+        """
+        return self.cache.get(key)
+
+
+class AsyncRedisCache(AsyncCache):
+    """A Redis-based cache using the asyncio Redis client.
+
+    Attributes:
+        pool: Connection pool shared by all commands.
+        redis: Asyncio Redis client.
+        ttl: Time to live in seconds.
+    """
+
+    def __init__(self, url: str, port: int = 6379, db: int = 0, ttl: int = 60, max_connections: int = 50) -> None:
+        """Initializes AsyncRedisCache with the Redis URL, port, database, TTL and connection pool size.
+
+        Args:
+            url: Redis URL.
+            port: Redis port.
+            db: Redis database.
+            ttl: Time to live in seconds.
+            max_connections: Maximum number of connections in the pool.
+        """
+        self.pool = ConnectionPool(host=url, port=port, db=db, max_connections=max_connections)
+        self.redis = AsyncRedis(connection_pool=self.pool)
+        self.ttl = ttl
+
+    async def set(self, key: str | int, value: dict) -> None:
+        """Set a value to the cache with a single `SET ... EX` command.
+
+        Args:
+            key: Key to set the value to.
+            value: Value to set.
+        """
+        # Enforce value type to be a dict to prevent error when encoding it.
+        if not isinstance(value, dict):
+            raise TypeError(f"Value must be a dict, not {type(value)}")
+
+        await self.redis.set(key, codec.dumps(value), ex=self.ttl)
+
+    async def get(self, key: str | int) -> Optional[dict]:
+        """Get a value from the cache
+
+        Args:
+            key: Key to get the value from.
+
+        Returns:
+            Value from the middleware. None if the key is not found.
+        """
+        if value := await self.redis.get(key):
+            return codec.loads(value)
+
+        return None
+
+    async def set_response(self, key: str | int, response: RecordedResponse) -> None:
+        """Set a complete response to the cache as its encoded bytes.
+
+        Args:
+            key: Key to set the response to.
+            response: Response to set.
+        """
+        await self.redis.set(key, response.encode(), ex=self.ttl)
+
+    async def get_response(self, key: str | int) -> Optional[RecordedResponse]:
+        """Get a complete response from the cache.
+
+        Args:
+            key: Key to get the response from.
+
+        Returns:
+            The response. None if the key is not found or does not hold a response.
+        """
+        if value := await self.redis.get(key):
+            try:
+                return RecordedResponse.decode(value)
+            except ValueError:
+                return None
+
+        return None
+
+    async def set_many(self, items: Mapping[str | int, dict]) -> None:
+        """Set multiple values to the cache in a single pipelined round trip.
+
+        Args:
+            items: Mapping of keys to the values to set.
+        """
+        for value in items.values():
+            if not isinstance(value, dict):
+                raise TypeError(f"Value must be a dict, not {type(value)}")
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, codec.dumps(value), ex=self.ttl)
+            await pipe.execute()
+
+    async def get_many(self, keys: Iterable[str | int]) -> list[Optional[dict]]:
+        """Get multiple values from the cache with a single `MGET` command.
+
+        Args:
+            keys: Keys to get the values from.
+
+        Returns:
+            Values in the same order as the keys. None for each key that is not found.
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+
+        return [codec.loads(value) if value else None for value in await self.redis.mget(keys)]
+
+    async def close(self) -> None:
+        """Closes the client and disconnects every connection in the pool."""
+        await self.redis.close()
+        await self.pool.disconnect()
+
+
+class TieredCache(AsyncCache):
+    """A Redis cache with the entries recently used by the process kept in process.
+
+    Reads look up the in-process L1 first and fall through to Redis, the L2, populating L1 on a hit. Writes go to
+    both tiers, then publish the key on a Redis channel so that the other processes drop it from their L1. L1
+    entries live at most half as long as L2 entries, so that a value read from L2 just before it expires is not
+    served much longer than it is in L2.
+
+    Attributes:
+        name: Name of the cache in the metrics and the invalidation channel.
+        l1: In-process cache, holding the values and responses as is.
+        l2: Redis cache.
+        channel: Redis channel the keys of the written entries are published on.
+        sender: Id of this cache in the published messages, so that it ignores its own.
+        log: Logger to report invalidation failures to.
+    """
+
+    def __init__(
+        self,
+        l2: AsyncRedisCache,
+        l1_size: int,
+        l1_ttl: float,
+        name: str = "response",
+        log: Optional[Logger] = None,
+        l1_max_bytes: Optional[int] = None,
+    ) -> None:
+        """Initializes TieredCache with its tiers.
+
+        Args:
+            l2: Redis cache.
+            l1_size: Maximum number of entries in L1.
+            l1_ttl: Time to live in seconds of the entries in L1, capped at half of the TTL of L2.
+            name: Name of the cache.
+            log: Logger to report invalidation failures to.
+            l1_max_bytes: Maximum bytes of the entries in L1. None for no limit.
+        """
+        self.name = name
+        self.l1 = LocalCache(l1_size, min(l1_ttl, l2.ttl / 2), l1_max_bytes)
+        self.l2 = l2
+        self.channel = f"pds:invalidate:{name}"
+        self.sender = secrets.token_hex(8)
+        self.log = log
+        self._listener: Optional[asyncio.Task] = None
+        self._l1_hits = CACHE_TIER_REQUESTS.labels(name, "l1", "hit")
+        self._l1_misses = CACHE_TIER_REQUESTS.labels(name, "l1", "miss")
+        self._l2_hits = CACHE_TIER_REQUESTS.labels(name, "l2", "hit")
+        self._l2_misses = CACHE_TIER_REQUESTS.labels(name, "l2", "miss")
+
+    async def _lookup(self, key: str | int, get_l2) -> Any:
+        if (value := self.l1.get(str(key))) is not None:
+            self._l1_hits.inc()
+            return value
+        self._l1_misses.inc()
+
+        if (value := await get_l2(key)) is None:
+            self._l2_misses.inc()
+            return None
+        self._l2_hits.inc()
+        self.l1.set(str(key), value)
+        return value
+
+    async def _invalidate(self, keys: Iterable[str | int]) -> None:
+        async with self.l2.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.publish(self.channel, f"{self.sender}:{key}")
+            await pipe.execute()
+
+    async def set(self, key: str | int, value: dict) -> None:
+        """Set a value to both tiers.
+
+        Args:
+            key: Key to set the value to.
+            value: Value to set.
+        """
+        await self.l2.set(key, value)
+        self.l1.set(str(key), value)
+        await self._invalidate([key])
+
+    async def get(self, key: str | int) -> Optional[dict]:
+        """Get a value from L1, or from L2 if it is not in L1.
+
+        Args:
+            key: Key to get the value from.
+
+        Returns:
+            Value from the middleware. None if the key is not found.
+        """
+        return await self._lookup(key, self.l2.get)
+
+    async def set_response(self, key: str | int, response: RecordedResponse) -> None:
+        """Set a complete response to both tiers.
+
+        Args:
+            key: Key to set the response to.
+            response: Response to set.
+        """
+        await self.l2.set_response(key, response)
+        self.l1.set(str(key), response)
+        await self._invalidate([key])
+
+    async def get_response(self, key: str | int) -> Optional[RecordedResponse]:
+        """Get a complete response from L1, or from L2 if it is not in L1.
+
+        Args:
+            key: Key to get the response from.
+
+        Returns:
+            The response. None if the key is not found.
+        """
+        return await self._lookup(key, self.l2.get_response)
+
+    async def set_many(self, items: Mapping[str | int, dict]) -> None:
+        """Set multiple values to both tiers.
+
+        Args:
+            items: Mapping of keys to the values to set.
+        """
+        await self.l2.set_many(items)
+        for key, value in items.items():
+            self.l1.set(str(key), value)
+        await self._invalidate(items)
+
+    async def get_many(self, keys: Iterable[str | int]) -> list[Optional[dict]]:
+        """Get multiple values from L1, and the values not in L1 from L2 in a single round trip.
+
+        Args:
+            keys: Keys to get the values from.
+
+        Returns:
+            Values in the same order as the keys. None for each key that is not found.
+        """
+        keys = list(keys)
+        values = [self.l1.get(str(key)) for key in keys]
+        misses = [i for i, value in enumerate(values) if value is None]
+        self._l1_hits.inc(len(keys) - len(misses))
+        self._l1_misses.inc(len(misses))
+        if not misses:
+            return values
+
+        for i, value in zip(misses, await self.l2.get_many([keys[i] for i in misses])):
+            if value is not None:
+                values[i] = value
+                self.l1.set(str(keys[i]), value)
+        hits = sum(values[i] is not None for i in misses)
+        self._l2_hits.inc(hits)
+        self._l2_misses.inc(len(misses) - hits)
+        return values
+
+    def start(self) -> None:
+        """Starts listening to the keys written by the other processes."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.l2.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Keys written while not subscribed were missed, so L1 may hold stale entries.
+                self.l1.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        sender, _, key = message["data"].decode().partition(":")
+                        if sender != self.sender:
+                            self.l1.delete(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.log:
+                    self.log.error(f"CACHE: invalidation of {self.name} cache interrupted: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
 
+    async def close(self) -> None:
+        """Stops listening and closes L2."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.l2.close()
+
+
+class SharedMemoryCache(AsyncCache):
+    """A cache in shared memory, shared by every worker process of the host.
+
+    Values are stored as encoded bytes, like in Redis, in a fixed-size table mapped by each process. Values too
+    long for a slot of the table are not cached.
+
+    Attributes:
+        table: Shared memory table storing the values.
+        ttl: Time to live in seconds.
+    """
+
+    def __init__(self, path: str, size: int, ttl: float, slot_size: int = 4096) -> None:
+        """Initializes SharedMemoryCache with the file of the table, its size and the TTL.
+
+        Args:
+            path: Path of the file of the table, preferably in /dev/shm. Processes using the same path share it.
+            size: Maximum number of values.
+            ttl: Time to live in seconds.
+            slot_size: Size in bytes of each slot of the table.
+        """
+        self.table = SharedMemoryTable(path, size, slot_size)
+        self.ttl = ttl
+
+    async def set(self, key: str | int, value: dict) -> None:
+        """Set a value to the cache.
+
+        Args:
+            key: Key to set the value to.
+            value: Value to set.
+        """
+        # Enforce value type to be a dict to prevent error when encoding it.
+        if not isinstance(value, dict):
+            raise TypeError(f"Value must be a dict, not {type(value)}")
+
+        self.table.set(key, codec.dumps(value), self.ttl)
+
+    async def get(self, key: str | int) -> Optional[dict]:
+        """Get a value from the cache.
+
+        Args:
+            key: Key to get the value from.
+
+        Returns:
+            Value from the middleware. None if the key is not found.
+        """
+        if value := self.table.get(key):
+            return codec.loads(value)
+
+        return None
+
+    async def set_response(self, key: str | int, response: RecordedResponse) -> None:
+        """Set a complete response to the cache as its encoded bytes.
+
+        Args:
+            key: Key to set the response to.
+            response: Response to set.
+        """
+        self.table.set(key, response.encode(), self.ttl)
+
+    async def get_response(self, key: str | int) -> Optional[RecordedResponse]:
+        """Get a complete response from the cache.
+
+        Args:
+            key: Key to get the response from.
+
+        Returns:
+            The response. None if the key is not found or does not hold a response.
+        """
+        if value := self.table.get(key):
+            try:
+                return RecordedResponse.decode(value)
+            except ValueError:
+                return None
+
+        return None
+
+    async def close(self) -> None:
+        """Unmaps the table."""
+        self.table.close()
+
+
+class VerificationCache:
+    """A cache of successful BandChain request verifications.
+
+    Attributes:
+        cache: Cache object storing the verification outcomes.
+        keys: Derivation of the cache keys.
+        hits: Number of verifications found in the cache.
+        misses: Number of verifications not found in the cache.
+    """
+
+    PARAMS = ("chain_id", "validator", "request_id", "external_id", "data_source_id", "reporter", "signature")
+
+    def __init__(self, cache: AsyncCache, keys: Optional[CacheKeys] = None) -> None:
+        """Initializes VerificationCache with the cache to store the verification outcomes in.
+
+        Args:
+            cache: Cache object.
+            keys: Derivation of the cache keys. Keys in the default namespace if None.
+        """
+        self.cache = cache
+        self.keys = keys or CacheKeys()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, params: Mapping[str, Any]) -> str:
+        """Gets the canonical key of BandChain parameters.
+
+        Args:
+            params: BandChain parameters.
+
+        Returns:
+            The key.
+        """
+        return self.keys.key("verify", *(params.get(param, "") for param in self.PARAMS))
+
+    async def get(self, params: Mapping[str, Any]) -> Optional[tuple[bool, int]]:
+        """Gets the verification outcome of BandChain parameters.
+
+        Args:
+            params: BandChain parameters.
+
+        Returns:
+            Whether the request is delayed and its data source id. None if the outcome is not found.
+        """
+        if outcome := await self.cache.get(self.key(params)):
+            self.hits += 1
+            return outcome["is_delay"], outcome["data_source_id"]
+
+        self.misses += 1
         return None
+
+    async def set(self, params: Mapping[str, Any], is_delay: bool, data_source_id: int) -> None:
+        """Sets the verification outcome of BandChain parameters.
+
+        Args:
+            params: BandChain parameters.
+            is_delay: Whether the request is delayed.
+            data_source_id: Data source id of the request.
+        """
+        await self.cache.set(self.key(params), {"is_delay": is_delay, "data_source_id": data_source_id})
+
+    def start(self) -> None:
+        """Starts the background work of the cache, if any."""
+        self.cache.start()
+
+    async def close(self) -> None:
+        """Releases the resources held by the cache."""
+        await self.cache.close()
@@ -1,46 +1,91 @@
 import re
-from typing import Mapping, Any
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Any, Optional
 
+from starlette.types import Scope
 
-def get_bandchain_params(headers: Mapping[str, Any]) -> dict[str, Any]:
-    """Gets BandChain parameters from the header.
+BAND_HEADER_PREFIX = b"band_"
+SCOPE_STATE_KEY = "bandchain_params"
 
-    Args:
-        headers: Header to extract BandChain parameters from.
 
-    Returns:
-        A dictionary containing BandChain's parameters
+@dataclass(frozen=True, slots=True)
+class BandChainParams:
+    """The BandChain parameters of a request, from its `BAND_*` headers.
+
+    Attributes:
+        chain_id: Chain id of BandChain.
+        validator: Address of the validator sending the request.
+        request_id: Id of the BandChain request. None if missing or not an integer.
+        external_id: External id of the data source call. None if missing or not an integer.
+        data_source_id: Id of the data source. None if missing or not an integer.
+        reporter: Address of the reporter of the validator.
+        signature: Signature of the request by the reporter.
+        raw: Every BandChain parameter as a string, by name without the `band_` prefix.
     """
 
-    return {r.group(1): v for k, v in headers.items() if (r := re.search("^band_(.+)", k.lower()))}
+    chain_id: Optional[str] = None
+    validator: Optional[str] = None
+    request_id: Optional[int] = None
+    external_id: Optional[int] = None
+    data_source_id: Optional[int] = None
+    reporter: Optional[str] = None
+    signature: Optional[str] = None
+    raw: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 
-def get_bandchain_params_with_type(headers: Mapping[str, Any]) -> dict[str, Any]:
-    """Gets BandChain parameters with type from the header.
+def get_bandchain_params_from_scope(scope: Scope) -> BandChainParams:
+    """Gets the BandChain parameters of a request, parsing its raw headers on the first call only.
+
+    The parameters are kept in `scope["state"]`, so every middleware and the endpoint (as
+    `request.state.bandchain_params`) share a single parse.
 
     Args:
-        headers: Header to extract BandChain parameters from.
+        scope: ASGI scope of the request, whose header names are lowercase.
 
     Returns:
-        A dictionary containing BandChain's parameters
+        The BandChain parameters.
     """
-    params = get_bandchain_params(headers)
-    for k, v in params.items():
-        if k in ["request_id", "data_source_id", "external_id"]:
-            params[k] = int(v)
+    state = scope.setdefault("state", {})
+    if (params := state.get(SCOPE_STATE_KEY)) is not None:
+        return params
+
+    raw = {
+        name[len(BAND_HEADER_PREFIX) :].decode("latin-1"): value.decode("latin-1")
+        for name, value in scope["headers"]
+        if name.startswith(BAND_HEADER_PREFIX)
+    }
+    params = state[SCOPE_STATE_KEY] = BandChainParams(
+        chain_id=raw.get("chain_id"),
+        validator=raw.get("validator"),
+        request_id=_to_int(raw.get("request_id")),
+        external_id=_to_int(raw.get("external_id")),
+        data_source_id=_to_int(raw.get("data_source_id")),
+        reporter=raw.get("reporter"),
+        signature=raw.get("signature"),
+        raw=MappingProxyType(raw),
+    )
     return params
 
 
-def get_band_signature_hash(headers: Mapping[str, Any]) -> int:
-    """Gets the hash of the band signature from a header
+def get_bandchain_params(headers: Mapping[str, Any]) -> dict[str, Any]:
+    """Gets BandChain parameters from the header.
 
     Args:
-        headers: Header containing band signature
+        headers: Header to extract BandChain parameters from.
 
     Returns:
-        Hash of band signature
+        A dictionary containing BandChain's parameters
     """
-    return hash(headers["BAND_SIGNATURE"])
+
+    return {r.group(1): v for k, v in headers.items() if (r := re.search("^band_(.+)", k.lower()))}
 
 
 def add_max_delay_param(params: dict[str, Any], max_delay_verification: int) -> dict[str, Any]:
@@ -0,0 +1,51 @@
+from hashlib import blake2b
+from typing import Any
+
+# Version of the cached values, bump it when their format changes so that old entries are no longer read.
+KEY_VERSION = 1
+
+
+class CacheKeys:
+    """Derives the keys of cache entries, the same in every process, worker and replica.
+
+    A key is `pds:<namespace>:<kind>:v<version>:<digest>`, where the digest is a 128-bit blake2b digest of the
+    parts identifying the entry. Unlike Python's `hash`, it does not depend on the PYTHONHASHSEED of the process, so
+    replicas sharing a Redis cache find each other's entries, and entries outlive restarts.
+
+    Attributes:
+        namespace: Namespace of the keys, such as the adapter, so that gateways sharing a cache keep apart.
+        version: Version of the cached values.
+        secret: Key of the digest, so that keys cannot be derived without it. Empty for unkeyed digests.
+    """
+
+    def __init__(self, namespace: str = "default", version: int = KEY_VERSION, secret: str = "") -> None:
+        """Initializes CacheKeys with the namespace and version of the keys.
+
+        Args:
+            namespace: Namespace of the keys.
+            version: Version of the cached values.
+            secret: Key of the digest, at most 64 bytes.
+        """
+        self.namespace = namespace
+        self.version = version
+        self.secret = secret.encode()
+        if len(self.secret) > blake2b.MAX_KEY_SIZE:
+            raise Exception(f"CACHE KEY SECRET MUST BE AT MOST {blake2b.MAX_KEY_SIZE} BYTES")
+
+    def key(self, kind: str, *parts: Any) -> str:
+        """Gets the key of a cache entry.
+
+        Args:
+            kind: Kind of the cache, e.g. "request" or "signature".
+            *parts: Values identifying the entry, converted with `str`.
+
+        Returns:
+            The key.
+        """
+        digest = blake2b(digest_size=16, key=self.secret, person=kind.encode()[:16])
+        for part in parts:
+            # Length-prefix every part so that ("ab", "c") and ("a", "bc") get different keys.
+            data = str(part).encode()
+            digest.update(len(data).to_bytes(4, "big"))
+            digest.update(data)
+        return f"pds:{self.namespace}:{kind}:v{self.version}:{digest.hexdigest()}"
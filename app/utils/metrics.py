@@ -0,0 +1,291 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+
+# Latency buckets in seconds, from a local cache hit to a slow provider.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = ((k, str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for k, v in labels.items())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """The base class of metrics in the Prometheus text format.
+
+    Updates are plain attribute increments without locks, which is safe because the gateway updates metrics from a
+    single event loop.
+
+    Attributes:
+        name: Name of the metric.
+        documentation: Help text of the metric.
+        labelnames: Names of the metric's labels.
+    """
+
+    type: str
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Labels, object] = {}
+
+    def labels(self, *values: str):
+        """Gets the child metric of a combination of label values.
+
+        Hot paths should get their children once and keep them, which avoids the lookup.
+
+        Args:
+            values: Label values in the order of the label names.
+
+        Returns:
+            The child metric.
+        """
+        key = tuple(str(v) for v in values)
+        if (child := self._children.get(key)) is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Creates the child metric of a new combination of label values."""
+        pass
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        """Gets the samples of the metric.
+
+        Returns:
+            The name, labels and value of each sample.
+        """
+        pass
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(Metric):
+    """A value that only goes up, like a number of requests."""
+
+    type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increments the counter of a metric without labels."""
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[Sample]:
+        for values, child in self._children.items():
+            yield f"{self.name}_total", dict(zip(self.labelnames, values)), child.value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        # Each observation only increments its own bucket, the buckets are made cumulative when exposed.
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observes the time in seconds the context took."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(Metric):
+    """A distribution of values, like latencies, counted in fixed buckets.
+
+    Attributes:
+        buckets: Upper bounds of the buckets.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Observes a value of a metric without labels."""
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[Sample]:
+        for values, child in self._children.items():
+            labels = dict(zip(self.labelnames, values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, child.sum
+
+
+class CallbackMetric(Metric):
+    """A metric whose values are read from a function when exposed, like the depth of a queue.
+
+    Attributes:
+        function: Function returning the value of each combination of label values.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        function: Callable[[], Dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+        type: str = "gauge",
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+        self.type = type
+
+    def _new_child(self):
+        raise TypeError(f"{self.name} is read from a function and has no child metrics")
+
+    def samples(self) -> Iterator[Sample]:
+        name = f"{self.name}_total" if self.type == "counter" else self.name
+        for values, value in self.function().items():
+            yield name, dict(zip(self.labelnames, values)), value
+
+
+class Registry:
+    """A collection of metrics exposed together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Adds a metric, replacing a metric with the same name.
+
+        Args:
+            metric: Metric to add.
+
+        Returns:
+            The metric.
+        """
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def expose(self) -> str:
+        """Formats every metric in the Prometheus text format.
+
+        Returns:
+            The metrics.
+        """
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            # The samples of a counter are suffixed with `_total`, and so is the name of its family.
+            family = f"{metric.name}_total" if metric.type == "counter" else metric.name
+            lines.append(f"# HELP {family} {metric.documentation}")
+            lines.append(f"# TYPE {family} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Request path
+REQUEST_DURATION = REGISTRY.register(
+    Histogram("pds_request_duration_seconds", "Time to answer a data request.", ["status"])
+)
+SIGNATURE_CACHE_REQUESTS = REGISTRY.register(
+    Counter("pds_signature_cache_requests", "Requests looked up in the signature cache.", ["result"])
+)
+REQUEST_CACHE_REQUESTS = REGISTRY.register(
+    Counter(
+        "pds_request_cache_requests",
+        "Requests looked up in the request cache, by hit, miss, or pending when a duplicate was in flight.",
+        ["result"],
+    )
+)
+REQUEST_CACHE_PENDING_WAIT = REGISTRY.register(
+    Histogram("pds_request_cache_pending_wait_seconds", "Time duplicate requests waited for the request in flight.")
+)
+CACHE_TIER_REQUESTS = REGISTRY.register(
+    Counter(
+        "pds_cache_tier_requests",
+        "Lookups in each tier of the tiered caches, by hit or miss.",
+        ["cache", "tier", "result"],
+    )
+)
+VERIFY_DURATION = REGISTRY.register(
+    Histogram("pds_verify_duration_seconds", "Time to verify a request, by outcome.", ["outcome"])
+)
+
+# Adapter
+ADAPTER_STAGE_DURATION = REGISTRY.register(
+    Histogram("pds_adapter_stage_duration_seconds", "Time spent in each stage of the adapter.", ["adapter", "stage"])
+)
+UPSTREAM_RESPONSES = REGISTRY.register(
+    Counter("pds_upstream_responses", "Responses of the adapters' providers, by status code.", ["host", "status"])
+)
+
+
+def observe_adapter_stage(adapter: str, stage: str, duration: float) -> None:
+    """Records the time a stage of an adapter took, as the adapters' stage observer.
+
+    Args:
+        adapter: Name of the adapter.
+        stage: Name of the stage.
+        duration: Time in seconds the stage took.
+    """
+    ADAPTER_STAGE_DURATION.labels(adapter, stage).observe(duration)
+
+
+async def record_upstream_response(response: httpx.Response) -> None:
+    """Counts a response of a provider, as a response event hook of the adapters' HTTP client.
+
+    Args:
+        response: Response of the provider.
+    """
+    UPSTREAM_RESPONSES.labels(response.request.url.host, response.status_code).inc()
@@ -0,0 +1,151 @@
+import struct
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+from starlette.responses import JSONResponse
+from starlette.types import Message, Scope, Receive, Send
+
+from adapter import codec
+
+# Version of the encoding, followed by the status code and the number of headers.
+_MAGIC = b"RR1"
+_PREFIX = struct.Struct("!3sHH")
+# Lengths of a header's name and value.
+_HEADER = struct.Struct("!HH")
+
+
+class CodecJSONResponse(JSONResponse):
+    """A JSON response encoded with the gateway's codec, see `adapter.codec`."""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumps(content)
+
+
+@dataclass(frozen=True)
+class RecordedResponse:
+    """A complete HTTP response that can be replayed byte-for-byte.
+
+    Attributes:
+        status: HTTP status code.
+        headers: Raw response headers.
+        body: Response body with all chunks joined.
+    """
+
+    status: int
+    headers: list[tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Sends the response to the client in the same way as a starlette Response."""
+        await send({"type": "http.response.start", "status": self.status, "headers": self.headers})
+        await send({"type": "http.response.body", "body": self.body})
+
+    def encode(self) -> bytes:
+        """Encodes the response so that it can be shared with other processes or stored in Redis.
+
+        The body is appended as is, so encoding and decoding never parse it.
+
+        Returns:
+            The encoded response.
+        """
+        parts = [_PREFIX.pack(_MAGIC, self.status, len(self.headers))]
+        for name, value in self.headers:
+            parts += [_HEADER.pack(len(name), len(value)), name, value]
+        parts.append(self.body)
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, data: bytes) -> "RecordedResponse":
+        """Decodes a response encoded by `encode`.
+
+        Args:
+            data: The encoded response.
+
+        Returns:
+            The decoded response.
+
+        Raises:
+            ValueError: If the data is not an encoded response.
+        """
+        try:
+            magic, status, count = _PREFIX.unpack_from(data)
+            if magic != _MAGIC:
+                raise ValueError("Not an encoded response")
+
+            offset = _PREFIX.size
+            headers = []
+            for _ in range(count):
+                name_length, value_length = _HEADER.unpack_from(data, offset)
+                offset += _HEADER.size
+                name = data[offset : offset + name_length]
+                offset += name_length
+                headers.append((name, data[offset : offset + value_length]))
+                offset += value_length
+        except struct.error as e:
+            raise ValueError("Not an encoded response") from e
+
+        return cls(status=status, headers=headers, body=data[offset:])
+
+
+class ResponseRecorder:
+    """Records the ASGI messages of a response while forwarding them to the client.
+
+    Attributes:
+        status: HTTP status code. None until the response has started.
+        headers: Raw response headers.
+        chunks: Body chunks sent so far.
+    """
+
+    def __init__(self, send: Send) -> None:
+        """Initializes ResponseRecorder with the send callable to forward the messages to.
+
+        Args:
+            send: ASGI send callable.
+        """
+        self._send = send
+        self.status = None
+        self.headers = []
+        self.chunks = []
+
+    async def send(self, message: Message) -> None:
+        """Records and forwards a message.
+
+        Args:
+            message: Message object.
+        """
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            self.chunks.append(message.get("body", b""))
+        await self._send(message)
+
+    @property
+    def response(self) -> RecordedResponse:
+        """The recorded response."""
+        return RecordedResponse(status=self.status, headers=self.headers, body=b"".join(self.chunks))
+
+
+async def stream_json_field(name: str, first: str, rest: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Streams a JSON object with a single string field as the parts of the string arrive.
+
+    The joined body is the same as the body of a JSONResponse with the complete string, so it can be cached and
+    replayed like any other response.
+
+    Args:
+        name: Name of the field.
+        first: First part of the string.
+        rest: Remaining parts of the string.
+
+    Yields:
+        The parts of the body.
+    """
+
+    def encode(part: str) -> bytes:
+        # The JSON string of the part without its enclosing quotes.
+        return codec.dumps(part)[1:-1]
+
+    yield b'{%s:"%s' % (codec.dumps(name), encode(first))
+    async for part in rest:
+        yield encode(part)
+    yield b'"}'
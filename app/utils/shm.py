@@ -0,0 +1,208 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from hashlib import blake2b
+from typing import Iterator, Optional
+
+# Version of the layout, followed by the number of slots, the size of a slot and the number of slots per bucket.
+_MAGIC = b"PDSSHM1\x00"
+_HEADER = struct.Struct("!8sIII")
+_HEADER_SIZE = 64
+# Sequence number, expiry time, digest of the key and length of the value at the start of each slot.
+_SLOT = struct.Struct("!Id16sI")
+_SEQ = struct.Struct("!I")
+
+# Times a read is attempted again when it overlaps a write before giving up with a miss.
+READ_ATTEMPTS = 3
+
+
+class SharedMemoryTable:
+    """A fixed-size hash table with TTL in a memory-mapped file, shared by every process opening the same file.
+
+    The table is split into buckets of `ways` slots of `slot_size` bytes. A key can only be stored in the slots of
+    its bucket, so a write only locks its bucket: each bucket has its own lock, a POSIX record lock on its byte
+    range of the file. Reads take no lock. Each slot has a sequence number that writers make odd while they
+    write, and a read is only kept if the sequence number was even and did not change while the slot was read.
+
+    A full bucket evicts its expired slots first, and then the slot that expires the soonest.
+
+    Attributes:
+        path: Path of the file, preferably in /dev/shm.
+        slots: Number of slots.
+        slot_size: Size in bytes of each slot, values longer than `capacity` are not stored.
+        ways: Number of slots per bucket.
+        buckets: Number of buckets.
+        capacity: Maximum length of a value.
+        evictions: Number of live values this process evicted to store another value.
+    """
+
+    def __init__(self, path: str, slots: int = 1024, slot_size: int = 4096, ways: int = 8) -> None:
+        """Initializes SharedMemoryTable, creating the file if no other process did.
+
+        Args:
+            path: Path of the file.
+            slots: Number of slots, rounded up to a whole number of buckets.
+            slot_size: Size in bytes of each slot.
+            ways: Number of slots per bucket.
+        """
+        if slot_size <= _SLOT.size:
+            raise Exception(f"SHM CACHE SLOT SIZE MUST BE LARGER THAN {_SLOT.size} BYTES")
+
+        self.path = path
+        self.ways = ways
+        self.buckets = max(1, -(-slots // ways))
+        self.slots = self.buckets * ways
+        self.slot_size = slot_size
+        self.capacity = slot_size - _SLOT.size
+        self.evictions = 0
+        self.thread_lock = threading.Lock()
+
+        size = _HEADER_SIZE + self.slots * slot_size
+        header = _HEADER.pack(_MAGIC, self.slots, slot_size, ways)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # Processes starting at the same time wait for the first one to create the table.
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self.fd).st_size == 0:
+                    os.ftruncate(self.fd, size)
+                    os.pwrite(self.fd, header, 0)
+                elif os.fstat(self.fd).st_size != size or os.pread(self.fd, _HEADER.size, 0) != header:
+                    raise Exception(f"SHM CACHE {path} EXISTS WITH ANOTHER LAYOUT, DELETE IT OR USE ANOTHER PATH")
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            self.mm = mmap.mmap(self.fd, size)
+        except BaseException:
+            os.close(self.fd)
+            raise
+
+    @staticmethod
+    def digest(key: str | int) -> bytes:
+        """Gets the digest a key is stored under.
+
+        Args:
+            key: Key.
+
+        Returns:
+            The 16-byte digest of the key.
+        """
+        return blake2b(str(key).encode(), digest_size=16).digest()
+
+    def _bucket(self, digest: bytes) -> int:
+        return int.from_bytes(digest[:8], "big") % self.buckets
+
+    def _offsets(self, bucket: int) -> range:
+        start = _HEADER_SIZE + bucket * self.ways * self.slot_size
+        return range(start, start + self.ways * self.slot_size, self.slot_size)
+
+    @contextmanager
+    def _locked(self, bucket: int) -> Iterator[None]:
+        # Record locks exclude other processes only, the threads of this process are excluded by the thread lock.
+        start = _HEADER_SIZE + bucket * self.ways * self.slot_size
+        length = self.ways * self.slot_size
+        with self.thread_lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, length, start)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, length, start)
+
+    def _write(self, offset: int, expires_at: float, digest: bytes, value: bytes) -> None:
+        # Make the sequence number odd while writing, so that readers ignore the slot until it is even again.
+        (seq,) = _SEQ.unpack_from(self.mm, offset)
+        _SEQ.pack_into(self.mm, offset, (seq + 1) & 0xFFFFFFFF)
+        self.mm[offset + _SLOT.size : offset + _SLOT.size + len(value)] = value
+        _SLOT.pack_into(self.mm, offset, (seq + 2) & 0xFFFFFFFF, expires_at, digest, len(value))
+
+    def get(self, key: str | int) -> Optional[bytes]:
+        """Gets the value of a key.
+
+        Args:
+            key: Key to get the value from.
+
+        Returns:
+            The value. None if the key is not found, has expired, or is being written.
+        """
+        digest = self.digest(key)
+        now = time.time()
+        for offset in self._offsets(self._bucket(digest)):
+            for _ in range(READ_ATTEMPTS):
+                seq, expires_at, slot_digest, length = _SLOT.unpack_from(self.mm, offset)
+                if seq & 1:
+                    continue
+                if slot_digest != digest or expires_at <= now:
+                    break
+
+                start = offset + _SLOT.size
+                value = self.mm[start : start + min(length, self.capacity)]
+                if _SEQ.unpack_from(self.mm, offset)[0] == seq:
+                    return value
+
+        return None
+
+    def set(self, key: str | int, value: bytes, ttl: float) -> bool:
+        """Sets the value of a key.
+
+        Args:
+            key: Key to set the value to.
+            value: Value to set.
+            ttl: Time to live in seconds.
+
+        Returns:
+            Whether the value was stored. Values longer than `capacity` are not.
+        """
+        if len(value) > self.capacity:
+            return False
+
+        digest = self.digest(key)
+        bucket = self._bucket(digest)
+        with self._locked(bucket):
+            now = time.time()
+            target = free = oldest = None
+            oldest_expires_at = 0.0
+            for offset in self._offsets(bucket):
+                _, expires_at, slot_digest, _ = _SLOT.unpack_from(self.mm, offset)
+                if slot_digest == digest:
+                    target = offset
+                    break
+                if expires_at <= now:
+                    free = free or offset
+                elif oldest is None or expires_at < oldest_expires_at:
+                    oldest, oldest_expires_at = offset, expires_at
+
+            if target is None and free is None:
+                self.evictions += 1
+            self._write(target or free or oldest, now + ttl, digest, value)
+
+        return True
+
+    def delete(self, key: str | int) -> None:
+        """Deletes the value of a key.
+
+        Args:
+            key: Key to delete the value of.
+        """
+        digest = self.digest(key)
+        bucket = self._bucket(digest)
+        with self._locked(bucket):
+            for offset in self._offsets(bucket):
+                if _SLOT.unpack_from(self.mm, offset)[2] == digest:
+                    self._write(offset, 0.0, digest, b"")
+
+    def __len__(self) -> int:
+        """Counts the live values of every process."""
+        now = time.time()
+        return sum(
+            _SLOT.unpack_from(self.mm, offset)[1] > now
+            for bucket in range(self.buckets)
+            for offset in self._offsets(bucket)
+        )
+
+    def close(self) -> None:
+        """Unmaps the table. The file is kept for the other processes."""
+        self.mm.close()
+        os.close(self.fd)
@@ -0,0 +1,250 @@
+import asyncio
+import secrets
+from typing import Any, Hashable, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.exceptions import FlightAbandonedError
+from app.utils.response import RecordedResponse
+
+# Returns the stored response if the request was completed, or claims the lease if nobody holds it.
+CLAIM_SCRIPT = """
+local result = redis.call("get", KEYS[2])
+if result then
+    return {"result", result}
+end
+if redis.call("set", KEYS[1], ARGV[1], "NX", "PX", ARGV[2]) then
+    return {"lease"}
+end
+return {}
+"""
+
+RENEW_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Deduplicates concurrent work sharing the same key within the process.
+
+    The first caller of a key becomes the leader and does the work. Every other caller that joins the key while
+    the work is in flight becomes a follower and awaits the leader's result instead of doing the work again.
+
+    Attributes:
+        flights: Futures of the work in flight by key.
+    """
+
+    def __init__(self) -> None:
+        """Initializes SingleFlight with no work in flight."""
+        self.flights: dict[Hashable, asyncio.Future] = {}
+
+    def join(self, key: Hashable) -> tuple[asyncio.Future, bool]:
+        """Joins the work of the key.
+
+        Args:
+            key: Key of the work.
+
+        Returns:
+            The future of the work and whether the caller is the leader.
+        """
+        if (flight := self.flights.get(key)) is not None:
+            return flight, False
+
+        flight = asyncio.get_running_loop().create_future()
+        self.flights[key] = flight
+        return flight, True
+
+    def resolve(self, key: Hashable, result: Any) -> None:
+        """Completes the work of the key and hands its result to every follower.
+
+        Args:
+            key: Key of the work.
+            result: Result of the work.
+        """
+        if (flight := self.flights.pop(key, None)) is not None and not flight.done():
+            flight.set_result(result)
+
+    def fail(self, key: Hashable, error: BaseException) -> None:
+        """Completes the work of the key with an error that is raised in every follower.
+
+        Args:
+            key: Key of the work.
+            error: Error raised by the leader.
+        """
+        if (flight := self.flights.pop(key, None)) is not None and not flight.done():
+            flight.set_exception(error)
+            # Mark the error as retrieved so that a flight without followers does not log it as unhandled.
+            flight.exception()
+
+    @staticmethod
+    async def wait(flight: asyncio.Future, timeout: float) -> Any:
+        """Waits for the leader's result.
+
+        Args:
+            flight: Future of the work.
+            timeout: Time in seconds to wait for the result.
+
+        Returns:
+            The result of the work.
+
+        Raises:
+            asyncio.TimeoutError: If the leader has not completed the work in time.
+            FlightAbandonedError: If the leader was cancelled before completing the work.
+        """
+        # Shield the flight so that a follower timing out does not cancel the flight for the other followers.
+        return await asyncio.wait_for(asyncio.shield(flight), timeout)
+
+
+class RedisSingleFlight:
+    """Deduplicates requests sharing the same key across processes and replicas with Redis.
+
+    A caller first looks up the response stored by a previous leader and, if there is none, claims the key with a
+    `SET NX PX` lease, both in a single script. The leader renews its lease while it requests, so that a request
+    longer than the lease is not made again by another replica. When the leader completes, it stores a successful
+    response for a lease period and publishes it on the key's channel, so that followers on other replicas receive
+    it without polling. A lease whose leader died is reclaimed by a follower once it expires.
+
+    Attributes:
+        redis: Asyncio Redis client.
+        lease_ttl: Time in seconds a lease is held without renewal, and a response is stored.
+        prefix: Prefix of the Redis keys and channels.
+    """
+
+    def __init__(self, redis: Redis, lease_ttl: float, prefix: str = "pds:flight") -> None:
+        """Initializes RedisSingleFlight with the Redis client and the lease TTL.
+
+        Args:
+            redis: Asyncio Redis client.
+            lease_ttl: Time in seconds a lease is held without renewal, and a response is stored.
+            prefix: Prefix of the Redis keys and channels.
+        """
+        self.redis = redis
+        self.lease_ttl = lease_ttl
+        self.prefix = prefix
+        self._claim_script = redis.register_script(CLAIM_SCRIPT)
+        self._renew_lease = redis.register_script(RENEW_LEASE_SCRIPT)
+        self._release_lease = redis.register_script(RELEASE_LEASE_SCRIPT)
+        self._renewals: dict[str, asyncio.Task] = {}
+
+    def _keys(self, key: Hashable) -> tuple[str, str, str]:
+        return f"{self.prefix}:{key}:lease", f"{self.prefix}:{key}:result", f"{self.prefix}:{key}:done"
+
+    async def _claim(self, key: Hashable) -> tuple[Optional[str], Optional[RecordedResponse]]:
+        lease_key, result_key, _ = self._keys(key)
+        token = secrets.token_hex(16)
+        reply = await self._claim_script(keys=[lease_key, result_key], args=[token, int(self.lease_ttl * 1000)])
+        if reply and reply[0] == b"result":
+            return None, RecordedResponse.decode(reply[1])
+        if reply and reply[0] == b"lease":
+            self._renewals[token] = asyncio.create_task(self._renew(lease_key, token))
+            return token, None
+        return None, None
+
+    async def _renew(self, lease_key: str, token: str) -> None:
+        # Renew well before the lease expires, and stop once it is lost.
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            try:
+                if not await self._renew_lease(keys=[lease_key], args=[token, int(self.lease_ttl * 1000)]):
+                    return
+            except RedisError:
+                pass
+
+    def _stop_renewal(self, token: str) -> None:
+        if (renewal := self._renewals.pop(token, None)) is not None:
+            renewal.cancel()
+
+    async def join(self, key: Hashable, timeout: float) -> tuple[Optional[str], Optional[RecordedResponse]]:
+        """Gets the stored response of the key, claims its lease, or waits for the response of the lease holder.
+
+        If Redis is unavailable, the caller leads without a lease rather than failing the request.
+
+        Args:
+            key: Key of the request.
+            timeout: Time in seconds to wait for the response of another replica.
+
+        Returns:
+            The lease token and None if the caller leads the request, or None and the response if another replica
+            completed it. None and None if the caller leads without a lease.
+
+        Raises:
+            asyncio.TimeoutError: If the other replica has not completed the request in time.
+        """
+        _, _, channel = self._keys(key)
+        loop = asyncio.get_running_loop()
+        try:
+            token, response = await self._claim(key)
+            if token or response:
+                return token, response
+
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(channel)
+                deadline = loop.time() + timeout
+                while True:
+                    # The leader may have completed before the subscription, or abandoned or lost its lease.
+                    token, response = await self._claim(key)
+                    if token or response:
+                        return token, response
+
+                    if (remaining := deadline - loop.time()) <= 0:
+                        raise asyncio.TimeoutError()
+
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=min(remaining, self.lease_ttl)
+                    )
+                    if message and message["data"]:
+                        return None, RecordedResponse.decode(message["data"])
+            finally:
+                await pubsub.reset()
+        except RedisError:
+            return None, None
+
+    async def complete(self, key: Hashable, token: str, response: RecordedResponse) -> None:
+        """Publishes the leader's response to the followers and releases the lease.
+
+        Args:
+            key: Key of the request.
+            token: Lease token returned by `join`.
+            response: Response of the request.
+        """
+        self._stop_renewal(token)
+        lease_key, result_key, channel = self._keys(key)
+        data = response.encode()
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                # Only successful responses are stored, so that a failed request is attempted again.
+                if response.status == 200:
+                    pipe.set(result_key, data, px=int(self.lease_ttl * 1000))
+                pipe.publish(channel, data)
+                await pipe.execute()
+            await self._release_lease(keys=[lease_key], args=[token])
+        except RedisError:
+            # Followers reclaim the lease once it expires.
+            pass
+
+    async def abandon(self, key: Hashable, token: str) -> None:
+        """Releases the lease without a response so that a follower can claim it immediately.
+
+        Args:
+            key: Key of the request.
+            token: Lease token returned by `join`.
+        """
+        self._stop_renewal(token)
+        lease_key, _, channel = self._keys(key)
+        try:
+            await self._release_lease(keys=[lease_key], args=[token])
+            await self.redis.publish(channel, b"")
+        except RedisError:
+            pass
@@ -0,0 +1,151 @@
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Tuple
+
+from app.utils.helper import BandChainParams
+
+
+class Trace:
+    """The spans of a single request.
+
+    Attributes:
+        path: Path of the request.
+        params: BandChain parameters of the request.
+        started_at: Time the request arrived.
+        start: Performance counter when the request arrived.
+        spans: Name, start offset and duration in seconds of each span.
+        duration: Time in seconds the request took. None while it is in progress.
+        status: HTTP status code of the response. None until the response has started.
+    """
+
+    __slots__ = ("path", "params", "started_at", "start", "spans", "duration", "status")
+
+    def __init__(self, path: str, params: BandChainParams) -> None:
+        self.path = path
+        self.params = params
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.spans: List[Tuple[str, float, float]] = []
+        self.duration: Optional[float] = None
+        self.status: Optional[int] = None
+
+    def server_timing(self) -> bytes:
+        """Formats the spans finished so far as a `Server-Timing` header, with durations in milliseconds.
+
+        Returns:
+            The header value.
+        """
+        metrics = [f"{name};dur={duration * 1000:.2f}" for name, _, duration in self.spans]
+        metrics.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.2f}")
+        return ", ".join(metrics).encode("latin-1")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Converts the trace to a dictionary, with the BandChain parameters of the request.
+
+        Returns:
+            The trace as a dictionary.
+        """
+        return {
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": self.duration * 1000 if self.duration is not None else None,
+            "request_id": self.params.request_id,
+            "external_id": self.params.external_id,
+            "data_source_id": self.params.data_source_id,
+            "validator": self.params.validator,
+            "spans": [
+                {"name": name, "start_ms": start * 1000, "duration_ms": duration * 1000}
+                for name, start, duration in self.spans
+            ],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def start_trace(path: str, params: BandChainParams) -> Trace:
+    """Starts the trace of the current request.
+
+    Args:
+        path: Path of the request.
+        params: BandChain parameters of the request.
+
+    Returns:
+        The trace.
+    """
+    trace = Trace(path, params)
+    _current_trace.set(trace)
+    return trace
+
+
+def record_span(name: str, duration: float) -> None:
+    """Records a span that has just ended in the trace of the current request, if it is traced.
+
+    Args:
+        name: Name of the span.
+        duration: Time in seconds the span took.
+    """
+    if (trace := _current_trace.get()) is not None:
+        trace.spans.append((name, time.perf_counter() - trace.start - duration, duration))
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Records the time the context took as a span in the trace of the current request, if it is traced.
+
+    Args:
+        name: Name of the span.
+    """
+    if (trace := _current_trace.get()) is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        trace.spans.append((name, start - trace.start, end - start))
+
+
+class SlowTraces:
+    """The traces of the slowest requests.
+
+    Attributes:
+        capacity: Number of traces kept.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initializes SlowTraces without any trace.
+
+        Args:
+            capacity: Number of traces kept.
+        """
+        self.capacity = capacity
+        self._heap: List[Tuple[float, int, Trace]] = []
+        self._counter = itertools.count()
+
+    def add(self, trace: Trace) -> None:
+        """Keeps a finished trace if it is among the slowest.
+
+        Args:
+            trace: The finished trace.
+        """
+        # The heap's root is the fastest kept trace, so a faster trace is dropped after a single comparison.
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, (trace.duration, next(self._counter), trace))
+        elif trace.duration > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (trace.duration, next(self._counter), trace))
+
+    def slowest(self) -> List[Trace]:
+        """Gets the kept traces.
+
+        Returns:
+            The traces, slowest first.
+        """
+        return [trace for _, _, trace in sorted(self._heap, reverse=True)]
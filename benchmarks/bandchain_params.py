@@ -0,0 +1,59 @@
+"""Compares parsing the BandChain headers in every middleware against parsing them once per request.
+
+Run with `python -m benchmarks.bandchain_params`.
+"""
+import argparse
+import timeit
+
+from starlette.requests import Request
+
+from app.utils.helper import get_bandchain_params, get_bandchain_params_from_scope
+
+HEADERS = [
+    (b"host", b"gateway.example.com"),
+    (b"user-agent", b"yoda/2.6.0"),
+    (b"accept", b"*/*"),
+    (b"accept-encoding", b"gzip, deflate"),
+    (b"band_chain_id", b"laozi-mainnet"),
+    (b"band_validator", b"bandvaloper1p40yh3zkmhcv0ecqp3mcazy83sa57rgjp07dun"),
+    (b"band_request_id", b"24176345"),
+    (b"band_external_id", b"4"),
+    (b"band_data_source_id", b"380"),
+    (b"band_reporter", b"band1yyv5jkqaukq0ajqn7vhkyhpff7h6e99ja7gvwg"),
+    (b"band_signature", b"WkZPsxV4eqoTXmAiqN9T2t9a1d4ZLTD3fh6SuV1dtW1d0lPSv7kDdg8Ys3sD6x2Z9LmWjYcSNeHYdOI6jUAQCw=="),
+]
+
+
+def get_bandchain_params_with_type(headers) -> dict:
+    # How the middlewares parsed the ids of the headers before they were parsed once per request.
+    params = get_bandchain_params(headers)
+    for k, v in params.items():
+        if k in ["request_id", "data_source_id", "external_id"]:
+            params[k] = int(v)
+    return params
+
+
+def per_middleware() -> None:
+    # Each middleware builds its own Request and parses the headers again.
+    hash(Request({"type": "http", "headers": HEADERS}).headers["BAND_SIGNATURE"])
+    get_bandchain_params(Request({"type": "http", "headers": HEADERS}).headers)
+    get_bandchain_params_with_type(Request({"type": "http", "headers": HEADERS}).headers)
+    get_bandchain_params_with_type(Request({"type": "http", "headers": HEADERS}).headers)
+
+
+def once_per_request() -> None:
+    scope = {"type": "http", "headers": HEADERS}
+    hash(get_bandchain_params_from_scope(scope).signature)
+    get_bandchain_params_from_scope(scope).raw
+    get_bandchain_params_from_scope(scope).request_id
+    get_bandchain_params_from_scope(scope).reporter
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    for name, function in [("per middleware", per_middleware), ("once per request", once_per_request)]:
+        elapsed = min(timeit.repeat(function, number=args.number, repeat=5))
+        print(f"{name:<32} {elapsed / args.number * 1e6:>7.2f}us/request")
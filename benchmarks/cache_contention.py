@@ -0,0 +1,100 @@
+"""Compares the get/set throughput of the local, shared memory and Redis caches under multi-process contention.
+
+Each worker process, like a uvicorn worker, reads and writes encoded responses under keys drawn from a shared key
+space, and writes each key it misses, as the cache middlewares do. The local cache is private to each process, so
+its hit ratio drops with the number of processes, while the shared memory and Redis caches are shared. Run with
+`python -m benchmarks.cache_contention --processes 1 4 8`. Redis uses `REDIS_URL` (default localhost) and is
+skipped if it is not reachable.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from redis import Redis
+
+from app.utils.cache import LocalCache
+from app.utils.shm import SharedMemoryTable
+
+CACHE_TYPES = ["local", "shm", "redis"]
+
+
+def open_cache(cache_type: str, path: str, keys: int, slot_size: int) -> tuple:
+    """Opens a cache as a pair of get and set functions of bytes values."""
+    if cache_type == "local":
+        cache = LocalCache(keys, 60)
+        return cache.get, lambda key, value: cache.set(key, value)
+    if cache_type == "shm":
+        table = SharedMemoryTable(path, keys, slot_size)
+        return table.get, lambda key, value: table.set(key, value, 60)
+
+    redis = Redis(host=os.getenv("REDIS_URL") or "localhost", port=int(os.getenv("REDIS_PORT", 6379)))
+    return redis.get, lambda key, value: redis.set(key, value, ex=60)
+
+
+def work(cache_type: str, path: str, args: argparse.Namespace, seed: int, barrier, results) -> None:
+    get, set_ = open_cache(cache_type, path, args.keys, args.value_size + 64)
+    rng = random.Random(seed)
+    value = os.urandom(args.value_size)
+    keys = [f"bench:{rng.randrange(args.keys)}" for _ in range(args.operations)]
+
+    barrier.wait()
+    hits = 0
+    start = time.perf_counter()
+    for key in keys:
+        if get(key) is not None:
+            hits += 1
+        else:
+            set_(key, value)
+    results.put((time.perf_counter() - start, hits))
+
+
+def run(cache_type: str, processes: int, args: argparse.Namespace) -> str:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache")
+        if cache_type == "redis":
+            Redis(host=os.getenv("REDIS_URL") or "localhost", port=int(os.getenv("REDIS_PORT", 6379))).flushdb()
+
+        barrier = multiprocessing.Barrier(processes)
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=work, args=(cache_type, path, args, seed, barrier, results))
+            for seed in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        durations, hits = zip(*[results.get() for _ in workers])
+        for worker in workers:
+            worker.join()
+
+    operations = processes * args.operations
+    return (
+        f"{cache_type:<6} processes={processes:<3} ops/s={operations / max(durations):>10.0f} "
+        f"per op={sum(durations) / operations * 1e6:>6.1f}us hit ratio={sum(hits) / operations:.2f}"
+    )
+
+
+def redis_available() -> bool:
+    try:
+        return Redis(host=os.getenv("REDIS_URL") or "localhost", port=int(os.getenv("REDIS_PORT", 6379))).ping()
+    except Exception:
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache", nargs="+", choices=CACHE_TYPES, default=CACHE_TYPES)
+    parser.add_argument("--processes", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--operations", type=int, default=20000, help="gets per process")
+    parser.add_argument("--keys", type=int, default=1000, help="number of distinct keys")
+    parser.add_argument("--value-size", type=int, default=1024, help="bytes of each value")
+    args = parser.parse_args()
+
+    for cache_type in args.cache:
+        if cache_type == "redis" and not redis_available():
+            print(f"{cache_type:<6} skipped, redis is not reachable")
+            continue
+        for processes in args.processes:
+            print(run(cache_type, processes, args))
@@ -0,0 +1,213 @@
+"""Replays validator traffic against the whole gateway in production mode, for each cache configuration.
+
+The gateway is driven in-process through an ASGI transport, so the numbers exclude the HTTP server but include
+every middleware. BandChain's verify endpoint and the price provider are served by the simulator, with a
+configurable latency. Run with `python -m benchmarks.gateway_load`, or replay a capture with
+`python -m benchmarks.gateway_load --capture traffic.jsonl`. The redis and tiered configurations use `REDIS_URL`
+(default localhost) and are skipped if redis is not reachable.
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import time
+from types import ModuleType
+from typing import List
+
+import httpx
+from redis.asyncio import Redis
+
+from adapter.standard_crypto_price.coin_gecko import CoinGecko
+from app.utils.metrics import ADAPTER_STAGE_DURATION
+from benchmarks.stats import summarize
+from benchmarks.traffic import TrafficRequest, generate_traffic, load_traffic, save_traffic
+from benchmarks.simulator import PATHS, Behavior, create_simulator
+from benchmarks.upstream import serve
+
+CACHE_TYPES = ["none", "local", "shm", "redis", "tiered"]
+
+
+def load_gateway(env: dict[str, str]) -> ModuleType:
+    """Imports `app.main` with the given settings, re-importing it if it was already imported.
+
+    Args:
+        env: Environment variables to set before importing.
+
+    Returns:
+        The `app.main` module.
+    """
+    os.environ.update(env)
+    for name in ["app.settings", "app.main"]:
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+        else:
+            importlib.import_module(name)
+    return sys.modules["app.main"]
+
+
+def count_calls(adapter_name: str) -> int:
+    """Counts the calls the gateway made to an adapter's endpoint, retries included.
+
+    Args:
+        adapter_name: Name of the adapter class.
+
+    Returns:
+        The number of calls.
+    """
+    return sum(ADAPTER_STAGE_DURATION.labels(adapter_name, "call").counts)
+
+
+def isolate(traffic: List[TrafficRequest]) -> List[TrafficRequest]:
+    """Makes the request ids and signatures of traffic unique to a run, so that a run is not answered from the
+    shared cache entries of a previous run.
+
+    Args:
+        traffic: Requests to the gateway.
+
+    Returns:
+        The requests with unique request ids and signatures.
+    """
+    run = time.time_ns()
+    return [
+        {**request, "request_id": run + request["request_id"], "signature": f"{request['signature']}-{run}"}
+        for request in traffic
+    ]
+
+
+async def replay(client: httpx.AsyncClient, traffic: List[TrafficRequest], speed: float) -> tuple[list, int, float]:
+    """Sends each request at the time it arrived in the traffic, whether previous requests were answered or not.
+
+    Args:
+        client: Client of the gateway.
+        traffic: Requests to the gateway.
+        speed: Factor the traffic is sped up by.
+
+    Returns:
+        The per-request latencies, the number of failed requests and the total elapsed time in seconds.
+    """
+    latencies = []
+    errors = 0
+
+    async def send(request: TrafficRequest) -> None:
+        nonlocal errors
+        if (delay := start + request["at"] / speed - time.perf_counter()) > 0:
+            await asyncio.sleep(delay)
+        headers = {
+            "BAND_CHAIN_ID": "laozi-mainnet",
+            "BAND_VALIDATOR": request["validator"],
+            "BAND_REQUEST_ID": str(request["request_id"]),
+            "BAND_EXTERNAL_ID": str(request["external_id"]),
+            "BAND_DATA_SOURCE_ID": str(request["data_source_id"]),
+            "BAND_REPORTER": f"reporter-{request['validator']}",
+            "BAND_SIGNATURE": request["signature"],
+        }
+        request_start = time.perf_counter()
+        response = await client.get("/request/", params={"symbols": ",".join(request["symbols"])}, headers=headers)
+        latencies.append(time.perf_counter() - request_start)
+        if response.status_code != 200:
+            errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[send(request) for request in traffic])
+    return latencies, errors, time.perf_counter() - start
+
+
+async def redis_available() -> bool:
+    redis = Redis(host=os.getenv("REDIS_URL") or "localhost", port=int(os.getenv("REDIS_PORT", 6379)))
+    try:
+        return await redis.ping()
+    except Exception:
+        return False
+    finally:
+        await redis.close()
+
+
+async def run(
+    cache_type: str, adapter_name: str, traffic: List[TrafficRequest], speed: float, simulator_url: str
+) -> str:
+    if cache_type in ["redis", "tiered"] and not await redis_available():
+        return f"{cache_type:<32} skipped, redis is not reachable"
+
+    gateway = load_gateway(
+        {
+            "MODE": "production",
+            "LOG_LEVEL": "WARNING",
+            "VERIFY_REQUEST_URL": f"{simulator_url}{PATHS['verify']}",
+            "ALLOWED_DATA_SOURCE_IDS": "[1]",
+            "ADAPTER_TYPE": "standard_crypto_price" if adapter_name == "coin_gecko" else "mock",
+            "ADAPTER_NAME": adapter_name,
+            "API_URL": f"{simulator_url}{PATHS['coin_gecko']}",
+            "API_KEY": "benchmark",
+            "CACHE_TYPE": cache_type,
+            "SHM_CACHE_PATH": os.path.join(tempfile.gettempdir(), "pds-gateway-benchmark"),
+            "REDIS_URL": os.getenv("REDIS_URL") or "localhost",
+            "DEDUP_MODE": "local",
+            "MONGO_DB_URL": "",
+            "PRICE_PREFETCH": "false",
+        }
+    )
+    adapter = gateway.adapter
+    adapter.requests_per_minute = None
+
+    calls = count_calls(type(adapter).__name__)
+    async with gateway.app.router.lifespan_context(gateway.app):
+        transport = httpx.ASGITransport(app=gateway.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway", timeout=None) as client:
+            latencies, errors, elapsed = await replay(client, isolate(traffic), speed)
+
+    calls = count_calls(type(adapter).__name__) - calls
+    return f"{summarize(cache_type, latencies, elapsed)} upstream calls={calls:>6} errors={errors}"
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.capture:
+        traffic = load_traffic(args.capture)
+    else:
+        traffic = generate_traffic(
+            args.requests,
+            args.validators,
+            CoinGecko().symbol_universe()[: args.symbol_pool],
+            symbols_per_request=args.symbols_per_request,
+            duplicate_ratio=args.duplicate_ratio,
+            rate=args.rate,
+            seed=args.seed,
+        )
+    if args.save:
+        save_traffic(args.save, traffic)
+
+    simulator = create_simulator(
+        {
+            "verify": Behavior(latency=f"constant:{args.verify_latency}"),
+            "coin_gecko": Behavior(latency=f"constant:{args.upstream_latency}"),
+        }
+    )
+    with serve(simulator) as simulator_url:
+        print(
+            f"{len(traffic)} requests, adapter={args.adapter}, speed={args.speed}x, "
+            f"verify latency={args.verify_latency * 1000:.0f}ms, upstream latency={args.upstream_latency * 1000:.0f}ms"
+        )
+        for cache_type in args.cache:
+            verify_calls = simulator.state.calls["verify"]
+            result = await run(cache_type, args.adapter, traffic, args.speed, simulator_url)
+            print(f"{result} verify calls={simulator.state.calls['verify'] - verify_calls}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache", nargs="+", choices=CACHE_TYPES, default=CACHE_TYPES)
+    parser.add_argument("--adapter", choices=["coin_gecko", "mock"], default="coin_gecko")
+    parser.add_argument("--capture", help="replay this JSON lines capture instead of generated traffic")
+    parser.add_argument("--save", help="save the replayed traffic as a capture")
+    parser.add_argument("--requests", type=int, default=50, help="number of BandChain requests")
+    parser.add_argument("--validators", type=int, default=20, help="number of validators per BandChain request")
+    parser.add_argument("--symbol-pool", type=int, default=200, help="number of distinct symbols requested")
+    parser.add_argument("--symbols-per-request", type=int, default=10)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05, help="share of requests sent again")
+    parser.add_argument("--rate", type=float, default=5.0, help="BandChain requests per second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speed", type=float, default=1.0, help="factor the traffic is sped up by")
+    parser.add_argument("--verify-latency", type=float, default=0.02, help="verify endpoint latency in seconds")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="price provider latency in seconds")
+    asyncio.run(main(parser.parse_args()))
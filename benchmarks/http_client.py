@@ -0,0 +1,77 @@
+"""Compares a new HTTP client per request against the shared pooled adapter client.
+
+Run with `python -m benchmarks.http_client`.
+"""
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+import httpx
+
+from adapter import Adapter
+from adapter.standard_crypto_price.coin_gecko import CoinGecko
+from benchmarks.stats import summarize
+from benchmarks.upstream import create_price_app, serve
+
+
+async def run(call: Callable[[], Awaitable], requests: int, concurrency: int) -> tuple[list[float], float]:
+    """Runs the call `requests` times with at most `concurrency` calls in flight.
+
+    Args:
+        call: Call to benchmark.
+        requests: Total number of calls.
+        concurrency: Maximum number of concurrent calls.
+
+    Returns:
+        The per-call latencies and the total elapsed time in seconds.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[timed() for _ in range(requests)])
+    return latencies, time.perf_counter() - start
+
+
+async def main(requests: int, concurrency: int, latency: float) -> None:
+    with serve(create_price_app(latency)) as base_url:
+        adapter = CoinGecko()
+        adapter.api_url = f"{base_url}/api/v3/simple/price"
+        adapter.api_key = "benchmark"
+        params = {"ids": "bitcoin,ethereum,band-protocol", "vs_currencies": "USD"}
+
+        async def client_per_request() -> None:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(adapter.api_url, params=params)
+                response.raise_for_status()
+
+        async def pooled_client() -> None:
+            await adapter.call({"symbols": ["BTC", "ETH", "BAND"]})
+
+        Adapter.open_client(max_connections=concurrency, max_keepalive_connections=concurrency)
+        try:
+            # Warm up both paths so that neither pays for imports or the first connection.
+            await run(client_per_request, concurrency, concurrency)
+            await run(pooled_client, concurrency, concurrency)
+
+            print(f"requests={requests} concurrency={concurrency} upstream_latency={latency * 1000:.0f}ms")
+            print(summarize("client per request", *await run(client_per_request, requests, concurrency)))
+            print(summarize("shared pooled client", *await run(pooled_client, requests, concurrency)))
+        finally:
+            await Adapter.close_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="upstream latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
@@ -0,0 +1,63 @@
+"""Compares the JSON codecs on the payloads of a request: a 300-symbol price response and a long LLM answer.
+
+For each codec, it times decoding the provider's response, encoding the gateway's response (against FastAPI's
+default of jsonable_encoder and JSONResponse), and a round trip through the Redis cache encoding. Run with
+`python -m benchmarks.json_codec`.
+"""
+import argparse
+import timeit
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from adapter import codec
+from app.utils.response import CodecJSONResponse
+
+
+def price_payloads(count: int) -> tuple[bytes, dict[str, Any]]:
+    upstream = {
+        f"coin-{i}": {"usd": 1000 / (i + 1), "usd_24h_vol": 123456789.123, "last_updated_at": 1700000000}
+        for i in range(count)
+    }
+    response = {
+        "prices": [{"symbol": f"SYM{i}", "price": 1000 / (i + 1), "timestamp": 1700000000} for i in range(count)]
+    }
+    return codec.CODECS["stdlib"][0](upstream), response
+
+
+def llm_payloads(length: int) -> tuple[bytes, dict[str, Any]]:
+    answer = ("Brie de Meaux is a soft cheese named after the town of Meaux, « très crémeux ».\n" * length)[:length]
+    upstream = {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 20, "completion_tokens": length // 4, "total_tokens": 20 + length // 4},
+    }
+    return codec.CODECS["stdlib"][0](upstream), {"answer": answer}
+
+
+def measure(function: Callable[[], Any], number: int) -> str:
+    return f"{min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6:>8.1f}us"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=1000)
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--answer-length", type=int, default=16000, help="characters of the LLM answer")
+    args = parser.parse_args()
+
+    for payload, (upstream, response) in [
+        (f"{args.symbols} prices", price_payloads(args.symbols)),
+        (f"{args.answer_length} char answer", llm_payloads(args.answer_length)),
+    ]:
+        print(f"{payload}: upstream {len(upstream)} bytes, response {len(JSONResponse(response).body)} bytes")
+        fastapi = measure(lambda: JSONResponse(jsonable_encoder(response)), args.number)
+        print(f"  {'fastapi default':<16} {'':<26} encode response={fastapi}")
+        for name in codec.CODECS:
+            codec.use(name)
+            decode = measure(lambda: codec.loads(upstream), args.number)
+            encode = measure(lambda: CodecJSONResponse(response), args.number)
+            cache = measure(lambda: codec.loads(codec.dumps(response)), args.number)
+            print(f"  {name:<16} decode upstream={decode} encode response={encode} cache round trip={cache}")
@@ -0,0 +1,288 @@
+"""Simulates BandChain's verify endpoint and the providers of every adapter on a single local server.
+
+Each endpoint is served under the name of its adapter, with the provider's own path, and answers like the
+provider after a latency drawn from a distribution. Endpoints can fail a share of requests, be throttled with
+429s for a few seconds at regular intervals, and pad their responses to a realistic size. Run with
+`python -m benchmarks.simulator --port 9000`, which prints the URL of each endpoint, and point the gateway at it
+with the `VERIFY_REQUEST_URL` and `API_URL` envs (or `<NAME>_API_URL` for the providers of the composite adapter).
+
+Latency distributions are given as `constant:SECONDS`, `uniform:LOW:HIGH`, `exponential:MEAN` or
+`lognormal:MEDIAN:SIGMA`. A JSON file given with `--config` overrides the behavior of single endpoints, e.g.
+`{"coin_gecko": {"latency": "lognormal:0.2:0.5", "error_rate": 0.05}}`.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+PATHS = {
+    "verify": "/bandchain/api/oracle/v1/verify_request",
+    "coin_gecko": "/coin_gecko/api/v3/simple/price",
+    "coin_market_cap": "/coin_market_cap/v2/cryptocurrency/quotes/latest",
+    "crypto_compare": "/crypto_compare/data/pricemulti",
+    "internal_service": "/internal_service/prices",
+    "openai": "/openai/v1/chat/completions",
+    "mistral": "/mistral/v1/chat/completions",
+    "vrf": "/vrf/prove",
+}
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Parses a latency distribution.
+
+    Args:
+        spec: Distribution and its parameters in seconds, e.g. "lognormal:0.05:0.5".
+
+    Returns:
+        A function drawing a latency in seconds from a random generator.
+    """
+    name, *params = spec.split(":")
+    values = [float(param) for param in params]
+    if name == "constant" and len(values) == 1:
+        return lambda _: values[0]
+    if name == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if name == "exponential" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0]) if values[0] else 0.0
+    if name == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Invalid latency distribution: {spec}")
+
+
+class Behavior:
+    """How an endpoint of the simulator answers.
+
+    Attributes:
+        latency: Latency distribution of the endpoint, see `parse_latency`.
+        error_rate: Share of requests answered with a 500.
+        throttle_interval: Time in seconds between the starts of two throttled periods. 0 to never throttle.
+        throttle_duration: Time in seconds every request is answered with a 429 and a `Retry-After` header.
+        payload_size: Bytes of padding added to each item of a price response, like the fields of the real
+            providers the gateway does not use. For chat completions, the number of characters of the answer.
+        token_latency: Time in seconds between two streamed parts of a chat completion.
+    """
+
+    def __init__(
+        self,
+        latency: str = "constant:0",
+        error_rate: float = 0.0,
+        throttle_interval: float = 0.0,
+        throttle_duration: float = 0.0,
+        payload_size: int = 0,
+        token_latency: float = 0.0,
+    ) -> None:
+        self.latency = latency
+        self.draw_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.throttle_interval = throttle_interval
+        self.throttle_duration = throttle_duration
+        self.payload_size = payload_size
+        self.token_latency = token_latency
+
+    async def failure(self, rng: random.Random) -> Optional[Response]:
+        """Waits for the latency of a request and decides whether it fails.
+
+        Args:
+            rng: Random generator.
+
+        Returns:
+            The error response if the request fails. None otherwise.
+        """
+        if self.throttle_interval:
+            elapsed = time.monotonic() % self.throttle_interval
+            if elapsed < self.throttle_duration:
+                retry_after = math.ceil(self.throttle_duration - elapsed)
+                return JSONResponse({"error": "Too many requests"}, 429, headers={"Retry-After": str(retry_after)})
+
+        if latency := self.draw_latency(rng):
+            await asyncio.sleep(latency)
+        if rng.random() < self.error_rate:
+            return JSONResponse({"error": "Internal server error"}, 500)
+        return None
+
+
+def price_of(id_: str) -> float:
+    """Gets a stable price of an asset, so that every provider agrees on it."""
+    return 1 + zlib.crc32(id_.upper().encode()) % 1000000 / 100
+
+
+def split(value: Optional[str]) -> list[str]:
+    return [item for item in (value or "").split(",") if item]
+
+
+def create_simulator(behaviors: Optional[Dict[str, Behavior]] = None, seed: Optional[int] = None) -> Starlette:
+    """Creates the simulator.
+
+    Args:
+        behaviors: Behavior of each endpoint by adapter name, see `PATHS`. Endpoints without one answer right away.
+        seed: Seed of the random generator of latencies and failures.
+
+    Returns:
+        The simulator ASGI application, counting the requests of each endpoint in `state.calls`.
+    """
+    behaviors = behaviors or {}
+    rng = random.Random(seed)
+
+    def endpoint(name: str, answer: Callable) -> Route:
+        behavior = behaviors.get(name, Behavior())
+
+        async def handle(request: Request) -> Response:
+            request.app.state.calls[name] += 1
+            if response := await behavior.failure(rng):
+                return response
+            return await answer(request, behavior)
+
+        return Route(PATHS[name], handle, methods=["GET", "POST"])
+
+    async def verify(request: Request, _: Behavior) -> Response:
+        params = request.query_params
+        return JSONResponse(
+            {
+                "chain_id": params.get("chain_id", ""),
+                "validator": params.get("validator", ""),
+                "request_id": params.get("request_id", ""),
+                "external_id": params.get("external_id", ""),
+                "data_source_id": params.get("data_source_id", "1"),
+                "is_delay": False,
+            }
+        )
+
+    async def coin_gecko(request: Request, behavior: Behavior) -> Response:
+        padding = "x" * behavior.payload_size
+        return JSONResponse(
+            {
+                id_: {"usd": price_of(id_), **({"padding": padding} if padding else {})}
+                for id_ in split(request.query_params.get("ids"))
+            }
+        )
+
+    async def coin_market_cap(request: Request, behavior: Behavior) -> Response:
+        last_updated = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        padding = "x" * behavior.payload_size
+        data = {
+            str(index): {
+                "id": index,
+                "slug": slug,
+                "quote": {"USD": {"price": price_of(slug), "last_updated": last_updated}},
+                "last_updated": last_updated,
+                **({"padding": padding} if padding else {}),
+            }
+            for index, slug in enumerate(split(request.query_params.get("slug")), 1)
+        }
+        return JSONResponse({"status": {"error_code": 0, "error_message": None}, "data": data})
+
+    async def crypto_compare(request: Request, behavior: Behavior) -> Response:
+        padding = "x" * behavior.payload_size
+        return JSONResponse(
+            {
+                fsym: {"USD": price_of(fsym), **({"padding": padding} if padding else {})}
+                for fsym in split(request.query_params.get("fsyms"))
+            }
+        )
+
+    async def internal_service(request: Request, behavior: Behavior) -> Response:
+        timestamp = int(time.time())
+        padding = "x" * behavior.payload_size
+        prices = [
+            {
+                "symbol": symbol,
+                "price": price_of(symbol),
+                "timestamp": timestamp,
+                **({"padding": padding} if padding else {}),
+            }
+            for symbol in split(request.query_params.get("symbols"))
+        ]
+        return JSONResponse({"prices": prices})
+
+    async def chat_completions(request: Request, behavior: Behavior) -> Response:
+        body = await request.json()
+        length = behavior.payload_size or 100
+        answer = ("lorem ipsum dolor sit amet " * (length // 27 + 1))[:length]
+        if not body.get("stream"):
+            return JSONResponse(
+                {
+                    "object": "chat.completion",
+                    "model": body.get("model"),
+                    "choices": [
+                        {"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}
+                    ],
+                }
+            )
+
+        async def events() -> AsyncIterator[bytes]:
+            # Models generate about four characters per token.
+            for start in range(0, len(answer), 4):
+                if start and behavior.token_latency:
+                    await asyncio.sleep(behavior.token_latency)
+                chunk = {"choices": [{"index": 0, "delta": {"content": answer[start : start + 4]}}]}
+                yield f"data: {json.dumps(chunk)}\n\n".encode()
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def vrf(request: Request, _: Behavior) -> Response:
+        body = await request.json()
+        digest = hashlib.sha512(f"{body.get('seed')}:{body.get('timestamp')}".encode()).hexdigest()
+        return JSONResponse({"proof": (digest + digest)[:160], "hash": digest})
+
+    app = Starlette(
+        routes=[
+            endpoint("verify", verify),
+            endpoint("coin_gecko", coin_gecko),
+            endpoint("coin_market_cap", coin_market_cap),
+            endpoint("crypto_compare", crypto_compare),
+            endpoint("internal_service", internal_service),
+            endpoint("openai", chat_completions),
+            endpoint("mistral", chat_completions),
+            endpoint("vrf", vrf),
+        ]
+    )
+    app.state.calls = Counter()
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="lognormal:0.05:0.5", help="latency distribution of every endpoint")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 500")
+    parser.add_argument("--throttle-interval", type=float, default=0.0, help="seconds between periods of 429s")
+    parser.add_argument("--throttle-duration", type=float, default=0.0, help="seconds each period of 429s lasts")
+    parser.add_argument("--payload-size", type=int, default=0, help="bytes of padding per item of a response")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="seconds between streamed answer parts")
+    parser.add_argument("--config", help="JSON file of behaviors by endpoint, overriding the options above")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    default = {
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "throttle_interval": args.throttle_interval,
+        "throttle_duration": args.throttle_duration,
+        "payload_size": args.payload_size,
+        "token_latency": args.token_latency,
+    }
+    overrides = {}
+    if args.config:
+        with open(args.config) as f:
+            overrides = json.load(f)
+    behaviors = {name: Behavior(**{**default, **overrides.get(name, {})}) for name in PATHS}
+    simulator = create_simulator(behaviors, args.seed)
+
+    for name, path in PATHS.items():
+        print(f"{name:<18} http://{args.host}:{args.port}{path}")
+    uvicorn.run(simulator, host=args.host, port=args.port, log_level="warning")
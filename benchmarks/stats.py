@@ -0,0 +1,37 @@
+import statistics
+from typing import Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Gets the percentile of the samples using the nearest-rank method.
+
+    Args:
+        samples: Samples to compute the percentile of.
+        pct: Percentile between 0 and 100.
+
+    Returns:
+        The percentile value.
+    """
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(name: str, latencies: Sequence[float], elapsed: float) -> str:
+    """Formats a one-line summary of latencies in milliseconds.
+
+    Args:
+        name: Name of the benchmark case.
+        latencies: Per-request latencies in seconds.
+        elapsed: Total wall time in seconds.
+
+    Returns:
+        The formatted summary.
+    """
+    return (
+        f"{name:<32} req/s={len(latencies) / elapsed:>9.1f} "
+        f"mean={statistics.mean(latencies) * 1000:>7.2f}ms "
+        f"p50={percentile(latencies, 50) * 1000:>7.2f}ms "
+        f"p95={percentile(latencies, 95) * 1000:>7.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:>7.2f}ms"
+    )
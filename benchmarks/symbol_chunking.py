@@ -0,0 +1,63 @@
+"""Compares the latency of a single call against concurrent chunked calls as the number of symbols grows.
+
+The stand-in upstream answers after a base latency plus a per-symbol latency, and rejects queries longer than a
+URL limit like the real providers do. Run with `python -m benchmarks.symbol_chunking`.
+"""
+import argparse
+import asyncio
+import time
+
+from adapter import Adapter
+from adapter.standard_crypto_price.coin_gecko import CoinGecko
+from benchmarks.stats import summarize
+from benchmarks.upstream import create_price_app, serve
+
+
+async def measure(adapter: CoinGecko, symbols: list[str], repeat: int) -> str:
+    latencies = []
+    start = time.perf_counter()
+    try:
+        for _ in range(repeat):
+            call_start = time.perf_counter()
+            await adapter.unified_call({"symbols": ",".join(symbols)})
+            latencies.append(time.perf_counter() - call_start)
+    except Exception as e:
+        return f"failed ({e.__class__.__name__})"
+    return summarize("", latencies, time.perf_counter() - start).strip()
+
+
+async def main(repeat: int, latency: float, per_symbol_latency: float, max_query_length: int) -> None:
+    with serve(create_price_app(latency, per_symbol_latency, max_query_length)) as base_url:
+        adapter = CoinGecko()
+        adapter.api_url = f"{base_url}/api/v3/simple/price"
+        adapter.api_key = "benchmark"
+        adapter.requests_per_minute = None
+        universe = adapter.symbol_universe()
+
+        print(
+            f"upstream latency={latency * 1000:.0f}ms + {per_symbol_latency * 1000:.1f}ms/symbol, "
+            f"max query length={max_query_length}"
+        )
+        try:
+            for count in [10, 50, 100, 200, len(universe)]:
+                symbols = universe[:count]
+                for name, max_symbols_per_call, max_query in [
+                    ("single call", None, None),
+                    ("chunks of 50", 50, max_query_length),
+                    ("chunks of 25", 25, max_query_length),
+                ]:
+                    adapter.max_symbols_per_call = max_symbols_per_call
+                    adapter.max_query_length = max_query
+                    print(f"symbols={count:<4} {name:<14} {await measure(adapter, symbols, repeat)}")
+        finally:
+            await Adapter.close_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="upstream base latency in seconds")
+    parser.add_argument("--per-symbol-latency", type=float, default=0.001, help="upstream latency per symbol")
+    parser.add_argument("--max-query-length", type=int, default=2000, help="upstream limit of the ids parameter")
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat, args.latency, args.per_symbol_latency, args.max_query_length))
@@ -0,0 +1,107 @@
+"""Generates, saves and loads validator traffic to replay against the gateway.
+
+A capture is a JSON lines file with one request to the gateway per line, for example:
+
+    {"at": 0.012, "request_id": 1, "external_id": 1, "data_source_id": 1, "validator": "val1",
+     "signature": "sig-1-1", "symbols": ["BTC", "ETH"]}
+
+where `at` is the time in seconds since the start of the capture the request arrived at.
+"""
+import json
+import random
+from typing import Iterable, List, TypedDict
+
+
+class TrafficRequest(TypedDict):
+    at: float
+    request_id: int
+    external_id: int
+    data_source_id: int
+    validator: str
+    signature: str
+    symbols: List[str]
+
+
+def generate_traffic(
+    requests: int,
+    validators: int,
+    symbols: List[str],
+    symbols_per_request: int = 10,
+    duplicate_ratio: float = 0.05,
+    rate: float = 5.0,
+    spread: float = 0.05,
+    seed: int = 0,
+) -> List[TrafficRequest]:
+    """Generates the traffic of validators answering BandChain requests.
+
+    Every validator of a BandChain request sends the same request to the gateway with its own signature, shortly
+    after the request was made. BandChain requests ask for overlapping sets of symbols, as popular symbols are
+    requested more often. Some validators send their request again with the same signature, like they do on a
+    timeout.
+
+    Args:
+        requests: Number of BandChain requests.
+        validators: Number of validators sending each BandChain request.
+        symbols: Symbols to request, from the most to the least popular.
+        symbols_per_request: Number of symbols of each BandChain request.
+        duplicate_ratio: Share of the validators' requests that are sent again.
+        rate: Average number of BandChain requests per second.
+        spread: Average delay in seconds between a BandChain request and a validator's request.
+        seed: Seed of the random generator, the same seed generates the same traffic.
+
+    Returns:
+        The requests to the gateway, in the order they arrive.
+    """
+    rng = random.Random(seed)
+    # Zipf-like popularity, the k-th symbol is requested 1/k as often as the first.
+    weights = [1 / (rank + 1) for rank in range(len(symbols))]
+    traffic: List[TrafficRequest] = []
+
+    at = 0.0
+    for request_id in range(1, requests + 1):
+        at += rng.expovariate(rate)
+        chosen = set()
+        while len(chosen) < min(symbols_per_request, len(symbols)):
+            chosen.update(rng.choices(symbols, weights, k=symbols_per_request - len(chosen)))
+
+        for validator in range(validators):
+            request = TrafficRequest(
+                at=at + rng.expovariate(1 / spread),
+                request_id=request_id,
+                external_id=1,
+                data_source_id=1,
+                validator=f"val{validator}",
+                signature=f"sig-{request_id}-{validator}",
+                symbols=sorted(chosen),
+            )
+            traffic.append(request)
+            if rng.random() < duplicate_ratio:
+                traffic.append({**request, "at": request["at"] + rng.expovariate(1 / spread)})
+
+    return sorted(traffic, key=lambda request: request["at"])
+
+
+def save_traffic(path: str, traffic: Iterable[TrafficRequest]) -> None:
+    """Saves traffic as a capture.
+
+    Args:
+        path: Path of the capture.
+        traffic: Requests to the gateway.
+    """
+    with open(path, "w") as f:
+        for request in traffic:
+            f.write(json.dumps(request) + "\n")
+
+
+def load_traffic(path: str) -> List[TrafficRequest]:
+    """Loads the traffic of a capture.
+
+    Args:
+        path: Path of the capture.
+
+    Returns:
+        The requests to the gateway, in the order they arrive.
+    """
+    with open(path) as f:
+        traffic = [TrafficRequest(**json.loads(line)) for line in f if line.strip()]
+    return sorted(traffic, key=lambda request: request["at"])
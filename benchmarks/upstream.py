@@ -0,0 +1,72 @@
+import asyncio
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def get_free_port() -> int:
+    """Gets a free TCP port on localhost.
+
+    Returns:
+        The port number.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def create_price_app(latency: float = 0.0, per_symbol_latency: float = 0.0, max_query_length: int = None) -> Starlette:
+    """Creates a stand-in upstream that answers like CoinGecko's `simple/price` endpoint.
+
+    Args:
+        latency: Time in seconds the upstream waits before answering.
+        per_symbol_latency: Additional time in seconds the upstream waits for each requested symbol.
+        max_query_length: Maximum length of the `ids` parameter, longer queries are rejected with a 414.
+
+    Returns:
+        The upstream ASGI application.
+    """
+
+    async def simple_price(request: Request) -> JSONResponse:
+        query = request.query_params.get("ids", "")
+        if max_query_length and len(query) > max_query_length:
+            return JSONResponse({"error": "URI too long"}, status_code=414)
+
+        ids = [id_ for id_ in query.split(",") if id_]
+        if delay := latency + per_symbol_latency * len(ids):
+            await asyncio.sleep(delay)
+        return JSONResponse({id_: {"usd": 1.0} for id_ in ids})
+
+    return Starlette(routes=[Route("/api/v3/simple/price", simple_price)])
+
+
+@contextmanager
+def serve(app, port: int = None) -> Iterator[str]:
+    """Serves an ASGI application on localhost in a background thread.
+
+    Args:
+        app: ASGI application to serve.
+        port: Port to listen on. A free port is picked if not given.
+
+    Yields:
+        The base URL of the running server.
+    """
+    port = port or get_free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
@@ -0,0 +1,27 @@
+"""A gateway stand-in served by several uvicorn processes in `test_distributed_dedup.py`."""
+import asyncio
+
+from fastapi import FastAPI
+from redis.asyncio import Redis
+
+from app.middleware import RequestCacheMiddleware
+from app.utils.cache import AsyncCacheWrapper, LocalCache
+from app.utils.single_flight import RedisSingleFlight
+from tests.utils import REDIS_DB, REDIS_HOST, REDIS_PORT
+
+redis = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+
+app = FastAPI()
+app.add_middleware(
+    RequestCacheMiddleware,
+    cache=AsyncCacheWrapper(LocalCache(100, 60)),
+    timeout=5,
+    distributed_flights=RedisSingleFlight(redis, lease_ttl=5),
+)
+
+
+@app.get("/request")
+async def request():
+    calls = await redis.incr("upstream_calls")
+    await asyncio.sleep(0.3)
+    return {"calls": calls}
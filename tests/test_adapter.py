@@ -1,5 +1,5 @@
 import pytest
-from adapter import init_adapter
+from adapter import Adapter, init_adapter
 
 
 @pytest.mark.asyncio
@@ -10,3 +10,16 @@ async def test_init_adapter():
     adapter.verify_output("", "")
     assert adapter.parse_output({}) == "mock_output"
     assert await adapter.call({}) == "called"
+
+
+@pytest.mark.asyncio
+async def test_adapters_share_pooled_client():
+    first = init_adapter("mock", "mock")
+    second = init_adapter("mock", "mock")
+
+    client = Adapter.open_client(max_connections=10)
+    assert first.client is client
+    assert second.client is client
+
+    await Adapter.close_client()
+    assert client.is_closed
@@ -0,0 +1,137 @@
+import asyncio
+
+import httpx
+import pytest
+
+from adapter import Adapter, CircuitBreaker, CircuitOpenError, RetryBudget
+from adapter.mock.mock import Mock
+
+
+class FlakyAdapter(Mock):
+    idempotent = True
+    retry_backoff = 0.01
+
+    def __init__(self, failures: int, status_code: int = 503):
+        self.failures = failures
+        self.status_code = status_code
+        self.calls = 0
+
+    async def call(self, _) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            request = httpx.Request("GET", "https://provider")
+            response = httpx.Response(self.status_code, request=request)
+            raise httpx.HTTPStatusError("Service Unavailable", request=request, response=response)
+        return "called"
+
+
+@pytest.fixture(autouse=True)
+def retry_budget(monkeypatch) -> RetryBudget:
+    budget = RetryBudget(ratio=0.0, min_retries_per_second=0.3, window=10)
+    monkeypatch.setattr(Adapter, "retry_budget", budget)
+    return budget
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_failures_and_closes_after_a_successful_trial():
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_rate_threshold=0.5, open_duration=0.05)
+    for failed in [False, True, False, True]:
+        breaker.before_call()
+        breaker.record(0.01, failed=failed)
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # Once half-open, a single trial call is let through and its failure opens the breaker again.
+    await asyncio.sleep(0.05)
+    probe = breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record(0.01, failed=True, probe=probe)
+    assert breaker.state == "open"
+
+    await asyncio.sleep(0.05)
+    probe = breaker.before_call()
+    breaker.record(0.01, failed=False, probe=probe)
+    assert breaker.state == "closed"
+    assert breaker.stats()["opened"] == 2
+    assert breaker.stats()["rejected"] == 2
+
+
+@pytest.mark.asyncio
+async def test_calls_let_through_before_opening_do_not_decide_trials():
+    breaker = CircuitBreaker(window=2, min_calls=2, open_duration=0.05)
+    breaker.before_call()
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record(0.01, failed=True)
+
+    await asyncio.sleep(0.05)
+    probe = breaker.before_call()
+    # The call let through while the breaker was closed completes during the trial.
+    breaker.record(0.01, failed=False)
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(0.01, failed=False, probe=probe)
+    assert breaker.state == "closed"
+
+
+def test_breaker_opens_on_slow_calls():
+    breaker = CircuitBreaker(window=4, min_calls=4, slow_call_duration=1.0, slow_call_rate_threshold=0.75)
+    for duration in [2.0, 0.1, 2.0, 2.0]:
+        breaker.record(duration, failed=False)
+
+    assert breaker.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_idempotent_calls_are_retried_on_transient_errors():
+    adapter = FlakyAdapter(failures=2)
+
+    assert await adapter.unified_call({}) == "mock_output"
+    assert adapter.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_calls_are_not_retried_when_not_idempotent_or_rejected_as_invalid():
+    adapter = FlakyAdapter(failures=1)
+    adapter.idempotent = False
+    with pytest.raises(httpx.HTTPStatusError):
+        await adapter.unified_call({})
+    assert adapter.calls == 1
+
+    adapter = FlakyAdapter(failures=1, status_code=400)
+    with pytest.raises(httpx.HTTPStatusError):
+        await adapter.unified_call({})
+    assert adapter.calls == 1
+    assert adapter.circuit_breaker.failure_rate == 0
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_when_the_budget_is_spent(retry_budget):
+    # The budget allows 3 retries in its window, shared by every adapter.
+    first, second = FlakyAdapter(failures=2), FlakyAdapter(failures=2)
+
+    assert await first.unified_call({}) == "mock_output"
+    with pytest.raises(httpx.HTTPStatusError):
+        await second.unified_call({})
+
+    assert second.calls == 2
+    assert retry_budget.stats() == {"requests": 2, "retries": 3, "exhausted": 1}
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast_without_calling_the_provider():
+    adapter = FlakyAdapter(failures=100)
+    adapter.max_retries = 0
+    for _ in range(adapter.circuit_breaker.min_calls):
+        with pytest.raises(httpx.HTTPStatusError):
+            await adapter.unified_call({})
+
+    with pytest.raises(CircuitOpenError):
+        await adapter.unified_call({})
+    assert adapter.calls == adapter.circuit_breaker.min_calls
+    assert adapter.circuit_breakers()["FlakyAdapter"].state == "open"
@@ -0,0 +1,34 @@
+import pytest
+from starlette.responses import JSONResponse
+
+from adapter import codec
+from app.utils.response import CodecJSONResponse
+
+PAYLOAD = {
+    "prices": [{"symbol": "BAND", "price": 1.2345, "timestamp": 1700000000}, {"symbol": "ÉTH", "price": 0.5}],
+    "answer": 'Brie, "Camembert"\n\tet Roquefort é 🧀 \\ </script>',
+    "nested": {"empty": [], "none": None, "flags": [True, False], "big": 12345678901234567890},
+}
+
+
+@pytest.fixture
+def restore_codec():
+    name = codec.name
+    yield
+    codec.use(name)
+
+
+@pytest.mark.parametrize("name", list(codec.CODECS))
+def test_codecs_encode_like_starlette(name, restore_codec):
+    codec.use(name)
+
+    assert CodecJSONResponse(PAYLOAD).body == JSONResponse(PAYLOAD).body
+    assert codec.loads(codec.dumps(PAYLOAD)) == PAYLOAD
+    assert codec.dumps({1: "a"}) == b'{"1":"a"}'
+    # Exponents may be written differently, like 3e-5 instead of 3e-05, but decode to the same number.
+    assert codec.loads(codec.dumps({"price": 3e-05})) == {"price": 3e-05}
+
+
+def test_unknown_codec_is_rejected(restore_codec):
+    with pytest.raises(Exception):
+        codec.use("simdjson")
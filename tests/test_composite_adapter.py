@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from adapter.standard_crypto_price.base import StandardCryptoPrice, Input, Output
+from adapter.standard_crypto_price.composite import Composite, ProviderStats
+
+
+class MockProvider(StandardCryptoPrice):
+    def __init__(self, name: str, latency: float = 0.0, fail: bool = False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    async def call(self, input_: Input) -> Output:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise Exception(f"{self.name} failed")
+        return Output(prices=[{"symbol": s, "price": 1.0, "timestamp": 1} for s in input_["symbols"]])
+
+
+@pytest.fixture
+def providers() -> dict[str, MockProvider]:
+    return {
+        "slow": MockProvider("slow", latency=0.2),
+        "fast": MockProvider("fast", latency=0.01),
+        "broken": MockProvider("broken", fail=True),
+    }
+
+
+@pytest.fixture
+def composite(monkeypatch, providers) -> Composite:
+    monkeypatch.setenv("COMPOSITE_PROVIDERS", "slow,fast,broken")
+    monkeypatch.setenv("COMPOSITE_DEFAULT_HEDGE_DELAY", "0.05")
+    monkeypatch.setattr(Composite, "init_provider", staticmethod(lambda name: providers[name]))
+    return Composite()
+
+
+@pytest.mark.asyncio
+async def test_hedges_slow_provider(composite, providers):
+    response = await composite.unified_call({"symbols": "BTC,ETH"})
+
+    assert len(response["prices"]) == 2
+    assert (providers["slow"].calls, providers["fast"].calls, providers["broken"].calls) == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_routes_to_fastest_healthy_provider(composite, providers):
+    for _ in range(3):
+        await composite.unified_call({"symbols": "BTC"})
+
+    assert composite.rank()[0] == "fast"
+    assert providers["slow"].calls == 1
+    assert providers["fast"].calls == 3
+    assert providers["broken"].calls == 0
+
+
+@pytest.mark.asyncio
+async def test_fails_over_on_error(composite, providers):
+    composite.stats["broken"].record(0.001)
+
+    for _ in range(2):
+        response = await composite.unified_call({"symbols": "BTC"})
+        assert len(response["prices"]) == 1
+
+    assert providers["broken"].calls == 2
+    assert not composite.stats["broken"].healthy
+    assert composite.rank()[-1] == "broken"
+
+
+@pytest.mark.asyncio
+async def test_raises_when_every_provider_fails(composite, providers):
+    for provider in providers.values():
+        provider.fail = True
+
+    with pytest.raises(Exception):
+        await composite.unified_call({"symbols": "BTC"})
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_do_not_lower_the_latency_of_the_losing_provider(composite, providers):
+    # The slow provider keeps being called first and hedged after its fastest latency, and loses every race.
+    for latency in [0.02, 0.2, 0.2, 0.2, 0.2]:
+        composite.stats["slow"].record(latency)
+    composite.hedge_percentile = 0
+    composite.rank = lambda: ["slow", "fast"]
+
+    for _ in range(5):
+        await composite.unified_call({"symbols": "BTC"})
+
+    assert providers["fast"].calls == 5
+    assert composite.stats["slow"].latency(50) == 0.2
+
+
+def test_rank_providers_that_always_fail(monkeypatch, composite):
+    monkeypatch.setattr(ProviderStats, "error_rate", property(lambda self: 1.0))
+
+    assert composite.rank() == ["slow", "fast", "broken"]
+
+
+def test_reports_its_own_and_provider_rate_limiters(composite, providers):
+    composite.requests_per_minute = 600
+    providers["fast"].requests_per_minute = 60
+
+    assert composite.rate_limiters() == {
+        "Composite": composite.rate_limiter,
+        "MockProvider": providers["fast"].rate_limiter,
+    }
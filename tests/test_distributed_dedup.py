@@ -0,0 +1,162 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, HTTPException
+from redis.asyncio import Redis
+
+from app.middleware import RequestCacheMiddleware
+from app.utils.cache import AsyncCacheWrapper, LocalCache
+from app.utils.keys import CacheKeys
+from app.utils.single_flight import RedisSingleFlight
+from tests.utils import REDIS_DB, REDIS_HOST, REDIS_PORT, get_free_port, redis_available
+
+pytestmark = pytest.mark.skipif(not redis_available(), reason="redis server is not available")
+
+HEADERS = {"BAND_REQUEST_ID": "1", "BAND_EXTERNAL_ID": "1"}
+
+
+@pytest_asyncio.fixture
+async def redis():
+    client = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+    await client.flushdb()
+    yield client
+    await client.flushdb()
+    await client.close()
+
+
+def build_replica(
+    redis: Redis, calls: list[str], name: str, fail: bool = False, lease_ttl: float = 5, delay: float = 0.2
+) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        RequestCacheMiddleware,
+        cache=AsyncCacheWrapper(LocalCache(100, 60)),
+        timeout=5,
+        distributed_flights=RedisSingleFlight(redis, lease_ttl=lease_ttl),
+    )
+
+    @app.get("/request")
+    async def request():
+        calls.append(name)
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("upstream failed")
+        return {"replica": name}
+
+    return app
+
+
+async def get(app: FastAPI) -> httpx.Response:
+    async with httpx.AsyncClient(app=app, base_url="http://test_pds") as client:
+        return await client.get("/request", headers=HEADERS)
+
+
+@pytest.mark.asyncio
+async def test_replicas_share_one_upstream_call(redis):
+    calls = []
+    replicas = [build_replica(redis, calls, str(i)) for i in range(3)]
+
+    responses = await asyncio.gather(*[get(replicas[i % 3]) for i in range(12)])
+
+    assert len(calls) == 1
+    assert all(res.json() == {"replica": calls[0]} for res in responses)
+
+
+@pytest.mark.asyncio
+async def test_later_request_reuses_stored_response(redis):
+    calls = []
+    first, second = build_replica(redis, calls, "a"), build_replica(redis, calls, "b")
+
+    await get(first)
+    response = await get(second)
+
+    assert calls == ["a"]
+    assert response.json() == {"replica": "a"}
+
+
+@pytest.mark.asyncio
+async def test_lease_is_renewed_while_leader_outlives_it(redis):
+    calls = []
+    leader = build_replica(redis, calls, "leader", lease_ttl=0.3, delay=1)
+    follower = build_replica(redis, calls, "follower", lease_ttl=0.3)
+
+    async def get_follower():
+        await asyncio.sleep(0.1)
+        return await get(follower)
+
+    responses = await asyncio.gather(get(leader), get_follower())
+
+    assert calls == ["leader"]
+    assert all(res.json() == {"replica": "leader"} for res in responses)
+
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_abandoned_lease(redis):
+    calls = []
+    failing = build_replica(redis, calls, "failing", fail=True)
+    healthy = build_replica(redis, calls, "healthy")
+
+    async def get_failing():
+        with pytest.raises(RuntimeError):
+            await get(failing)
+
+    async def get_healthy():
+        await asyncio.sleep(0.05)
+        return await get(healthy)
+
+    _, response = await asyncio.gather(get_failing(), get_healthy())
+
+    assert calls == ["failing", "healthy"]
+    assert response.json() == {"replica": "healthy"}
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed(redis):
+    calls = []
+    # A lease left behind by a leader that died without releasing it.
+    await redis.set(f"pds:flight:{CacheKeys().key('request', 1, 1)}:lease", "dead", px=300)
+
+    start = time.monotonic()
+    response = await get(build_replica(redis, calls, "healthy", lease_ttl=0.3))
+
+    assert calls == ["healthy"]
+    assert response.json() == {"replica": "healthy"}
+    assert 0.3 <= time.monotonic() - start < 2
+
+
+@pytest.mark.asyncio
+async def test_uvicorn_processes_share_one_upstream_call(redis):
+    ports = [get_free_port() for _ in range(3)]
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "tests.dedup_app:app", "--port", str(port), "--log-level", "warning"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        for port in ports
+    ]
+    try:
+        async with httpx.AsyncClient() as client:
+            for port in ports:
+                for _ in range(100):
+                    try:
+                        await client.get(f"http://127.0.0.1:{port}/docs")
+                        break
+                    except httpx.TransportError:
+                        await asyncio.sleep(0.1)
+
+            responses = await asyncio.gather(
+                *[client.get(f"http://127.0.0.1:{ports[i % 3]}/request", headers=HEADERS) for i in range(30)]
+            )
+
+        assert int(await redis.get("upstream_calls")) == 1
+        assert all(res.json() == {"calls": 1} for res in responses)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
@@ -1,6 +1,11 @@
+import dataclasses
+
+import pytest
+
 from app.utils.helper import (
     add_max_delay_param,
     get_bandchain_params,
+    get_bandchain_params_from_scope,
 )
 
 
@@ -60,3 +65,27 @@ def test_add_max_delay_param():
         "signature": "coolsignature",
         "max_delay": "10",
     }
+
+
+def test_get_bandchain_params_from_scope():
+    headers = {**mock_headers, "BAND_REQUEST_ID": "x"}
+    scope = {"headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]}
+
+    params = get_bandchain_params_from_scope(scope)
+
+    assert params.raw == {**get_bandchain_params(mock_headers), "request_id": "x"}
+    assert (params.request_id, params.external_id, params.data_source_id) == (None, 1, 1)
+    assert params.validator == "bandcoolvalidator"
+    assert params.signature == "coolsignature"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        params.request_id = 1
+
+
+def test_bandchain_params_are_parsed_once_per_request():
+    scope = {"headers": [(b"band_request_id", b"1")]}
+
+    params = get_bandchain_params_from_scope(scope)
+    scope["headers"] = []
+
+    assert get_bandchain_params_from_scope(scope) is params
+    assert scope["state"]["bandchain_params"] is params
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.utils.keys import CacheKeys
+
+# Prints the keys of every cache user, computed in a fresh process.
+SCRIPT = """
+from app.utils.keys import CacheKeys
+
+keys = CacheKeys("standard_crypto_price.coin_gecko", secret="secret")
+print(keys.key("request", 1, 1))
+print(keys.key("signature", "c2lnbmF0dXJl"))
+print(keys.key("verify", "laozi-mainnet", "val1", 1, 1, 1, "reporter", "c2lnbmF0dXJl"))
+"""
+
+
+def compute_keys(hash_seed: str) -> list[str]:
+    env = {**os.environ, "PYTHONHASHSEED": hash_seed, "PYTHONPATH": os.getcwd()}
+    output = subprocess.run([sys.executable, "-c", SCRIPT], env=env, capture_output=True, check=True, text=True)
+    return output.stdout.split()
+
+
+def test_processes_derive_the_same_keys():
+    keys = compute_keys("1")
+
+    assert keys == compute_keys("2")
+    assert len(set(keys)) == 3
+
+
+def test_keys_are_namespaced():
+    keys = CacheKeys("mock.mock")
+
+    assert keys.key("request", 1, 1).startswith("pds:mock.mock:request:v1:")
+    assert keys.key("request", 1, 1) != keys.key("signature", 1, 1)
+    assert keys.key("request", 1, 1) != CacheKeys("mock.other").key("request", 1, 1)
+    assert keys.key("request", 1, 1) != CacheKeys("mock.mock", version=2).key("request", 1, 1)
+    assert keys.key("request", 1, 1) != CacheKeys("mock.mock", secret="secret").key("request", 1, 1)
+    assert keys.key("signature", "ab", "c") != keys.key("signature", "a", "bc")
+
+
+def test_overlong_secret_is_rejected():
+    with pytest.raises(Exception):
+        CacheKeys(secret="s" * 65)
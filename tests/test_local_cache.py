@@ -1,4 +1,5 @@
 from app.utils import cache
+from app.utils.response import RecordedResponse
 from pytimeparse.timeparse import timeparse
 import pytest
 import time
@@ -43,3 +44,59 @@ def test_cache_data_expire(cache_data):
     time.sleep(1.1)
 
     assert cache_data.get(hash("1")) is None
+
+
+@pytest.mark.asyncio
+async def test_async_wrapper_get_set_many(cache_data):
+    async_cache = cache.AsyncCacheWrapper(cache_data)
+    await async_cache.set_many({hash("1"): {"a": "b"}, hash("2"): {"c": "d"}})
+
+    assert await async_cache.get(hash("1")) == {"a": "b"}
+    assert await async_cache.get_many([hash("2"), hash("99"), hash("1")]) == [{"c": "d"}, None, {"a": "b"}]
+
+
+def test_cache_is_bounded_by_bytes():
+    local_cache = cache.LocalCache(1000, 60, max_bytes=10 * cache.LocalCache.ENTRY_OVERHEAD + 5000)
+
+    for i in range(20):
+        local_cache.set(i, {"answer": "x" * 500})
+
+    stats = local_cache.stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["bytes"] == sum(entry.size for entry in local_cache.entries.values())
+    assert stats["entries"] + stats["evictions"] == 20
+
+
+def test_large_entries_are_evicted_before_small_ones():
+    response = RecordedResponse(200, [(b"content-type", b"application/json")], b"x" * 3000)
+    local_cache = cache.LocalCache(1000, 60, max_bytes=8000)
+
+    for i in range(10):
+        local_cache.set(f"small-{i}", {"hash": i})
+    local_cache.set("large-1", response)
+    local_cache.set("large-2", response)
+
+    assert local_cache.get("large-1") is None
+    assert local_cache.get("large-2") is response
+    assert all(local_cache.get(f"small-{i}") == {"hash": i} for i in range(10))
+
+
+def test_recently_used_entries_are_kept():
+    local_cache = cache.LocalCache(1000, 60, max_bytes=3 * (cache.LocalCache.ENTRY_OVERHEAD + 100))
+
+    for key in ["1", "2", "3"]:
+        local_cache.set(key, "x" * 100)
+    local_cache.get("1")
+    local_cache.set("4", "x" * 100)
+
+    assert local_cache.get("2") is None
+    assert [local_cache.get(key) for key in ["1", "3", "4"]] == ["x" * 100] * 3
+
+
+def test_entries_larger_than_the_cache_are_not_cached():
+    local_cache = cache.LocalCache(1000, 60, max_bytes=1000)
+    local_cache.set("key", "small")
+    local_cache.set("key", "x" * 1000)
+
+    assert local_cache.get("key") is None
+    assert local_cache.stats()["bytes"] == 0
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Imports the gateway and builds the middleware stack of every app, which instantiates each middleware.
+SCRIPT = """
+from fastapi import FastAPI
+
+import app.main as main
+
+main.app.build_middleware_stack()
+for route in main.app.routes:
+    if isinstance(getattr(route, "app", None), FastAPI):
+        route.app.build_middleware_stack()
+print(main.REGISTRY.expose())
+"""
+
+ENV = {
+    "VERIFY_REQUEST_URL": "https://laozi1.bandchain.org/api/oracle/v1/verify_request",
+    "ALLOWED_DATA_SOURCE_IDS": "[1]",
+    "ADAPTER_TYPE": "mock",
+    "ADAPTER_NAME": "mock",
+    "CACHE_TYPE": "local",
+    "MONGO_DB_URL": "",
+}
+
+
+@pytest.mark.parametrize("mode", ["production", "development"])
+def test_gateway_starts(mode):
+    env = {**os.environ, **ENV, "MODE": mode, "PYTHONPATH": os.getcwd()}
+    result = subprocess.run([sys.executable, "-c", SCRIPT], env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert 'pds_verify_cache_requests_total{result="hit"} 0' in result.stdout
@@ -0,0 +1,56 @@
+import pytest
+
+from adapter import Adapter, init_adapter
+from app.utils.metrics import CallbackMetric, Counter, Histogram, Registry
+
+
+def test_metrics_are_exposed_in_the_prometheus_text_format():
+    registry = Registry()
+    requests = registry.register(Counter("requests", "Requests.", ["result"]))
+    latency = registry.register(Histogram("latency_seconds", "Latency.", buckets=[0.1, 1]))
+    registry.register(CallbackMetric("queue_depth", "Queue depth.", lambda: {(): 3}))
+
+    hits = requests.labels("hit")
+    hits.inc()
+    hits.inc()
+    requests.labels('mi"ss').inc()
+    for value in [0.05, 0.1, 0.5, 5]:
+        latency.observe(value)
+
+    assert registry.expose().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{result="hit"} 2.0',
+        'requests_total{result="mi\\"ss"} 1.0',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_count 4",
+        "latency_seconds_sum 5.65",
+        "# HELP queue_depth Queue depth.",
+        "# TYPE queue_depth gauge",
+        "queue_depth 3",
+    ]
+
+
+def test_labels_must_match_the_label_names():
+    with pytest.raises(ValueError):
+        Counter("requests", "Requests.", ["result"]).labels("hit", "extra")
+
+
+@pytest.mark.asyncio
+async def test_adapter_stages_are_reported_to_the_stage_observer(monkeypatch):
+    observed = []
+    monkeypatch.setattr(Adapter, "stage_observer", lambda *args: observed.append(args[:2]))
+
+    await init_adapter("mock", "mock").unified_call({})
+
+    assert observed == [
+        ("Mock", "parse_input"),
+        ("Mock", "call"),
+        ("Mock", "fetch"),
+        ("Mock", "verify_output"),
+        ("Mock", "parse_output"),
+    ]
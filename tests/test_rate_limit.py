@@ -0,0 +1,121 @@
+import asyncio
+import time
+from email.utils import formatdate
+from unittest import mock
+
+import httpx
+import pytest
+
+from adapter import CircuitOpenError, RateLimiter, RateLimitExceededError
+from adapter.mock.mock import Mock
+from adapter.rate_limit import parse_retry_after
+
+
+class ThrottledAdapter(Mock):
+    requests_per_minute = 600
+
+    def __init__(self, retry_after: str = None):
+        self.retry_after = retry_after
+        self.calls = []
+
+    async def call(self, _) -> str:
+        self.calls.append(time.monotonic())
+        if self.retry_after is not None and len(self.calls) == 1:
+            request = httpx.Request("GET", "https://provider")
+            response = httpx.Response(429, headers={"Retry-After": self.retry_after}, request=request)
+            raise httpx.HTTPStatusError("Too Many Requests", request=request, response=response)
+        return "called"
+
+
+@pytest.mark.asyncio
+async def test_requests_over_the_burst_wait_for_tokens():
+    limiter = RateLimiter(rate=20, burst=2, max_wait=1, max_queue=10)
+
+    start = time.monotonic()
+    await asyncio.gather(*[limiter.acquire() for _ in range(4)])
+
+    # The first two requests use the burst, the next two wait 0.05s and 0.1s for their tokens.
+    assert time.monotonic() - start >= 0.1
+    assert limiter.stats()["acquired"] == 4
+    assert limiter.stats()["waited"] == 2
+    assert limiter.stats()["max_wait_time"] == pytest.approx(0.1, abs=0.01)
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_are_rejected_when_the_queue_is_full_or_the_wait_too_long():
+    limiter = RateLimiter(rate=10, burst=1, max_wait=0.25, max_queue=1)
+    await limiter.acquire()
+
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(RateLimitExceededError):
+        await limiter.acquire()
+    await waiting
+
+    # The queued requests wait 0.1s and 0.2s, so a third one would wait longer than 0.25s.
+    limiter.max_queue = 10
+    waiting = [asyncio.create_task(limiter.acquire()) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(RateLimitExceededError) as e:
+        await limiter.acquire()
+    await asyncio.gather(*waiting)
+    assert e.value.retry_after > 0.25
+    assert limiter.rejected == 2
+
+
+@pytest.mark.asyncio
+async def test_queued_requests_wait_for_a_later_pause():
+    limiter = RateLimiter(rate=10, burst=1, max_wait=1, max_queue=10)
+    await limiter.acquire()
+
+    start = time.monotonic()
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.05)
+    limiter.pause(0.3)
+    await waiting
+
+    # The request was due at 0.1s, and no tokens were added during the 0.3s pause from 0.05s.
+    assert time.monotonic() - start >= 0.4
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_calls_rejected_by_the_circuit_breaker_take_no_token():
+    adapter = ThrottledAdapter()
+    adapter.circuit_breaker.before_call = mock.Mock(side_effect=CircuitOpenError(1))
+
+    with pytest.raises(CircuitOpenError):
+        await adapter.unified_call({})
+    assert adapter.calls == []
+    assert adapter.rate_limiter.acquired == 0
+
+
+@pytest.mark.asyncio
+async def test_adapter_retries_after_the_providers_retry_after():
+    adapter = ThrottledAdapter(retry_after="0.2")
+
+    assert await adapter.unified_call({}) == "mock_output"
+    assert len(adapter.calls) == 2
+    assert adapter.calls[1] - adapter.calls[0] >= 0.2
+    assert list(adapter.rate_limiters()) == ["ThrottledAdapter"]
+
+
+@pytest.mark.asyncio
+async def test_adapter_fails_fast_when_retry_after_exceeds_the_max_wait(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_MAX_WAIT", "1s")
+    adapter = ThrottledAdapter(retry_after="30")
+
+    with pytest.raises(RateLimitExceededError):
+        await adapter.unified_call({})
+    assert len(adapter.calls) == 1
+
+
+def test_parse_retry_after():
+    def response(value: str) -> httpx.Response:
+        return httpx.Response(429, headers={"Retry-After": value})
+
+    assert parse_retry_after(response("3")) == 3
+    assert parse_retry_after(response(formatdate(time.time() + 60, usegmt=True))) == pytest.approx(60, abs=2)
+    assert parse_retry_after(response("soon")) is None
+    assert parse_retry_after(httpx.Response(429)) is None
@@ -0,0 +1,51 @@
+import pytest
+import pytest_asyncio
+
+from app.utils.cache import AsyncRedisCache
+from app.utils.response import RecordedResponse
+from tests.utils import REDIS_DB, REDIS_HOST, REDIS_PORT, redis_available
+
+pytestmark = pytest.mark.skipif(not redis_available(), reason="redis server is not available")
+
+
+@pytest_asyncio.fixture
+async def redis_cache():
+    cache = AsyncRedisCache(REDIS_HOST, REDIS_PORT, db=REDIS_DB, ttl=5)
+    await cache.redis.flushdb()
+    yield cache
+    await cache.redis.flushdb()
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_set_with_ttl(redis_cache):
+    await redis_cache.set("key", {"a": "b"})
+
+    assert await redis_cache.get("key") == {"a": "b"}
+    assert 0 < await redis_cache.redis.ttl("key") <= 5
+
+
+@pytest.mark.asyncio
+async def test_get_set_many(redis_cache):
+    await redis_cache.set_many({"1": {"a": "b"}, "2": {"c": "d"}})
+
+    assert await redis_cache.get_many(["2", "99", "1"]) == [{"c": "d"}, None, {"a": "b"}]
+    assert await redis_cache.redis.ttl("2") > 0
+
+
+@pytest.mark.asyncio
+async def test_set_rejects_non_dict(redis_cache):
+    with pytest.raises(TypeError):
+        await redis_cache.set("key", "value")
+
+
+@pytest.mark.asyncio
+async def test_responses_are_stored_as_raw_bytes(redis_cache):
+    response = RecordedResponse(202, [(b"content-type", b"application/json"), (b"x-empty", b"")], b'{"a":"\xc3\xa9"}')
+
+    await redis_cache.set_response("response", response)
+    await redis_cache.set("dict", {"a": "b"})
+
+    assert await redis_cache.get_response("response") == response
+    assert await redis_cache.get_response("dict") is None
+    assert await redis_cache.get_response("missing") is None
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.report import ReportWriter
+
+
+class MockCollection:
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.batches = []
+
+    async def insert_many(self, documents, ordered=True):
+        await asyncio.sleep(self.latency)
+        self.batches.append(documents)
+
+
+@pytest.mark.asyncio
+async def test_flush_when_batch_is_full():
+    collection = MockCollection()
+    writer = ReportWriter(batch_size=3, flush_interval=10)
+
+    for i in range(6):
+        await writer.put(collection, {"i": i})
+    await asyncio.sleep(0.05)
+
+    assert collection.batches == [[{"i": 0}, {"i": 1}, {"i": 2}], [{"i": 3}, {"i": 4}, {"i": 5}]]
+    assert (writer.queued, writer.flushed, writer.queue_depth) == (6, 6, 0)
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_flush_after_interval():
+    collection = MockCollection()
+    writer = ReportWriter(batch_size=100, flush_interval=0.1)
+
+    await writer.put(collection, {"i": 0})
+    await asyncio.sleep(0.05)
+    assert collection.batches == []
+
+    await asyncio.sleep(0.1)
+    assert collection.batches == [[{"i": 0}]]
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_drop_when_queue_is_full():
+    collection = MockCollection()
+    writer = ReportWriter(max_queue_size=2, batch_size=100, flush_interval=10)
+
+    for i in range(5):
+        await writer.put(collection, {"i": i})
+
+    assert (writer.queued, writer.dropped, writer.queue_depth) == (2, 3, 2)
+
+    await writer.stop()
+    assert collection.batches == [[{"i": 0}, {"i": 1}]]
+    assert writer.flushed == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_writes_the_batch_being_collected():
+    collection = MockCollection()
+    writer = ReportWriter(batch_size=100, flush_interval=10)
+
+    for i in range(3):
+        await writer.put(collection, {"i": i})
+    await asyncio.sleep(0.05)
+    assert writer.queue_depth == 0
+
+    await writer.stop()
+    assert collection.batches == [[{"i": 0}, {"i": 1}, {"i": 2}]]
+
+
+@pytest.mark.asyncio
+async def test_stop_finishes_the_flush_in_flight():
+    collection = MockCollection(latency=0.1)
+    writer = ReportWriter(batch_size=3, flush_interval=10)
+
+    for i in range(4):
+        await writer.put(collection, {"i": i})
+    await asyncio.sleep(0.05)
+    assert collection.batches == []
+
+    await writer.stop()
+    assert collection.batches == [[{"i": 0}, {"i": 1}, {"i": 2}], [{"i": 3}]]
+    assert writer.flushed == 4
@@ -0,0 +1,119 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from starlette.responses import StreamingResponse
+
+from app.middleware import RequestCacheMiddleware, SignatureCacheMiddleware
+from app.utils.cache import AsyncCacheWrapper, LocalCache
+
+HEADERS = {"BAND_REQUEST_ID": "1", "BAND_EXTERNAL_ID": "1"}
+
+
+class Upstream:
+    def __init__(self, latency: float = 0.1, fail: bool = False) -> None:
+        self.calls = 0
+        self.latency = latency
+        self.fail = fail
+
+
+def build_app(upstream: Upstream, timeout: float = 5) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestCacheMiddleware, cache=AsyncCacheWrapper(LocalCache(100, 60)), timeout=timeout)
+
+    @app.get("/request")
+    async def request():
+        upstream.calls += 1
+        await asyncio.sleep(upstream.latency)
+        if upstream.fail:
+            raise HTTPException(status_code=502, detail="upstream failed")
+        return {"prices": [{"symbol": "BAND", "price": 1.0, "timestamp": 1}]}
+
+    return app
+
+
+async def send_concurrently(app: FastAPI, n: int) -> list[httpx.Response]:
+    async with httpx.AsyncClient(app=app, base_url="http://test_pds") as client:
+        return await asyncio.gather(*[client.get("/request", headers=HEADERS) for _ in range(n)])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_call_upstream_once():
+    upstream = Upstream()
+    responses = await send_concurrently(build_app(upstream), 20)
+
+    assert upstream.calls == 1
+    assert all(res.status_code == 200 for res in responses)
+    assert len({res.content for res in responses}) == 1
+
+
+@pytest.mark.asyncio
+async def test_completed_response_is_served_from_cache():
+    upstream = Upstream(latency=0)
+    app = build_app(upstream)
+
+    first = await send_concurrently(app, 1)
+    second = await send_concurrently(app, 5)
+
+    assert upstream.calls == 1
+    assert all(res.json() == first[0].json() for res in second)
+
+
+@pytest.mark.asyncio
+async def test_failure_is_propagated_and_not_cached():
+    upstream = Upstream(fail=True)
+    app = build_app(upstream)
+
+    responses = await send_concurrently(app, 10)
+    assert upstream.calls == 1
+    assert all(res.status_code == 502 for res in responses)
+
+    await send_concurrently(app, 1)
+    assert upstream.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_followers_request_directly_after_timeout():
+    upstream = Upstream(latency=0.5)
+    responses = await send_concurrently(build_app(upstream, timeout=0.1), 3)
+
+    assert upstream.calls == 3
+    assert all(res.status_code == 200 for res in responses)
+
+
+@pytest.mark.asyncio
+async def test_cached_response_is_replayed_byte_for_byte():
+    app = FastAPI()
+    app.add_middleware(SignatureCacheMiddleware, cache=AsyncCacheWrapper(LocalCache(100, 60)))
+    app.add_middleware(RequestCacheMiddleware, cache=AsyncCacheWrapper(LocalCache(100, 60)), timeout=5)
+
+    @app.get("/request")
+    async def request():
+        async def body():
+            yield b'{"prices": '
+            yield b'[{"symbol": "BAND", "price": 1.0}]}'
+
+        return StreamingResponse(body(), status_code=200, headers={"x-provider": "mock"})
+
+    async with httpx.AsyncClient(app=app, base_url="http://test_pds") as client:
+        first = await client.get("/request", headers={**HEADERS, "BAND_SIGNATURE": "a"})
+        by_request = await client.get("/request", headers={**HEADERS, "BAND_SIGNATURE": "b"})
+        by_signature = await client.get("/request", headers={"BAND_SIGNATURE": "a"})
+
+    assert first.content == by_request.content == by_signature.content
+    assert first.content == b'{"prices": [{"symbol": "BAND", "price": 1.0}]}'
+    assert by_request.headers["x-provider"] == by_signature.headers["x-provider"] == "mock"
+
+
+@pytest.mark.asyncio
+async def test_failed_responses_are_not_cached_by_signature():
+    upstream = Upstream(latency=0, fail=True)
+    app = build_app(upstream)
+    app.add_middleware(SignatureCacheMiddleware, cache=AsyncCacheWrapper(LocalCache(100, 60)))
+
+    async with httpx.AsyncClient(app=app, base_url="http://test_pds") as client:
+        responses = [await client.get("/request", headers={"BAND_SIGNATURE": "a"}) for _ in range(2)]
+
+    assert [response.status_code for response in responses] == [502, 502]
+    assert upstream.calls == 2
@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.utils.cache import SharedMemoryCache
+from app.utils.response import RecordedResponse
+from app.utils.shm import SharedMemoryTable
+
+# Writes every key many times with values checked by the parent, while the parent reads them.
+WRITER = """
+import sys
+from app.utils.shm import SharedMemoryTable
+
+table = SharedMemoryTable(sys.argv[1], slots=16, slot_size=256, ways=4)
+for i in range(2000):
+    key = i % 32
+    table.set(key, (str(key) * 200)[: 50 + i % 150].encode(), 60)
+table.close()
+"""
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def test_set_get_and_expire(path):
+    table = SharedMemoryTable(path, slots=16, slot_size=256, ways=4)
+
+    assert table.set("key", b"value", 0.5)
+    assert table.get("key") == b"value"
+    assert table.set("key", b"other", 0.5)
+    assert table.get("key") == b"other"
+    assert len(table) == 1
+
+    time.sleep(0.6)
+    assert table.get("key") is None
+    assert len(table) == 0
+
+    table.set("key", b"value", 60)
+    table.delete("key")
+    assert table.get("key") is None
+    table.close()
+
+
+def test_values_longer_than_a_slot_are_not_stored(path):
+    table = SharedMemoryTable(path, slots=16, slot_size=256, ways=4)
+
+    assert not table.set("key", b"x" * (table.capacity + 1), 60)
+    assert table.get("key") is None
+    assert table.set("key", b"x" * table.capacity, 60)
+    assert table.get("key") == b"x" * table.capacity
+    table.close()
+
+
+def test_full_bucket_evicts_the_soonest_to_expire(path):
+    table = SharedMemoryTable(path, slots=4, slot_size=64, ways=4)
+
+    for i in range(4):
+        table.set(i, str(i).encode(), 60 + i)
+    table.set(4, b"4", 60)
+
+    assert table.evictions == 1
+    assert table.get(0) is None
+    assert [table.get(i) for i in range(1, 5)] == [b"1", b"2", b"3", b"4"]
+    table.close()
+
+
+def test_processes_share_the_table(path):
+    table = SharedMemoryTable(path, slots=16, slot_size=256, ways=4)
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    writers = [subprocess.Popen([sys.executable, "-c", WRITER, path], env=env) for _ in range(3)]
+
+    # Reads overlapping writes miss rather than returning a torn value.
+    while any(writer.poll() is None for writer in writers):
+        for key in range(32):
+            value = table.get(key)
+            assert value is None or value == (str(key) * 200)[: len(value)].encode()
+
+    assert all(writer.returncode == 0 for writer in writers)
+    assert len(table) == 16
+    table.close()
+
+
+def test_other_layout_is_rejected(path):
+    SharedMemoryTable(path, slots=16, slot_size=256).close()
+
+    with pytest.raises(Exception):
+        SharedMemoryTable(path, slots=32, slot_size=256)
+
+
+@pytest.mark.asyncio
+async def test_responses_are_stored_as_raw_bytes(path):
+    cache = SharedMemoryCache(path, 16, 60)
+    response = RecordedResponse(200, [(b"content-type", b"application/json")], b'{"a":"b"}')
+
+    await cache.set_response("response", response)
+    await cache.set("value", {"a": "b"})
+
+    assert cache.table.get("response") == response.encode()
+    assert await cache.get_response("response") == response
+    assert await cache.get("value") == {"a": "b"}
+    assert await cache.get_response("value") is None
+    await cache.close()
@@ -0,0 +1,198 @@
+import os
+
+import pytest
+
+from adapter.standard_crypto_price.base import StandardCryptoPrice, Input, Output
+from adapter.standard_crypto_price.coin_gecko import CoinGecko
+from adapter.standard_crypto_price.coin_market_cap import CoinMarketCap
+from adapter.standard_crypto_price.composite import Composite
+from adapter.standard_crypto_price.prefetcher import PricePrefetcher
+from adapter.standard_crypto_price.symbol_registry import SymbolRegistry
+
+
+class MockPriceAdapter(StandardCryptoPrice):
+    def __init__(self):
+        self.calls = []
+
+    async def call(self, input_: Input) -> Output:
+        self.calls.append(input_["symbols"])
+        return Output(
+            prices=[{"symbol": symbol, "price": float(len(symbol)), "timestamp": 1} for symbol in input_["symbols"]]
+        )
+
+
+@pytest.mark.asyncio
+async def test_price_cache_fetches_only_missing_symbols(monkeypatch):
+    monkeypatch.setenv("PRICE_CACHE_MAX_AGE", "1m")
+    adapter = MockPriceAdapter()
+
+    await adapter.unified_call({"symbols": "BTC,ETH"})
+    response = await adapter.unified_call({"symbols": "ETH,BAND,BTC"})
+
+    assert adapter.calls == [["BTC", "ETH"], ["BAND"]]
+    assert [price["symbol"] for price in response["prices"]] == ["ETH", "BAND", "BTC"]
+
+
+@pytest.mark.asyncio
+async def test_price_cache_expires(monkeypatch):
+    monkeypatch.setenv("PRICE_CACHE_MAX_AGE", "1m")
+    adapter = MockPriceAdapter()
+
+    await adapter.unified_call({"symbols": "BTC"})
+    adapter.price_store.max_age = 0.000001
+    await adapter.unified_call({"symbols": "BTC"})
+
+    assert adapter.calls == [["BTC"], ["BTC"]]
+
+
+@pytest.mark.asyncio
+async def test_price_cache_disabled_by_default():
+    adapter = MockPriceAdapter()
+
+    await adapter.unified_call({"symbols": "BTC"})
+    await adapter.unified_call({"symbols": "BTC"})
+
+    assert adapter.calls == [["BTC"], ["BTC"]]
+
+
+@pytest.mark.asyncio
+async def test_prefetched_snapshot_serves_requests_without_calls(monkeypatch):
+    monkeypatch.setenv("PRICE_CACHE_MAX_AGE", "1m")
+    adapter = MockPriceAdapter()
+    adapter.symbol_registry = SymbolRegistry.from_mapping(
+        {"BTC": "bitcoin", "ETH": "ethereum", "BAND": "band-protocol"}
+    )
+    prefetcher = PricePrefetcher(adapter, min_interval=1, max_interval=10, chunk_size=2)
+
+    await prefetcher.refresh()
+    assert adapter.calls == [["BTC", "ETH"], ["BAND"]]
+
+    response = await adapter.unified_call({"symbols": "BAND,BTC"})
+    assert [price["symbol"] for price in response["prices"]] == ["BAND", "BTC"]
+    assert len(adapter.calls) == 2
+
+    # Requested symbols outside of the universe are prefetched from then on.
+    await adapter.unified_call({"symbols": "ATOM"})
+    assert await prefetcher.refresh() == 2
+    assert adapter.calls[-2:] == [["BTC", "ETH"], ["BAND", "ATOM"]]
+
+
+def test_prefetch_interval_adapts_to_request_rate(monkeypatch):
+    monkeypatch.setenv("PRICE_CACHE_MAX_AGE", "1m")
+    prefetcher = PricePrefetcher(MockPriceAdapter(), min_interval=2, max_interval=10, hot_rate=4)
+
+    assert prefetcher.next_interval(0) == 10
+    assert prefetcher.next_interval(2) == 6
+    assert prefetcher.next_interval(100) == 2
+
+
+def test_prefetch_requires_price_cache():
+    with pytest.raises(Exception):
+        PricePrefetcher(MockPriceAdapter(), min_interval=2, max_interval=10)
+
+
+def test_chunk_by_symbol_count_and_query_length():
+    adapter = MockPriceAdapter()
+    adapter.max_symbols_per_call = 3
+    assert adapter.chunk(["A", "B", "C", "D", "E"]) == [["A", "B", "C"], ["D", "E"]]
+
+    adapter.max_symbols_per_call = None
+    adapter.max_query_length = 7
+    assert adapter.chunk(["AAA", "BBB", "CCC", "DDDDDDDD"]) == [["AAA", "BBB"], ["CCC"], ["DDDDDDDD"]]
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_fetched_concurrently_and_merged_in_input_order():
+    adapter = MockPriceAdapter()
+    adapter.max_symbols_per_call = 2
+    adapter.max_concurrent_calls = 2
+
+    response = await adapter.unified_call({"symbols": "E,D,C,B,A"})
+
+    assert adapter.calls == [["E", "D"], ["C", "B"], ["A"]]
+    assert [price["symbol"] for price in response["prices"]] == ["E", "D", "C", "B", "A"]
+
+
+def test_symbol_registry_maps_ids_back_to_every_symbol(tmp_path):
+    path = tmp_path / "provider.csv"
+    path.write_text("symbol,id\nUST,terrausd\nUSTC,terrausd\nBTC,bitcoin\n")
+    registry = SymbolRegistry(path, check_interval=0)
+
+    assert registry.id("UST") == "terrausd"
+    assert registry.id("ETH") == "ETH"
+    assert registry.symbols_of("terrausd") == ("UST", "USTC")
+    assert list(registry) == ["UST", "USTC", "BTC"]
+
+    # The file is reloaded once it changes.
+    path.write_text("symbol,id\nBTC,bitcoin\nETH,ethereum\n")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+    assert registry.id("ETH") == "ethereum"
+    assert registry.symbols_of("terrausd") == ()
+
+
+def test_symbol_registry_keeps_the_last_good_mapping(tmp_path, caplog):
+    path = tmp_path / "provider.csv"
+    path.write_text("symbol,id\nBTC,bitcoin\nETH,ethereum\n")
+    registry = SymbolRegistry(path, check_interval=0)
+    assert registry.id("ETH") == "ethereum"
+
+    # A partly written file is not loaded.
+    path.write_text("symbol,id\nBTC,bitcoin\nETH")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+    assert registry.id("ETH") == "ethereum"
+
+    # Neither is a missing file.
+    path.unlink()
+    assert registry.id("ETH") == "ethereum"
+    assert len(caplog.records) == 2
+
+    path.write_text("symbol,id\nETH,ether\n")
+    assert registry.id("ETH") == "ether"
+
+
+def test_provider_registries_are_shared():
+    assert CoinGecko().symbol_registry is CoinGecko().symbol_registry is SymbolRegistry.load("coin_gecko")
+    assert CoinGecko().query_symbol("BAND") == "band-protocol"
+
+
+@pytest.mark.asyncio
+async def test_symbols_sharing_an_id_are_both_priced(httpx_mock):
+    quote = {"USD": {"price": 0.02}}
+    data = {"symbol": "USTC", "slug": "terrausd", "quote": quote, "last_updated": "2023-01-01T00:00:00.000Z"}
+    httpx_mock.add_response(json={"status": {"error_code": 0}, "data": {"7129": data}})
+    adapter = CoinMarketCap()
+    adapter.api_key = "key"
+
+    response = await adapter.unified_call({"symbols": "UST,USTC"})
+
+    assert [(price["symbol"], price["price"]) for price in response["prices"]] == [("UST", 0.02), ("USTC", 0.02)]
+    assert httpx_mock.get_request().url.params["slug"] == "terrausd"
+
+
+def test_provider_endpoints_can_be_overridden(monkeypatch):
+    monkeypatch.setenv("API_URL", "http://127.0.0.1:9000/coin_gecko/api/v3/simple/price")
+    monkeypatch.setenv("COIN_MARKET_CAP_API_URL", "http://127.0.0.1:9000/coin_market_cap/v2/quotes")
+    monkeypatch.setenv("COIN_MARKET_CAP_API_KEY", "key")
+    monkeypatch.setenv("COMPOSITE_PROVIDERS", "coin_market_cap")
+
+    assert CoinGecko().api_url == "http://127.0.0.1:9000/coin_gecko/api/v3/simple/price"
+    assert Composite().providers["coin_market_cap"].api_url == "http://127.0.0.1:9000/coin_market_cap/v2/quotes"
+    assert CoinGecko.api_url == "https://pro-api.coingecko.com/api/v3/simple/price"
+
+
+def test_composite_providers_only_use_their_own_envs(monkeypatch):
+    monkeypatch.setenv("API_URL", "http://127.0.0.1:9000/coin_gecko/api/v3/simple/price")
+    monkeypatch.setenv("API_KEY", "coin_gecko_key")
+    monkeypatch.setenv("COIN_MARKET_CAP_API_KEY", "coin_market_cap_key")
+    monkeypatch.setenv("COMPOSITE_PROVIDERS", "coin_gecko,coin_market_cap,crypto_compare")
+
+    providers = Composite().providers
+
+    assert list(providers) == ["coin_market_cap"]
+    assert providers["coin_market_cap"].api_key == "coin_market_cap_key"
+    assert providers["coin_market_cap"].api_url == CoinMarketCap.api_url
+
+
+@pytest.mark.parametrize("provider", [CoinGecko, CoinMarketCap])
+def test_providers_are_not_rate_limited_by_default(provider):
+    assert provider().rate_limiters() == {}
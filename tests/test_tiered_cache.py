@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.utils.cache import AsyncRedisCache, TieredCache
+from app.utils.metrics import CACHE_TIER_REQUESTS
+from app.utils.response import RecordedResponse
+from tests.utils import REDIS_DB, REDIS_HOST, REDIS_PORT, redis_available
+
+pytestmark = pytest.mark.skipif(not redis_available(), reason="redis server is not available")
+
+
+def tier_count(name: str, tier: str, result: str) -> float:
+    return CACHE_TIER_REQUESTS.labels(name, tier, result).value
+
+
+async def wait_subscribed(cache: TieredCache, subscribers: int) -> None:
+    for _ in range(100):
+        if dict(await cache.l2.redis.pubsub_numsub(cache.channel)).get(cache.channel.encode(), 0) >= subscribers:
+            return
+        await asyncio.sleep(0.01)
+    raise TimeoutError("caches did not subscribe")
+
+
+@pytest_asyncio.fixture
+async def caches():
+    # Two caches sharing Redis, like two workers.
+    caches = [
+        TieredCache(AsyncRedisCache(REDIS_HOST, REDIS_PORT, db=REDIS_DB, ttl=60), 100, 10, name="test")
+        for _ in range(2)
+    ]
+    await caches[0].l2.redis.flushdb()
+    yield caches
+    await caches[0].l2.redis.flushdb()
+    for cache in caches:
+        await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_through_and_populate_l1(caches):
+    first, second = caches
+    l1_hits, l2_hits = tier_count("test", "l1", "hit"), tier_count("test", "l2", "hit")
+
+    await first.set("key", {"a": "b"})
+    assert await first.l2.get("key") == {"a": "b"}
+    assert await second.get("key") == {"a": "b"}
+    assert second.l1.get("key") == {"a": "b"}
+    assert await second.get("key") == {"a": "b"}
+    assert await second.get("missing") is None
+
+    assert tier_count("test", "l1", "hit") - l1_hits == 1
+    assert tier_count("test", "l2", "hit") - l2_hits == 1
+    assert await second.get_many(["key", "missing", "key"]) == [{"a": "b"}, None, {"a": "b"}]
+
+
+@pytest.mark.asyncio
+async def test_responses_are_kept_as_is_in_l1(caches):
+    first, second = caches
+    response = RecordedResponse(200, [(b"content-type", b"application/json")], b'{"a":"b"}')
+
+    await first.set_response("response", response)
+
+    assert await first.get_response("response") is response
+    assert await second.get_response("response") == response
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_l1_of_other_processes(caches):
+    first, second = caches
+    for cache in caches:
+        cache.start()
+    await wait_subscribed(first, 2)
+
+    await first.set("key", {"version": 1})
+    assert await second.get("key") == {"version": 1}
+
+    await first.set("key", {"version": 2})
+    for _ in range(100):
+        if second.l1.get("key") is None:
+            break
+        await asyncio.sleep(0.01)
+
+    assert await second.get("key") == {"version": 2}
+    # A cache ignores the keys it published itself.
+    assert first.l1.get("key") == {"version": 2}
+
+
+def test_l1_ttl_is_capped_below_l2_ttl():
+    cache = TieredCache(AsyncRedisCache(REDIS_HOST, REDIS_PORT, db=REDIS_DB, ttl=4), 100, 60)
+
+    assert cache.l1.ttl == 2
@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.middleware import TracingMiddleware
+from app.utils.helper import BandChainParams
+from app.utils.tracing import SlowTraces, Trace, span
+
+
+def finished_trace(duration: float) -> Trace:
+    trace = Trace("/", BandChainParams())
+    trace.duration = duration
+    return trace
+
+
+def test_only_the_slowest_traces_are_kept():
+    slow_traces = SlowTraces(capacity=3)
+    for duration in [0.5, 0.1, 0.9, 0.3, 0.7, 0.2]:
+        slow_traces.add(finished_trace(duration))
+
+    assert [trace.duration for trace in slow_traces.slowest()] == [0.9, 0.7, 0.5]
+
+
+@pytest.mark.asyncio
+async def test_requests_are_traced_with_their_bandchain_ids():
+    slow_traces = SlowTraces(capacity=10)
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, slow_traces=slow_traces)
+
+    @app.get("/request")
+    async def request():
+        with span("upstream"):
+            await asyncio.sleep(0.01)
+        return {}
+
+    async with httpx.AsyncClient(app=app, base_url="http://test_pds") as client:
+        response = await client.get("/request", headers={"BAND_REQUEST_ID": "7", "BAND_EXTERNAL_ID": "3"})
+
+    name, duration = response.headers["Server-Timing"].split(", ")[0].split(";dur=")
+    assert name == "upstream" and float(duration) >= 10
+
+    [trace] = [trace.to_dict() for trace in slow_traces.slowest()]
+    assert trace["request_id"] == 7
+    assert trace["external_id"] == 3
+    assert trace["status"] == 200
+    assert [s["name"] for s in trace["spans"]] == ["upstream"]
+    assert trace["duration_ms"] >= trace["spans"][0]["duration_ms"]
@@ -0,0 +1,66 @@
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from pytest_httpx import IteratorStream
+from starlette.responses import JSONResponse, StreamingResponse
+
+from adapter.verifiable_ai.openai import Openai
+from app.middleware import SignatureCacheMiddleware
+from app.utils.cache import AsyncCacheWrapper, LocalCache
+from app.utils.response import stream_json_field
+
+PARTS = ["The ", 'answer is "', '42"\n', "é"]
+
+
+def sse_stream(parts: list[str]) -> IteratorStream:
+    events = [f'data: {json.dumps({"choices": [{"delta": {"content": part}}]})}\n\n'.encode() for part in parts]
+    # The stream ends with a chunk without content and a usage chunk without choices.
+    ends = [b'data: {"choices": [{"delta": {}}]}\n\n', b'data: {"choices": [], "usage": {}}\n\n', b"data: [DONE]\n\n"]
+    return IteratorStream(events + ends)
+
+
+@pytest.mark.asyncio
+async def test_openai_streams_the_answer_as_it_is_generated(httpx_mock):
+    httpx_mock.add_response(stream=sse_stream(PARTS))
+    adapter = Openai()
+    adapter.api_key = "key"
+
+    parts = [part async for part in adapter.unified_stream({"model": "gpt-4o", "messages": [], "stream": True})]
+
+    assert parts == PARTS
+    assert json.loads(httpx_mock.get_request().content)["stream"] is True
+    assert adapter.circuit_breaker.failure_rate == 0
+
+
+@pytest.mark.asyncio
+async def test_streamed_answer_is_the_same_json_as_a_complete_answer():
+    async def rest():
+        for part in PARTS[1:]:
+            yield part
+
+    body = b"".join([chunk async for chunk in stream_json_field("answer", PARTS[0], rest())])
+
+    assert body == JSONResponse({"answer": "".join(PARTS)}).body
+
+
+@pytest.mark.asyncio
+async def test_signature_cache_stores_the_assembled_streamed_answer():
+    cache = AsyncCacheWrapper(LocalCache(100, 60))
+    app = FastAPI()
+    app.add_middleware(SignatureCacheMiddleware, cache=cache)
+
+    @app.post("/request")
+    async def request():
+        async def rest():
+            for part in PARTS[1:]:
+                yield part
+
+        return StreamingResponse(stream_json_field("answer", PARTS[0], rest()), media_type="application/json")
+
+    async with httpx.AsyncClient(app=app, base_url="http://test_pds") as client:
+        first = await client.post("/request", headers={"BAND_SIGNATURE": "signature"})
+        second = await client.post("/request", headers={"BAND_SIGNATURE": "signature"})
+
+    assert first.json() == second.json() == {"answer": "".join(PARTS)}
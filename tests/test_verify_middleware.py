@@ -4,6 +4,7 @@ from fastapi.testclient import TestClient
 from pytest_httpx import HTTPXMock
 
 from app.middleware import VerifyRequestMiddleware
+from app.utils.cache import AsyncCacheWrapper, LocalCache, VerificationCache
 from app.utils.helper import add_max_delay_param, get_bandchain_params
 
 
@@ -125,3 +126,40 @@ async def test_verify_request_from_bandchain_with_invalid_verify_response(
     res = mock_client.get("/request", headers=mock_headers)
     assert res.json() == {"error": "Failed to parse successful response from verify endpoint"}
     assert res.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_verify_request_with_verify_cache(mock_headers: dict[str, str], httpx_mock: HTTPXMock):
+    verify_cache = VerificationCache(AsyncCacheWrapper(LocalCache(100, 60)))
+    app = FastAPI()
+    app.add_middleware(
+        VerifyRequestMiddleware,
+        verify_url="https://www.mock-verify.com",
+        max_verification_delay=0,
+        allowed_data_source_ids=[1, 2],
+        verify_cache=verify_cache,
+    )
+
+    @app.get("/request")
+    def test_request():
+        return {"Hello": "World"}
+
+    httpx_mock.add_response(
+        method="GET",
+        url=build_full_url_with_delay("https://www.mock-verify.com", mock_headers),
+        status_code=200,
+        json={"is_delay": False, "data_source_id": "1"},
+    )
+
+    client = TestClient(app, "http://test_pds")
+    for _ in range(3):
+        res = client.get("/request", headers=mock_headers)
+        assert res.json() == {"Hello": "World"}
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert (verify_cache.hits, verify_cache.misses) == (2, 1)
+
+    # A request with a different signature is verified again.
+    res = client.get("/request", headers={**mock_headers, "BAND_SIGNATURE": "othersignature"})
+    assert res.status_code == 500
+    assert verify_cache.misses == 2
@@ -0,0 +1,22 @@
+import os
+import socket
+
+from redis import Redis
+from redis.exceptions import ConnectionError
+
+REDIS_HOST = os.getenv("TEST_REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("TEST_REDIS_PORT", "6379"))
+REDIS_DB = 15
+
+
+def redis_available() -> bool:
+    try:
+        return Redis(host=REDIS_HOST, port=REDIS_PORT, socket_connect_timeout=0.2).ping()
+    except ConnectionError:
+        return False
+
+
+def get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]